@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 from pathlib import Path
 
@@ -24,6 +24,7 @@ class Config:
         ALLOWHEADERS: List[str] = field(default_factory=lambda: ["*"])
         
         SOCKETCHATPREFIX: str = "/ai-service/ws"
+        METRICSPREFIX: str = "/ai-service/metrics"
     
     @dataclass(frozen=True)
     class UvicornConfig:
@@ -35,6 +36,29 @@ class Config:
         PORT: int = 8000
         RELOAD: bool = True
         
+    @dataclass(frozen=True)
+    class LLMTierConfig:
+        """
+            Model, limits and pricing (USD per 1M tokens) of one LLM tier
+        """
+        MODEL: str
+        TIMEOUT: float
+        MAX_CONCURRENCY: int
+        INPUT_PRICE_PER_M: float
+        OUTPUT_PRICE_PER_M: float
+
+    @dataclass(frozen=True)
+    class ProviderPolicyConfig:
+        """
+            Timeout, retry and circuit breaker policy of one external provider
+        """
+        TIMEOUT: Optional[float]
+        RETRIES: int
+        BASE_DELAY: float
+        MAX_DELAY: float
+        FAILURE_THRESHOLD: int
+        RESET_TIMEOUT: float
+
     @dataclass(frozen=True)
     class Config:
         """
@@ -61,6 +85,14 @@ class Config:
         UTTERANCE_END_MS: int = 3000
         VAD_EVENTS: bool = True
 
+        # Hot-path queries: "supabase" (REST client) or "asyncpg" (direct pool over DATABASE_URL,
+        # needs the postgres extra: uv sync --extra postgres)
+        DataBackend: str = "supabase"
+        PostgresPoolMinSize: int = 1
+        PostgresPoolMaxSize: int = 10
+        # Prepared statements cached per connection; set to 0 behind PgBouncer in transaction mode (Supabase port 6543)
+        PostgresStatementCacheSize: int = 100
+
         SupabaseTables: List[str] = field(default_factory=lambda: [
             "account_plans",
             "research_data",
@@ -70,6 +102,8 @@ class Config:
         ])
 
         EmbeddingModel: str = "models/text-embedding-004"
+        EmbeddingBatchSize: int = 32
+        EmbeddingBatchWaitMs: float = 10.0
 
         PineconeDimensions: int = 768
         PineconeMetric: str = "cosine"
@@ -78,12 +112,193 @@ class Config:
         PineconeSearchK: int = 3
         PineconeThreshold: float = 0.7
 
+        # Characters of context on each side of the selection for in-place span edits
+        InPlaceEditContextChars: int = 300
+
+        ChatContextTTL: float = 900.0
+        ChatContextNoveltyThreshold: float = 0.5
+        ChatContextMaxSessions: int = 1000
+
+        # Per-process cache of the latest plan per (company, user), see app/services/plan_cache.py
+        PlanCacheEnabled: bool = True
+        PlanCacheTTL: float = 300.0
+        PlanCacheMaxEntries: int = 1024
+
+        # research_data rows: JSONB summary plus the compressed raw payload (off = raw payload in `content`)
+        ResearchCompactStorage: bool = True
+
+        # Company name resolution, see app/services/company_resolver.py. Names within the fuzzy cutoff
+        # of a known alias are only recorded as candidates, never merged
+        CompanyFuzzyCutoff: float = 0.9
+        CompanyFuzzyMinLength: int = 5
+        # Companies known by their own name kept in memory per process, least recently used dropped first
+        CompanyMaxKnown: int = 50000
+        # Well-known aliases (alias -> canonical name), extended at runtime by the company_aliases table
+        CompanySeedAliases: Dict[str, str] = field(default_factory=lambda: {
+            "alphabet": "google",
+            "meta platforms": "meta",
+            "facebook": "meta",
+            "international business machines": "ibm",
+            "amazon web services": "amazon",
+            "x corp": "twitter",
+            "hewlett packard enterprise": "hpe",
+            "walt disney": "disney",
+            "jpmorgan chase": "jpmorgan",
+            "jp morgan": "jpmorgan",
+        })
+
+        IngestionWorkers: int = 2
+        IngestionQueueSize: int = 64
+        IngestionMaxRetries: int = 5
+        IngestionRetryBaseDelay: float = 2.0
+        IngestionRetryInterval: float = 5.0
+        IngestionFlushTimeout: float = 20.0
+        IngestionSpoolPath: str = str(Path(__file__).resolve().parents[2] / ".cache" / "ingestion_spool.sqlite3")
+
         TavilySearchDepth: str = "advanced"
         PerplexityMaxResults: int = 5
 
-        llmModel: str = "gemini-2.0-flash"
+        # Aspect fan-out: the query generator picks sub-queries per aspect, run concurrently within these caps
+        ResearchFanOut: bool = True
+        ResearchAspects: List[str] = field(default_factory=lambda: ["financials", "news", "leadership", "competitors", "products"])
+        FanOutMaxQueries: int = 5
+        FanOutMaxAdvanced: int = 2
+        FanOutConcurrency: int = 4
+        # Templated sub-queries for plan generation, no query generation call ({company}, {scope})
+        PlanResearchAspects: List[Dict[str, str]] = field(default_factory=lambda: [
+            {"aspect": "financials", "provider": "tavily", "search_depth": "advanced", "query": "{company} revenue funding financial results {scope}"},
+            {"aspect": "news", "provider": "tavily", "search_depth": "basic", "query": "{company} latest news announcements {scope}"},
+            {"aspect": "leadership", "provider": "tavily", "search_depth": "basic", "query": "{company} CEO leadership team executives"},
+            {"aspect": "competitors", "provider": "perplexity", "search_depth": "basic", "query": "{company} main competitors and market position {scope}"}
+        ])
+
+        # MinHash/LSH near-duplicate filtering of research results
+        DedupNumPerm: int = 64
+        DedupBands: int = 16
+        DedupThreshold: float = 0.7
+
+        # Per-prompt token budgets for compacted research payloads
+        CompactSnippetChars: int = 1200
+        EvaluationTokenBudget: int = 1500
+        SynthesisTokenBudget: int = 6000
+        PlanTokenBudget: int = 6000
+
         llmTemperature: float = 0.0
 
+        # Plan generation: "single" streams one JSON plan, "sections" writes each section in its own call.
+        # Dependent sections run after the others and see them as context.
+        PlanGenerationMode: str = "single"
+        PlanSectionConcurrency: int = 4
+        PlanDependentSections: List[str] = field(default_factory=lambda: ["executive_summary"])
+
+        # Named model tiers; orchestrator nodes pick one per call
+        DefaultLLMTier: str = "standard"
+        LLMTiers: Dict[str, "Config.LLMTierConfig"] = field(default_factory=lambda: {
+            "fast": Config.LLMTierConfig(
+                MODEL="gemini-2.0-flash-lite", TIMEOUT=15.0, MAX_CONCURRENCY=16,
+                INPUT_PRICE_PER_M=0.075, OUTPUT_PRICE_PER_M=0.30
+            ),
+            "standard": Config.LLMTierConfig(
+                MODEL="gemini-2.0-flash", TIMEOUT=30.0, MAX_CONCURRENCY=8,
+                INPUT_PRICE_PER_M=0.10, OUTPUT_PRICE_PER_M=0.40
+            ),
+            "deep": Config.LLMTierConfig(
+                MODEL="gemini-2.5-flash", TIMEOUT=90.0, MAX_CONCURRENCY=4,
+                INPUT_PRICE_PER_M=0.30, OUTPUT_PRICE_PER_M=2.50
+            ),
+        })
+
+        # Shared rate limits: token bucket + AIMD concurrency per provider
+        GeminiRequestsPerSecond: float = 5.0
+        GeminiBurst: int = 10
+        GeminiMaxConcurrency: int = 16
+        GeminiInitialConcurrency: int = 8
+        EmbeddingRequestsPerSecond: float = 10.0
+        EmbeddingBurst: int = 20
+        EmbeddingMaxConcurrency: int = 16
+        EmbeddingInitialConcurrency: int = 8
+
+        # Queue priority per call type, lower is served first
+        CallPriorities: Dict[str, int] = field(default_factory=lambda: {
+            "chat": 0,
+            "intent": 0,
+            "inplace_edit": 0,
+            "kb_search": 0,
+            "edit": 1,
+            "query_generation": 1,
+            "evaluation": 1,
+            "synthesis": 1,
+            "plan": 2,
+            "ingestion": 3,
+            "default": 1
+        })
+
+        # Resilience per external provider; TIMEOUT None leaves timing to the client (LLM tiers set their own)
+        ProviderPolicies: Dict[str, "Config.ProviderPolicyConfig"] = field(default_factory=lambda: {
+            "tavily": Config.ProviderPolicyConfig(
+                TIMEOUT=20.0, RETRIES=2, BASE_DELAY=0.5, MAX_DELAY=4.0, FAILURE_THRESHOLD=5, RESET_TIMEOUT=30.0
+            ),
+            "perplexity": Config.ProviderPolicyConfig(
+                TIMEOUT=30.0, RETRIES=2, BASE_DELAY=0.5, MAX_DELAY=4.0, FAILURE_THRESHOLD=5, RESET_TIMEOUT=30.0
+            ),
+            "pinecone": Config.ProviderPolicyConfig(
+                TIMEOUT=5.0, RETRIES=1, BASE_DELAY=0.2, MAX_DELAY=1.0, FAILURE_THRESHOLD=3, RESET_TIMEOUT=30.0
+            ),
+            "embeddings": Config.ProviderPolicyConfig(
+                TIMEOUT=10.0, RETRIES=2, BASE_DELAY=0.2, MAX_DELAY=2.0, FAILURE_THRESHOLD=5, RESET_TIMEOUT=30.0
+            ),
+            "gemini": Config.ProviderPolicyConfig(
+                TIMEOUT=None, RETRIES=2, BASE_DELAY=1.0, MAX_DELAY=8.0, FAILURE_THRESHOLD=5, RESET_TIMEOUT=20.0
+            ),
+        })
+
+        # LangGraph checkpoints per session, keeps research across clarification turns
+        CheckpointPath: str = str(Path(__file__).resolve().parents[2] / ".cache" / "checkpoints.sqlite3")
+        # An answer resumes the pending research only within this many seconds of the question
+        PendingResearchTTL: float = 900.0
+
+        # Run the LLM research review only when local extraction finds conflicting figures
+        LocalConflictCheck: bool = True
+
+        # Research review and report in one streamed call; the reply opens with "QUESTION:" when clarification is needed
+        SinglePassResearch: bool = False
+
+        # End-to-end budget per handle_message call. Optional stages are skipped when less than
+        # their minimum (seconds) is left, and never wait longer than their timeout.
+        RequestDeadlineSeconds: float = 45.0
+        DeadlineStageMinimums: Dict[str, float] = field(default_factory=lambda: {
+            "query_generation": 30.0,
+            "second_provider": 30.0,
+            "evaluation": 25.0,
+            "kb_search": 12.0,
+            "deep_tier": 20.0
+        })
+        DeadlineStageTimeouts: Dict[str, float] = field(default_factory=lambda: {
+            "intent": 8.0,
+            "query_generation": 8.0,
+            "research": 20.0,
+            "evaluation": 10.0,
+            "kb_search": 5.0
+        })
+
+        # Batch plan generation (/batch): companies per request, plans generated at once, and the
+        # budget of each plan counted from when it starts (queued behind chats at the "plan" priority)
+        BatchMaxCompanies: int = 25
+        BatchPlanConcurrency: int = 4
+        BatchPlanDeadlineSeconds: float = 90.0
+
+        # Exact-match response cache, TTL in seconds per call type (no entry = never cached)
+        LLMCacheEnabled: bool = True
+        LLMCacheMaxEntries: int = 2048
+        # Rows kept in the SQLite tier, soonest-expiring are dropped first
+        LLMCacheMaxRows: int = 20000
+        LLMCachePath: str = str(Path(__file__).resolve().parents[2] / ".cache" / "llm_cache.sqlite3")
+        LLMCacheTTLs: Dict[str, float] = field(default_factory=lambda: {
+            "intent": 3600,
+            "query_generation": 3600,
+            "evaluation": 1800
+        })
+
         @classmethod
         def from_env(cls):
             """Load ENV credentials"""
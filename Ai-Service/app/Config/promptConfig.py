@@ -24,6 +24,19 @@ class PromptConfig(Enum):
             """,
     )
 
+    InPlaceSpanEdit = Prompt(
+        SYSTEM_PROMPT="""
+            Excerpt of a message, the selected part is marked with <<< >>>:
+                "{before}<<<{selected_text}>>>{after}"
+                
+                Instruction for the selected part:
+                "{message_text}"
+                
+                Rewrite ONLY the selected part. It will replace the text between <<< and >>>, so it must read naturally
+                between the text before and after it. Return ONLY the replacement text, without the markers.
+            """,
+    )
+
     IntentAnalysis = Prompt(
         SYSTEM_PROMPT="""You are an AI assistant that analyzes user messages to determine the intent and extract entities.
                 
@@ -49,7 +62,7 @@ class PromptConfig(Enum):
     ResearchEvaluation = Prompt(
         SYSTEM_PROMPT="""
                 Analyze these research findings for {company}:
-                {research_data} # Truncate to avoid token limits
+                {research_data}
                 
                 Your goal is to determine if the information is sufficient to write a comprehensive report or if there are major gaps/conflicts.
                 
@@ -89,6 +102,38 @@ class PromptConfig(Enum):
                 """
     )
 
+    ResearchReviewAndSynthesis = Prompt(
+        SYSTEM_PROMPT="""
+                You are an expert research analyst with a talent for storytelling. Review the following research data for {company}, then either ask the user one clarifying question or write the report.
+                
+                Research Data:
+                {research_data}
+                
+                CRITICAL: If you find conflicting information (e.g. different revenue figures, contradictory dates) or major gaps, do NOT write the report.
+                Instead, your entire response must be: "QUESTION: <your question>"
+                
+                Example: "QUESTION: I found conflicting revenue figures for 2023 (Source A says $1B, Source B says $1.5B). Which source should I prioritize?"
+                
+                Otherwise, start directly with the report (no preamble), formatted in Markdown with the following structure:
+                
+                # Research Report: {company}
+                
+                ## Executive Summary
+                (A compelling narrative overview of the findings. Tell the story of the company's current state.)
+                
+                ## Key Findings
+                (Bulleted list of the most critical facts, but explain *why* they matter.)
+                
+                ## Detailed Analysis
+                (Deep dive into the data. Use subheaders. Connect the dots between different data points to provide unique insights.)
+                
+                ## Sources & References
+                (List the sources used)
+                
+                Tone: Professional, insightful, and engaging. Avoid dry, robotic listing of facts.
+                """
+    )
+
     PlanGeneration = Prompt(
         SYSTEM_PROMPT="""Create an account plan for {company} based on the following research:
             
@@ -97,6 +142,25 @@ class PromptConfig(Enum):
             
             Existing Knowledge (from previous research):
             {existing_knowledge}
+            
+            Return ONLY a JSON object with these keys, in this order:
+            {sections}
+            """
+    )
+
+    PlanSectionGeneration = Prompt(
+        SYSTEM_PROMPT="""Write the '{section}' section of an account plan for {company}: {description}.
+            
+            Fresh Research:
+            {research_data}
+            
+            Existing Knowledge (from previous research):
+            {existing_knowledge}
+            
+            Other sections of this plan (if any; stay consistent with them):
+            {drafted_sections}
+            
+            Write only this section. {output_format}
             """
     )
 
@@ -110,7 +174,8 @@ class PromptConfig(Enum):
                 
                 User Instruction: "{user_instruction}"
                 
-                Rewrite the list based on the instruction. Return the updated list of items.
+                Rewrite the list based on the instruction. Return ONLY the updated list as JSON:
+                {{"items": ["...", "..."]}}
                 """
     )
 
@@ -151,6 +216,33 @@ class PromptConfig(Enum):
                 """
     )
 
+    AspectQueryGeneration = Prompt(
+        SYSTEM_PROMPT="""
+                You are a search query expert. Break the user's request down into aspect-specific search queries.
+
+                Context:
+                Company: {company}
+                User Message: "{user_message}"
+                Previous History: "{prev_history}"
+
+                Aspects: {aspects}
+
+                Pick only the aspects the request needs: 1-2 queries for a narrow question, up to {max_queries} for a broad one.
+                For each query choose:
+                - "provider": "tavily" for facts, figures and recent news (e.g. "Tesla Q3 2024 revenue"), "perplexity" for analysis and comparisons (e.g. "How does Tesla's margin compare to BYD's?").
+                - "search_depth": "advanced" only when the aspect needs in-depth sources, otherwise "basic".
+
+                If the user message is a follow-up (e.g. "add numbers", "tell me more"), use the history to construct full queries.
+
+                Output JSON format:
+                {{
+                    "queries": [
+                        {{"aspect": "...", "query": "...", "provider": "tavily", "search_depth": "basic"}}
+                    ]
+                }}
+                """
+    )
+
     ChatContext = Prompt(
         SYSTEM_PROMPT="""
                 You are an intelligent, empathetic, and proactive research partner.
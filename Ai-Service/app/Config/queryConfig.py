@@ -91,4 +91,69 @@ class QueryConfig:
             create policy "Public Access Messages" on messages for all using (true) with check (true);
 
             """
-        )
\ No newline at end of file
+        )
+
+        # Run on every startup, each statement is idempotent
+        getMigrationsSQL: str = (
+            """
+            -- Company resolution: alias index and canonical keys on company-scoped rows
+            create table if not exists company_aliases (
+            alias text primary key,
+            company_key text not null,
+            created_at timestamp with time zone default timezone('utc'::text, now()) not null
+            );
+            alter table company_aliases enable row level security;
+            drop policy if exists "Public Access Company Aliases" on company_aliases;
+            create policy "Public Access Company Aliases" on company_aliases for all using (true) with check (true);
+
+            alter table account_plans add column if not exists company_key text;
+            alter table research_data add column if not exists company_key text;
+            create index if not exists account_plans_company_key_idx on account_plans (company_key, user_id, created_at desc);
+            create index if not exists research_data_company_key_idx on research_data (company_key);
+
+            -- Compact research storage: queryable summary, compressed raw provider payload
+            alter table research_data add column if not exists summary jsonb;
+            alter table research_data add column if not exists raw bytea;
+            create index if not exists research_data_plan_id_idx on research_data (plan_id);
+
+            -- Let the REST API see the new columns
+            notify pgrst, 'reload schema';
+            """
+        )
+    @dataclass(frozen=True)
+    class PostgresQueries:
+        """
+            Hot-path queries for the asyncpg backend (prepared once per pooled connection)
+        """
+        getMessage: str = "select * from messages where id = $1::uuid"
+        getRecentMessages: str = (
+            "select * from messages where conversation_id = $1::uuid "
+            "order by created_at desc limit $2"
+        )
+        insertMessage: str = (
+            "insert into messages (id, conversation_id, role, content) "
+            "values (coalesce($1::uuid, gen_random_uuid()), $2::uuid, $3, $4)"
+        )
+        updateMessageContent: str = "update messages set content = $2 where id = $1::uuid"
+
+        insertPlan: str = (
+            "insert into account_plans (id, user_id, company, company_key, sections) "
+            "values (coalesce($1::uuid, gen_random_uuid()), $2::uuid, $3, $4, $5::jsonb) returning *"
+        )
+        getPlan: str = "select * from account_plans where id = $1::uuid"
+        # Plans matching the canonical key first, then legacy rows matching the exact name
+        getLatestPlan: str = (
+            "select * from account_plans "
+            "where (company_key = $1 or company = $2) and ($3::uuid is null or user_id = $3::uuid) "
+            "order by coalesce(company_key = $1, false) desc, created_at desc limit 1"
+        )
+        getPlanSections: str = "select sections, updated_at from account_plans where id = $1::uuid"
+        updatePlanSections: str = (
+            "update account_plans set sections = $2::jsonb, updated_at = $3::timestamptz "
+            "where id = $1::uuid and ($4::timestamptz is null or updated_at = $4::timestamptz) returning *"
+        )
+
+        insertResearch: str = (
+            "insert into research_data (company, company_key, content, summary, raw, plan_id, user_id) "
+            "values ($1, $2, coalesce($3::jsonb, '{}'::jsonb), $4::jsonb, $5, $6::uuid, $7::uuid) returning id"
+        )
@@ -0,0 +1,19 @@
+from app.core.llm_client import LLMClient
+from app.utils.metrics import metrics
+from fastapi import APIRouter
+
+router = APIRouter()
+
+@router.get("")
+async def get_metrics(prefix: str = ""):
+    """
+    Process-local service metrics (queue depths, cache hit rates, latencies).
+    """
+    return metrics.snapshot(prefix)
+
+@router.get("/llm-tiers")
+async def get_llm_tier_report():
+    """
+    Latency, token usage and cost per LLM tier.
+    """
+    return LLMClient.tier_report()
@@ -1,7 +1,12 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
 from app.schemas.websocket_messages import ErrorMessage
-from app.schemas.websocket_messages import UserMessage
+from app.schemas.websocket_messages import UserMessage, PlanAck, BatchRequest
+from app.services.plan_sync import PlanSyncSession
+from app.services.plan_service import PlanService
+from app.core.rate_limiter import RateLimitedError
+from app.core.resilience import CircuitOpenError
 from app.core.orchestrator import Orchestrator
+from app.core.batch_planner import BatchPlanner
 from app.Config.dataConfig import Config
 from app.utils.logger import logger
 import asyncio
@@ -38,15 +43,28 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.close(code=1008, reason="Invalid token")
         return
 
+    # Clients connecting with ?plan_sync=delta get plan deltas instead of full-content plan updates
+    plan_sync = PlanSyncSession(
+        websocket.send_json, 
+        PlanService(), 
+        delta=websocket.query_params.get("plan_sync") == "delta"
+    )
+
     async def send_callback(message_model):
         try:
-            await websocket.send_json(message_model.dict())
+            await plan_sync.send(message_model)
         except Exception as e:
             logger.warning(f"Failed to send message to client (disconnected?): {e}")
 
     try:
         while True:
             data = await websocket.receive_json()
+            if data.get("type") == "plan_ack":
+                try:
+                    await plan_sync.ack(PlanAck(**data).payload)
+                except Exception as e:
+                    logger.warning(f"Failed to handle plan ack: {e}")
+                continue
             # Basic validation
             try:
                 user_msg = UserMessage(**data)
@@ -60,8 +78,13 @@ async def websocket_endpoint(websocket: WebSocket):
                     await orchestrator.handle_message(text, session_id, send_callback, user_id, selected_text, source_message_id)
             except Exception as e:
                 logger.error(f"Error processing message: {e}")
+                code = (
+                    "RATE_LIMITED" if isinstance(e, RateLimitedError)
+                    else "PROVIDER_UNAVAILABLE" if isinstance(e, CircuitOpenError)
+                    else "PROCESSING_ERROR"
+                )
                 try:
-                    await websocket.send_json(ErrorMessage(payload={"code": "PROCESSING_ERROR", "message": str(e)}).dict())
+                    await websocket.send_json(ErrorMessage(payload={"code": code, "message": str(e)}).dict())
                 except Exception:
                     logger.warning("Could not send error message to client (connection likely closed).")
     except WebSocketDisconnect:
@@ -69,6 +92,82 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Error in websocket endpoint: {e}")
         await websocket.close(code=1008, reason="Internal server error")
+    finally:
+        if plan_sync.bytes_sent:
+            logger.info(plan_sync.report())
+
+@router.websocket("/batch")
+async def batch_websocket_endpoint(websocket: WebSocket):
+    """
+    Plans for a list of companies: send a batch_request, receive batch_progress per company
+    and a batch_complete. Several batches may run on one connection; they share the process-wide
+    plan slots of BatchPlanner and are cancelled on disconnect (plans already generated stay saved).
+    """
+    await websocket.accept()
+
+    # Verify Token
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008, reason="Missing authentication token")
+        return
+
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        user_id = payload.get("id")
+    except jwt.ExpiredSignatureError:
+        await websocket.close(code=1008, reason="Token expired")
+        return
+    except jwt.InvalidTokenError:
+        await websocket.close(code=1008, reason="Invalid token")
+        return
+
+    async def send_callback(message_model):
+        try:
+            await websocket.send_json(message_model.dict())
+        except Exception as e:
+            logger.warning(f"Failed to send batch message to client (disconnected?): {e}")
+
+    async def run_batch(request):
+        try:
+            await BatchPlanner(orchestrator, request.concurrency).run(
+                request.companies, 
+                request.region, 
+                send_callback, 
+                user_id=user_id, 
+                batch_id=request.batch_id
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing batch: {e}")
+            await send_callback(ErrorMessage(payload={"code": "PROCESSING_ERROR", "message": str(e)}))
+
+    batches = set()
+    try:
+        while True:
+            data = await websocket.receive_json()
+            try:
+                request = BatchRequest(**data).payload
+            except Exception as e:
+                await send_callback(ErrorMessage(payload={"code": "INVALID_REQUEST", "message": str(e)}))
+                continue
+            if len(request.companies) > settings.BatchMaxCompanies:
+                await send_callback(ErrorMessage(payload={
+                    "code": "BATCH_TOO_LARGE",
+                    "message": f"A batch takes at most {settings.BatchMaxCompanies} companies."
+                }))
+                continue
+            task = asyncio.create_task(run_batch(request))
+            batches.add(task)
+            task.add_done_callback(batches.discard)
+    except WebSocketDisconnect:
+        logger.info("Batch client disconnected")
+    except Exception as e:
+        logger.error(f"Error in batch websocket endpoint: {e}")
+        await websocket.close(code=1008, reason="Internal server error")
+    finally:
+        for task in list(batches):
+            task.cancel()
 
 @router.websocket("/voice")
 async def voice_websocket_endpoint(websocket: WebSocket):
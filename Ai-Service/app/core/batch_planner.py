@@ -0,0 +1,142 @@
+from app.schemas.websocket_messages import StatusUpdate, AssistantChunk, BatchProgress, BatchComplete
+from app.services.company_resolver import companies
+from app.Config.dataConfig import Config
+from app.core.deadline import Deadline
+from typing import Any, Dict, List, Optional
+from app.utils.metrics import metrics
+from app.utils.logger import logger
+import asyncio
+import time
+import uuid
+
+settings = Config.Config.from_env()
+
+
+class BatchPlanner:
+    """
+    Research and plan generation for a list of companies, a bounded number at a time.
+    Runs through the given orchestrator, so the LLM and research caches, rate limiters and
+    circuit breakers are the ones interactive chats use; plan calls already queue behind
+    chat calls at their lower priority. Each plan is saved as soon as it is generated.
+    """
+    # Shared by every batch so concurrent batches together run at most BatchPlanConcurrency plans
+    _slots: asyncio.Semaphore = None
+    _active: int = 0
+
+    def __init__(
+        self,
+        orchestrator,
+        concurrency: Optional[int] = None
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.concurrency = max(1, min(concurrency or settings.BatchPlanConcurrency, settings.BatchPlanConcurrency))
+        if BatchPlanner._slots is None:
+            BatchPlanner._slots = asyncio.Semaphore(settings.BatchPlanConcurrency)
+
+    async def run(
+        self,
+        names: List[str],
+        region: str,
+        send_callback,
+        user_id: Optional[str] = None,
+        batch_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Streams a BatchProgress per company as it is queued, runs and finishes, then a
+        BatchComplete. Returns the completion payload.
+        """
+        batch_id = batch_id or str(uuid.uuid4())
+
+        # Names resolving to the same company get one plan
+        unique = {}
+        for name in names:
+            name = name.strip()
+            if name:
+                unique.setdefault(await companies.resolve(name), name)
+        queue = list(unique.values())
+        if len(queue) > settings.BatchMaxCompanies:
+            raise ValueError(f"A batch takes at most {settings.BatchMaxCompanies} companies, got {len(queue)}")
+
+        total = len(queue)
+        done = {"ok": 0, "failed": 0}
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def progress(
+            company: str,
+            status: str,
+            **fields
+        ):
+            await send_callback(BatchProgress(payload={
+                "batch_id": batch_id,
+                "company": company,
+                "status": status,
+                "completed": done["ok"] + done["failed"],
+                "total": total,
+                **fields
+            }))
+
+        async def plan(company: str):
+            errors = []
+
+            async def company_callback(message_model):
+                # Stage messages become progress; the plan itself is read back from the database
+                if isinstance(message_model, StatusUpdate):
+                    await progress(company, "running", message=message_model.payload.message)
+                elif isinstance(message_model, AssistantChunk) and message_model.payload.message_id.startswith("err"):
+                    errors.append(message_model.payload.chunk)
+
+            async with slots, BatchPlanner._slots:
+                BatchPlanner._active += 1
+                metrics.set_gauge("batch.active", BatchPlanner._active)
+                deadline = Deadline(
+                    settings.BatchPlanDeadlineSeconds,
+                    stage_minimums=settings.DeadlineStageMinimums,
+                    stage_timeouts=settings.DeadlineStageTimeouts
+                )
+                start = time.perf_counter()
+                try:
+                    result = await self.orchestrator.generate_plan(company, region, company_callback, deadline, user_id=user_id)
+                except Exception as e:
+                    logger.error(f"Batch {batch_id}: plan for {company} failed: {e}")
+                    result = None
+                    errors.append(str(e))
+                finally:
+                    BatchPlanner._active -= 1
+                    metrics.set_gauge("batch.active", BatchPlanner._active)
+                metrics.observe("batch.plan_seconds", time.perf_counter() - start)
+
+            if result and result["saved"]:
+                done["ok"] += 1
+                metrics.incr("batch.plans")
+                await progress(company, "done", plan_id=result["id"], saved=True)
+            else:
+                done["failed"] += 1
+                metrics.incr("batch.failures")
+                await progress(
+                    company,
+                    "failed",
+                    plan_id=result["id"] if result else None,
+                    saved=False,
+                    message=errors[-1] if errors else "Plan generation failed."
+                )
+
+        start = time.perf_counter()
+        for company in queue:
+            await progress(company, "queued")
+        await asyncio.gather(*(plan(company) for company in queue))
+
+        elapsed = time.perf_counter() - start
+        per_minute = done["ok"] / elapsed * 60 if elapsed > 0 else 0.0
+        metrics.set_gauge("batch.plans_per_minute", per_minute)
+        logger.info(f"Batch {batch_id}: {done['ok']}/{total} plans in {elapsed:.1f}s ({per_minute:.1f}/min, concurrency {self.concurrency})")
+
+        summary = {
+            "batch_id": batch_id,
+            "total": total,
+            "succeeded": done["ok"],
+            "failed": done["failed"],
+            "elapsed_seconds": round(elapsed, 2),
+            "plans_per_minute": round(per_minute, 2)
+        }
+        await send_callback(BatchComplete(payload=summary))
+        return summary
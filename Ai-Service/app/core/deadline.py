@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional
+from app.utils.metrics import metrics
+from app.utils.logger import logger
+import time
+
+
+class Deadline:
+    """
+    Latency budget of one request. Optional stages check `allows()` before running and
+    cap their own wait with `timeout()`; anything skipped or cut short is recorded with
+    `degrade()` so the request can report what it gave up.
+    """
+    def __init__(
+        self,
+        budget_seconds: float,
+        stage_minimums: Optional[Dict[str, float]] = None,
+        stage_timeouts: Optional[Dict[str, float]] = None
+    ) -> None:
+        self.budget = budget_seconds
+        self.stage_minimums = stage_minimums or {}
+        self.stage_timeouts = stage_timeouts or {}
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_seconds
+        self.degradations: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def allows(
+        self,
+        stage: str
+    ) -> bool:
+        """
+        Whether enough budget is left to run an optional stage.
+        """
+        return self.remaining() >= self.stage_minimums.get(stage, 0.0)
+
+    def timeout(
+        self,
+        stage: str
+    ) -> float:
+        """
+        Seconds a stage may take: its own cap, bounded by what is left of the budget.
+        """
+        return max(0.1, min(self.stage_timeouts.get(stage, self.budget), self.remaining()))
+
+    def degrade(
+        self,
+        name: str
+    ) -> None:
+        self.degradations.append(name)
+        metrics.incr(f"deadline.degraded.{name}")
+        logger.warning(f"Degraded '{name}' with {self.remaining():.1f}s of {self.budget:g}s budget left")
+
+    def report(self) -> str:
+        elapsed = self.elapsed()
+        metrics.observe("deadline.elapsed", elapsed)
+        metrics.incr("deadline.requests")
+        if elapsed > self.budget:
+            metrics.incr("deadline.overruns")
+        if self.degradations:
+            metrics.incr("deadline.degraded_requests")
+        degraded = ", ".join(self.degradations) or "none"
+        return f"Request took {elapsed:.2f}s of {self.budget:g}s budget, degraded: {degraded}"
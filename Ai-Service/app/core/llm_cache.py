@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.utils.metrics import metrics
+from pathlib import Path
+import threading
+import hashlib
+import sqlite3
+import asyncio
+import json
+import time
+
+
+class ResponseCache:
+    """
+    Two-tier exact-match cache for deterministic LLM calls: an in-memory LRU in
+    front of a SQLite table. Entries expire after the TTL configured for their
+    call type; call types without a TTL are never cached. The SQLite file is only
+    used once `open()` has been called (app lifespan), until then the cache is
+    memory-only.
+    """
+    def __init__(
+        self,
+        path: str,
+        ttls: Dict[str, float],
+        max_entries: int = 2048,
+        max_rows: int = 20000
+    ) -> None:
+        self.path = path
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._hits: Dict[str, int] = {}
+        self._lookups: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        """
+        Open (or create) the SQLite file and drop expired rows. Blocking, run it in a thread.
+        """
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, "
+            "call_type TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+        with self._lock:
+            self._conn = conn
+            self._prune(time.time())
+            self._conn.commit()
+
+    def enabled_for(
+        self,
+        call_type: str
+    ) -> bool:
+        return self.ttls.get(call_type, 0) > 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: Any,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = json.dumps({"model": model, "prompt": prompt, "schema": schema}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(
+        self,
+        call_type: str,
+        key: str
+    ) -> Optional[Any]:
+        self._lookups[call_type] = self._lookups.get(call_type, 0) + 1
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry and entry[0] > now:
+            self._memory.move_to_end(key)
+            self._record_hit(call_type, "memory")
+            return entry[1]
+
+        row = await asyncio.to_thread(self._read, key, now) if self._conn else None
+        if row:
+            expires_at, value = row
+            self._remember(key, expires_at, value)
+            self._record_hit(call_type, "sqlite")
+            return value
+
+        metrics.incr(f"llm_cache.{call_type}.miss")
+        self._update_hit_rate(call_type)
+        return None
+
+    async def set(
+        self,
+        call_type: str,
+        key: str,
+        value: Any
+    ) -> None:
+        expires_at = time.time() + self.ttls.get(call_type, 0)
+        self._remember(key, expires_at, value)
+        if self._conn:
+            await asyncio.to_thread(self._write, key, call_type, value, expires_at)
+
+    def hit_rate(
+        self,
+        call_type: str
+    ) -> float:
+        lookups = self._lookups.get(call_type, 0)
+        return self._hits.get(call_type, 0) / lookups if lookups else 0.0
+
+    def _record_hit(
+        self,
+        call_type: str,
+        tier: str
+    ) -> None:
+        self._hits[call_type] = self._hits.get(call_type, 0) + 1
+        metrics.incr(f"llm_cache.{call_type}.hit_{tier}")
+        self._update_hit_rate(call_type)
+
+    def _update_hit_rate(
+        self,
+        call_type: str
+    ) -> None:
+        metrics.set_gauge(f"llm_cache.{call_type}.hit_rate", round(self.hit_rate(call_type), 4))
+
+    def _remember(
+        self,
+        key: str,
+        expires_at: float,
+        value: Any
+    ) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read(
+        self,
+        key: str,
+        now: float
+    ) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _write(
+        self,
+        key: str,
+        call_type: str,
+        value: Any,
+        expires_at: float
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, call_type, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, call_type, json.dumps(value), expires_at)
+            )
+            self._prune(time.time())
+            self._conn.commit()
+
+    def _prune(
+        self,
+        now: float
+    ) -> None:
+        """
+        Drop expired rows, then the soonest-expiring ones beyond `max_rows`. Caller holds the lock.
+        """
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_rows
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY expires_at LIMIT ?)",
+                (excess,)
+            )
+            metrics.incr("llm_cache.evicted_rows", excess)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
@@ -1,15 +1,199 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import AIMessage, BaseMessage
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Type
+from app.core.rate_limiter import gemini_limiter, priority_for, is_throttle_error, RateLimitedError
+from app.core.resilience import providers
+from app.core.llm_cache import ResponseCache
 from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
+from app.utils.logger import logger
+from pydantic import BaseModel
+import asyncio
+import time
 
 settings = Config.Config.from_env()
 
 class LLMClient:
+    """
+    Routes LLM calls to named model tiers (fast / standard / deep), each with its
+    own model, timeout and concurrency cap, and records latency and cost per tier.
+    """
     def __init__(self) -> None:
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.llmModel,
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=settings.llmTemperature
+        self.tiers: Dict[str, ChatGoogleGenerativeAI] = {
+            name: ChatGoogleGenerativeAI(
+                model=tier.MODEL,
+                google_api_key=settings.GOOGLE_API_KEY,
+                temperature=settings.llmTemperature,
+                timeout=tier.TIMEOUT,
+                # A single attempt: retries and backoff belong to the "gemini" provider policy, so every
+                # 429 reaches the limiter and the breaker. 1, not 0, since 0 means the SDK default.
+                max_retries=1
+            )
+            for name, tier in settings.LLMTiers.items()
+        }
+        self._slots = {name: asyncio.Semaphore(tier.MAX_CONCURRENCY) for name, tier in settings.LLMTiers.items()}
+        self.llm = self.tiers[settings.DefaultLLMTier]
+        self.cache = ResponseCache(
+            path=settings.LLMCachePath,
+            ttls=settings.LLMCacheTTLs if settings.LLMCacheEnabled else {},
+            max_entries=settings.LLMCacheMaxEntries,
+            max_rows=settings.LLMCacheMaxRows
         )
 
-    def get_llm(self):
-        return self.llm
+    def get_llm(
+        self,
+        tier: str = settings.DefaultLLMTier
+    ):
+        return self.tiers[tier]
+
+    async def ainvoke(
+        self,
+        prompt: Any,
+        call_type: str,
+        tier: str = settings.DefaultLLMTier,
+        schema: Optional[Type[BaseModel]] = None
+    ) -> Any:
+        """
+        Invoke the model, returning an AIMessage or, when `schema` is given, a parsed `schema` instance.
+        Call types with a cache TTL are served from the response cache when possible.
+        Transient failures are retried under the "gemini" provider policy.
+        """
+        cacheable = self.cache.enabled_for(call_type)
+        if cacheable:
+            key = ResponseCache.make_key(
+                settings.LLMTiers[tier].MODEL,
+                self._serialize_prompt(prompt),
+                schema.model_json_schema() if schema else None
+            )
+            cached = await self.cache.get(call_type, key)
+            if cached is not None:
+                return schema.model_validate(cached) if schema else AIMessage(content=cached)
+
+        result, value = await providers.call(
+            "gemini",
+            lambda: self._invoke(prompt, call_type, tier, schema)
+        )
+
+        if cacheable and value is not None:
+            await self.cache.set(call_type, key, value)
+        return result
+
+    async def astream(
+        self,
+        prompt: Any,
+        call_type: str,
+        tier: str = settings.DefaultLLMTier
+    ) -> AsyncIterator[Any]:
+        """
+        Stream the model response. Streaming calls are never cached and are only
+        retried if they fail before the first chunk.
+        """
+        async for chunk in providers.stream("gemini", lambda: self._stream(prompt, call_type, tier)):
+            yield chunk
+
+    async def _invoke(
+        self,
+        prompt: Any,
+        call_type: str,
+        tier: str,
+        schema: Optional[Type[BaseModel]]
+    ) -> Tuple[Any, Any]:
+        """
+        One model call under the rate limiter; returns the result and its cacheable value.
+        """
+        llm = self.tiers[tier]
+        async with gemini_limiter.slot(priority_for(call_type)), self._slots[tier]:
+            start = time.perf_counter()
+            try:
+                if schema:
+                    output = await llm.with_structured_output(schema, include_raw=True).ainvoke(prompt)
+                    raw, result = output["raw"], output["parsed"]
+                    if output.get("parsing_error"):
+                        logger.warning(f"Structured output parsing failed for {call_type}: {output['parsing_error']}")
+                    value = result.model_dump() if result is not None else None
+                else:
+                    raw = result = await llm.ainvoke(prompt)
+                    value = result.content
+            except Exception as e:
+                if is_throttle_error(e):
+                    raise RateLimitedError(f"Gemini rate limit reached during {call_type}") from e
+                raise
+            self._record(tier, call_type, time.perf_counter() - start, getattr(raw, "usage_metadata", None))
+        return result, value
+
+    async def _stream(
+        self,
+        prompt: Any,
+        call_type: str,
+        tier: str
+    ) -> AsyncIterator[Any]:
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        async with gemini_limiter.slot(priority_for(call_type)), self._slots[tier]:
+            start = time.perf_counter()
+            try:
+                async for chunk in self.tiers[tier].astream(prompt):
+                    chunk_usage = getattr(chunk, "usage_metadata", None) or {}
+                    usage["input_tokens"] += chunk_usage.get("input_tokens", 0)
+                    usage["output_tokens"] += chunk_usage.get("output_tokens", 0)
+                    yield chunk
+            except Exception as e:
+                if is_throttle_error(e):
+                    raise RateLimitedError(f"Gemini rate limit reached during {call_type}") from e
+                raise
+            self._record(tier, call_type, time.perf_counter() - start, usage)
+
+    def _record(
+        self,
+        tier: str,
+        call_type: str,
+        seconds: float,
+        usage: Optional[Dict[str, int]]
+    ) -> None:
+        cfg = settings.LLMTiers[tier]
+        usage = usage or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        cost = (input_tokens * cfg.INPUT_PRICE_PER_M + output_tokens * cfg.OUTPUT_PRICE_PER_M) / 1e6
+
+        metrics.observe(f"llm.{tier}.latency", seconds)
+        metrics.observe(f"llm.{tier}.{call_type}.latency", seconds)
+        metrics.incr(f"llm.{tier}.calls")
+        metrics.incr(f"llm.{tier}.input_tokens", input_tokens)
+        metrics.incr(f"llm.{tier}.output_tokens", output_tokens)
+        metrics.incr(f"llm.{tier}.{call_type}.output_tokens", output_tokens)
+        metrics.incr(f"llm.{tier}.cost_usd", cost)
+
+    @staticmethod
+    def tier_report() -> Dict[str, Dict[str, Any]]:
+        """
+        Latency and cost summary per tier.
+        """
+        snapshot = metrics.snapshot("llm.")
+        report = {}
+        for tier, cfg in settings.LLMTiers.items():
+            calls = snapshot["counters"].get(f"llm.{tier}.calls", 0)
+            cost = snapshot["counters"].get(f"llm.{tier}.cost_usd", 0.0)
+            report[tier] = {
+                "model": cfg.MODEL,
+                "calls": calls,
+                "latency": snapshot["timings"].get(f"llm.{tier}.latency", {}),
+                "input_tokens": snapshot["counters"].get(f"llm.{tier}.input_tokens", 0),
+                "output_tokens": snapshot["counters"].get(f"llm.{tier}.output_tokens", 0),
+                "cost_usd": round(cost, 6),
+                "cost_per_call_usd": round(cost / calls, 6) if calls else 0.0,
+            }
+        return report
+
+    def close(self) -> None:
+        logger.info(f"LLM tier report: {LLMClient.tier_report()}")
+        self.cache.close()
+
+    @staticmethod
+    def _serialize_prompt(
+        prompt: Any
+    ) -> Any:
+        if hasattr(prompt, "to_messages"):
+            prompt = prompt.to_messages()
+        if isinstance(prompt, list):
+            return [[m.type, m.content] if isinstance(m, BaseMessage) else m for m in prompt]
+        return prompt
@@ -2,21 +2,49 @@ from app.schemas.websocket_messages import StatusUpdate, AssistantChunk, PlanUpd
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from app.services.knowledge_base import KnowledgeBaseService
 from app.services.research_service import ResearchService
+from app.services.context_cache import RetrievedContextCache
+from app.services.company_resolver import companies
+from app.services.research_compactor import ResearchCompactor, estimate_tokens
+from app.services.conflict_detector import ConflictDetector
 from app.schemas.websocket_messages import MessageUpdate
 from langchain_core.prompts import ChatPromptTemplate
 from app.services.plan_service import PlanService
 from app.Config.promptConfig import PromptConfig
-from typing import TypedDict, List, Dict, Any
+from app.Config.dataConfig import Config
+from typing import TypedDict, List, Dict, Any, Optional, Tuple, Callable, Awaitable
+from app.schemas.research import ResearchQueries, SubQuery
 from app.schemas.intent import IntentAnalysis
+from app.utils.partial_json import PartialJSONObject
+from app.utils.text import utf16_len
 from app.states.global_state import services
 from langgraph.graph import StateGraph, END
+from app.core.rate_limiter import RateLimitedError
+from app.core.resilience import CircuitOpenError
 from app.core.llm_client import LLMClient
+from app.core.deadline import Deadline
 from app.schemas.plan import AccountPlan
 from pydantic import BaseModel, Field
+from app.utils.timeline import StageTimeline
+from app.utils.metrics import metrics
 from app.utils.logger import logger
+from datetime import datetime
+import asyncio
 import json
+import re
+import time
 import uuid
 
+settings = Config.Config.from_env()
+
+RATE_LIMITED_MESSAGE = "The AI service is at capacity right now. Please try again in a minute."
+UNAVAILABLE_MESSAGE = "The AI service is temporarily unavailable. Please try again shortly."
+QUESTION_MARKER = "QUESTION:"
+# Plan keys in generation order, with what each holds, for the streamed JSON plan
+PLAN_SECTIONS = "\n".join(
+    f'- "{name}" ({"list of strings" if field.annotation == List[str] else "string"}): {field.description}'
+    for name, field in AccountPlan.model_fields.items()
+)
+
 
 class SearchQueries(BaseModel):
     tavily_query: str = Field(description="Concise query for Tavily")
@@ -33,15 +61,483 @@ class AgentState(TypedDict):
     plan_data: Dict[str, Any]
     session_id: str
     user_id: str
+    # Research kept (checkpointed per session) while a clarification question is open
+    pending_research: Dict[str, Any]
     # Pass send_callback as an argument to handle_message and then to nodes.
 
 class Orchestrator:
     def __init__(self) -> None:
         self.llm_client = LLMClient()
-        self.llm = self.llm_client.get_llm()
         self.research_service = ResearchService()
         self.plan_service = PlanService()
         self.knowledge_base = KnowledgeBaseService()
+        self.context_cache = RetrievedContextCache(
+            ttl_seconds=settings.ChatContextTTL,
+            novelty_threshold=settings.ChatContextNoveltyThreshold,
+            max_sessions=settings.ChatContextMaxSessions
+        )
+        self.compactor = ResearchCompactor(max_snippet_chars=settings.CompactSnippetChars)
+        self.conflict_detector = ConflictDetector()
+
+    async def _search_knowledge(
+        self, 
+        query: str, 
+        company: str, 
+        deadline: Deadline = None
+    ) -> Optional[List[str]]:
+        """
+        RAG lookup within the request's budget. Returns None when it was skipped or timed out.
+        """
+        if deadline and not deadline.allows("kb_search"):
+            deadline.degrade("kb_search")
+            return None
+        try:
+            search = self.knowledge_base.search(query, company=company)
+            return await asyncio.wait_for(search, deadline.timeout("kb_search")) if deadline else await search
+        except asyncio.TimeoutError as e:
+            # Also the builtin TimeoutError (3.11+), which search() may raise on its own
+            if not deadline:
+                logger.warning(f"Failed to search KB: {e}")
+                return []
+            deadline.degrade("kb_search")
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to search KB: {e}")
+            return []
+
+    def _record_research_timeouts(
+        self, 
+        data: Dict[str, Any], 
+        deadline: Deadline
+    ) -> None:
+        for provider, result in data.items():
+            if isinstance(result, dict) and str(result.get("error", "")).endswith("timed out"):
+                deadline.degrade(f"{provider}_timeout")
+
+    def _plan_emitter(
+        self, 
+        company: str, 
+        plan_id: str, 
+        send_callback, 
+        timeline: StageTimeline, 
+        order: List[str]
+    ) -> Tuple[Callable[[str, Any], Awaitable[None]], Dict[str, Any]]:
+        """
+        Returns `emit(section, content)`, which sends a PlanUpdate right away and the section's
+        markdown once every section before it in `order` has been sent, plus the dict of sections sent so far.
+        """
+        message_id = str(uuid.uuid4())
+        sent: Dict[str, Any] = {}
+        flushed = 0
+
+        async def emit(section, content):
+            nonlocal flushed
+            if not sent:
+                timeline.mark("first_section")
+            resent = section in order[:flushed]
+            sent[section] = content
+            await send_callback(PlanUpdate(payload={"plan_id": plan_id, "section": section, "content": content}))
+            if resent:
+                await send_callback(AssistantChunk(payload={"message_id": message_id, "chunk": self._section_markdown(section, content), "plan_id": plan_id}))
+                return
+            while flushed < len(order) and order[flushed] in sent:
+                header = f"# Account Plan for {company}\n\n" if flushed == 0 else ""
+                markdown = self._section_markdown(order[flushed], sent[order[flushed]])
+                await send_callback(AssistantChunk(payload={"message_id": message_id, "chunk": header + markdown, "plan_id": plan_id}))
+                flushed += 1
+
+        return emit, sent
+
+    async def _stream_plan(
+        self, 
+        prompt: str, 
+        tier: str, 
+        company: str, 
+        emit: Callable[[str, Any], Awaitable[None]], 
+        sent: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Stream the plan JSON and emit each section as soon as its value is complete. Falls back
+        to a structured call if the streamed JSON is not a valid plan.
+        """
+        parser = PartialJSONObject()
+        try:
+            async for chunk in self.llm_client.astream(prompt, call_type="plan", tier=tier):
+                if not chunk.content:
+                    continue
+                for section, content in parser.feed(chunk.content):
+                    if section in AccountPlan.model_fields and section not in sent:
+                        await emit(section, content)
+            return AccountPlan.model_validate(parser.value()).model_dump()
+        # Malformed JSON raises a JSONDecodeError mid-stream, an incomplete plan a ValidationError; both are ValueErrors
+        except ValueError as e:
+            logger.warning(f"Streamed plan for {company} is invalid ({len(sent)} sections sent), regenerating: {e}")
+            metrics.incr("plan.stream_fallback")
+            plan_obj = await self.llm_client.ainvoke(prompt, call_type="plan", tier=tier, schema=AccountPlan)
+            plan_data = plan_obj.model_dump()
+            for section, content in plan_data.items():
+                if sent.get(section) != content:
+                    await emit(section, content)
+            return plan_data
+
+    async def _generate_plan_sections(
+        self, 
+        company: str, 
+        research_data: str, 
+        existing_knowledge: str, 
+        tier: str, 
+        emit: Callable[[str, Any], Awaitable[None]]
+    ) -> Dict[str, Any]:
+        """
+        One call per section over the shared compacted research, at most PlanSectionConcurrency
+        at a time. Sections in PlanDependentSections run last, with the drafted sections as context.
+        Raises ValueError if a list section still fails to parse after a retry.
+        """
+        slots = asyncio.Semaphore(settings.PlanSectionConcurrency)
+        drafted: Dict[str, Any] = {}
+
+        async def generate(section, drafted_sections=""):
+            field = AccountPlan.model_fields[section]
+            is_list = field.annotation == List[str]
+            prompt = PromptConfig.PlanSectionGeneration.value.SYSTEM_PROMPT.format(
+                company=company,
+                section=section.replace("_", " ").title(),
+                description=field.description,
+                research_data=research_data,
+                existing_knowledge=existing_knowledge,
+                drafted_sections=drafted_sections,
+                output_format="Return the list of items." if is_list else "Return ONLY the section text."
+            )
+            async with slots:
+                if is_list:
+                    # A structured parse failure comes back as None; retry it once
+                    result = await self.llm_client.ainvoke(prompt, call_type="plan", tier=tier, schema=ListSectionUpdate)
+                    if result is None:
+                        metrics.incr("plan.section_retries")
+                        result = await self.llm_client.ainvoke(prompt, call_type="plan", tier=tier, schema=ListSectionUpdate)
+                    if result is None:
+                        raise ValueError(f"No valid {section} items for {company}")
+                    content = result.items
+                else:
+                    result = await self.llm_client.ainvoke(prompt, call_type="plan", tier=tier)
+                    content = result.content.strip()
+            drafted[section] = content
+            await emit(section, content)
+
+        async def generate_all(coros):
+            # One failed section stops the rest, so nothing is emitted after the caller falls back
+            tasks = [asyncio.create_task(c) for c in coros]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        independent = [s for s in AccountPlan.model_fields if s not in settings.PlanDependentSections]
+        await generate_all(generate(s) for s in independent)
+        context = "".join(self._section_markdown(s, drafted[s]) for s in independent)
+        await generate_all(generate(s, context) for s in settings.PlanDependentSections)
+        return AccountPlan.model_validate(drafted).model_dump()
+
+    async def _stream_section_edit(
+        self, 
+        prompt: str, 
+        section: str, 
+        is_list: bool, 
+        plan_id: str, 
+        send_callback
+    ) -> Any:
+        """
+        Stream a section rewrite to the client as it is generated: text token by token, lists
+        item by item. The first update replaces the section, the following ones append to it.
+        Returns the complete new content.
+        """
+        started = False
+        async def send(content):
+            nonlocal started
+            await send_callback(PlanUpdate(payload={"plan_id": plan_id, "section": section, "content": content, "append": started}))
+            if not started:
+                metrics.observe("edit.first_update", time.perf_counter() - start)
+            started = True
+
+        start = time.perf_counter()
+        if not is_list:
+            new_content = ""
+            async for chunk in self.llm_client.astream(prompt, call_type="edit", tier="standard"):
+                if chunk.content:
+                    new_content += chunk.content
+                    await send(chunk.content)
+            return new_content
+
+        parser = PartialJSONObject()
+        items: List[str] = []
+        try:
+            async for chunk in self.llm_client.astream(prompt, call_type="edit", tier="standard"):
+                if not chunk.content:
+                    continue
+                parser.feed(chunk.content)
+                for key, item in parser.drain_items():
+                    if key == "items":
+                        items.append(str(item))
+                        await send([str(item)])
+            return ListSectionUpdate.model_validate(parser.value()).items
+        # Malformed JSON raises a JSONDecodeError mid-stream, an incomplete list a ValidationError; both are ValueErrors
+        except ValueError as e:
+            logger.warning(f"Streamed {section} list is invalid ({len(items)} items sent), regenerating: {e}")
+            metrics.incr("edit.stream_fallback")
+            response = await self.llm_client.ainvoke(prompt, call_type="edit", tier="standard", schema=ListSectionUpdate)
+            if response is None:
+                raise ValueError(f"No valid {section} items")
+            return response.items
+
+    def _locate_span(
+        self, 
+        content: str, 
+        selected_text: str
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Offsets of the selection in the stored message. The client selects rendered markdown,
+        so when there is no exact match the words are matched with any markup/punctuation between them.
+        """
+        start = content.find(selected_text)
+        if start >= 0:
+            return start, start + len(selected_text)
+        words = re.findall(r"\w+", selected_text)
+        if not words:
+            return None
+        match = re.search(r"\W+".join(re.escape(w) for w in words), content)
+        if not match:
+            return None
+        # Keep punctuation selected after the last word (e.g. "40%") inside the span
+        suffix = re.search(r"\W*$", selected_text).group().strip()
+        end = match.end() + len(suffix) if suffix and content.startswith(suffix, match.end()) else match.end()
+        return match.start(), end
+
+    async def _edit_span(
+        self, 
+        message_id: str, 
+        content: str, 
+        span: Tuple[int, int], 
+        instruction: str, 
+        send_callback
+    ) -> None:
+        """
+        Regenerate only the selected span, with a little surrounding text as context, and splice it in.
+        The replacement is streamed as diff MessageUpdates: the first one replaces the span, the
+        following ones insert each new chunk after what was already sent. Diff offsets are in UTF-16
+        code units, as the client slices strings; the full new content is sent once the stream ends.
+        """
+        start, end = span
+        context = settings.InPlaceEditContextChars
+        prompt = PromptConfig.InPlaceSpanEdit.value.SYSTEM_PROMPT.format(
+            before=content[max(0, start - context):start],
+            selected_text=content[start:end],
+            after=content[end:end + context],
+            message_text=instruction
+        )
+
+        replacement = ""
+        client_start = utf16_len(content[:start])
+        client_end = client_start + utf16_len(content[start:end])
+        try:
+            async for chunk in self.llm_client.astream(prompt, call_type="inplace_edit", tier="standard"):
+                if not chunk.content:
+                    continue
+                if replacement:
+                    position = client_start + utf16_len(replacement)
+                    diff = {"start": position, "end": position, "replacement": chunk.content}
+                else:
+                    diff = {"start": client_start, "end": client_end, "replacement": chunk.content}
+                replacement += chunk.content
+                await send_callback(MessageUpdate(payload={"message_id": message_id, **diff}))
+        except Exception:
+            if replacement:
+                # Put back the original message
+                await send_callback(MessageUpdate(payload={"message_id": message_id, "content": content}))
+            raise
+
+        if not replacement:
+            logger.warning("In-place edit returned no text, keeping the original message")
+            return
+        new_content = content[:start] + replacement + content[end:]
+        await send_callback(MessageUpdate(payload={"message_id": message_id, "content": new_content}))
+        await services.get_repository().update_message_content(message_id, new_content)
+
+        generated, full = estimate_tokens(replacement), estimate_tokens(new_content)
+        metrics.observe("inplace_edit.output_tokens", generated)
+        metrics.incr("inplace_edit.saved_tokens", max(0, full - generated))
+        logger.info(f"In-place edit generated ~{generated} tokens instead of ~{full} for the full message")
+
+    def _section_order(self) -> List[str]:
+        """
+        Order sections are written in: plan order, or dependent sections last when generated per section.
+        """
+        sections = list(AccountPlan.model_fields)
+        if settings.PlanGenerationMode != "sections":
+            return sections
+        return [s for s in sections if s not in settings.PlanDependentSections] + list(settings.PlanDependentSections)
+
+    def _section_markdown(
+        self, 
+        section: str, 
+        content: Any
+    ) -> str:
+        markdown = f"## {section.replace('_', ' ').title()}\n"
+        if isinstance(content, list):
+            for item in content:
+                markdown += f"- {item}\n"
+        else:
+            markdown += f"{content}\n"
+        return markdown + "\n"
+
+    def _compact_research(
+        self, 
+        data: Dict[str, Any], 
+        token_budget: int, 
+        purpose: str
+    ) -> str:
+        """
+        Compact raw provider responses into a ranked, deduplicated snippet list within `token_budget`.
+        """
+        result = self.compactor.compact(data, token_budget)
+        metrics.incr(f"compaction.{purpose}.tokens_before", result.tokens_before)
+        metrics.incr(f"compaction.{purpose}.tokens_after", result.tokens_after)
+        logger.info(
+            f"Compacted research for {purpose}: ~{result.tokens_before} -> ~{result.tokens_after} tokens "
+            f"({len(result.snippets)} snippets kept, {result.dropped} dropped)"
+        )
+        return result.text
+
+    async def generate_plan(
+        self, 
+        company: str, 
+        region: str, 
+        send_callback, 
+        deadline: Deadline, 
+        user_id: str = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Research, draft and persist an account plan, streaming progress and sections through
+        `send_callback`. Returns the plan id, sections and whether it was saved; None when
+        generation failed (the error has been sent).
+        """
+        async def degrade(stage: str, name: str, message: str):
+            deadline.degrade(name)
+            await send_callback(StatusUpdate(payload={"stage": stage, "message": message}))
+
+        # Research and RAG retrieval don't depend on each other
+        await send_callback(
+            StatusUpdate(
+                payload={"stage": "research", "message": f"Gathering information on {company}..."}
+            )
+        )
+        single_provider = not deadline.allows("second_provider")
+        if single_provider:
+            await degrade("research", "single_provider", "Short on time, using a single research source...")
+        if settings.ResearchFanOut:
+            research = self.research_service.research_aspects(
+                company, 
+                self.research_service.plan_sub_queries(company, region, single_provider), 
+                region, 
+                send_callback, 
+                timeout=deadline.timeout("research")
+            )
+        else:
+            research = self.research_service.research_company(
+                company, 
+                region, 
+                send_callback, 
+                timeout=deadline.timeout("research"), 
+                single_provider=single_provider
+            )
+        timeline = StageTimeline("plan")
+        research_data, docs = await asyncio.gather(
+            timeline.run("research", research),
+            timeline.run("kb_search", self._search_knowledge(f"Overview and strategy for {company}", company, deadline))
+        )
+        self._record_research_timeouts(research_data, deadline)
+        existing_knowledge = "\n\n".join(docs or [])
+
+        # Generate Plan
+        await send_callback(
+            StatusUpdate(
+                payload={"stage": "planning", "message": f"Generating plan for {company}..."}
+            )
+        )
+        
+        compacted = self._compact_research(research_data, settings.PlanTokenBudget, "plan")
+        
+        tier = "deep"
+        if not deadline.allows("deep_tier"):
+            await degrade("planning", "deep_tier", "Short on time, drafting a quicker plan...")
+            tier = "standard"
+        
+        try:
+            # The id is known up front so sections can be sent while the plan is still being written
+            plan_id = str(uuid.uuid4())
+            emit, sent = self._plan_emitter(company, plan_id, send_callback, timeline, self._section_order())
+            with timeline.stage("generation"):
+                plan_data = None
+                if settings.PlanGenerationMode == "sections":
+                    try:
+                        plan_data = await self._generate_plan_sections(
+                            company, 
+                            compacted, 
+                            existing_knowledge, 
+                            tier, 
+                            emit
+                        )
+                    except ValueError as e:
+                        logger.warning(f"Per-section plan for {company} failed, falling back to a single call: {e}")
+                        metrics.incr("plan.sections_fallback")
+                if plan_data is None:
+                    prompt = PromptConfig.PlanGeneration.value.SYSTEM_PROMPT.format(
+                        company=company,
+                        research_data=compacted,
+                        existing_knowledge=existing_knowledge,
+                        sections=PLAN_SECTIONS
+                    )
+                    plan_data = await self._stream_plan(prompt, tier, company, emit, sent)
+                    # Sections drafted before a per-section fallback are not streamed again; resend any that changed
+                    for section, content in plan_data.items():
+                        if sent.get(section) != content:
+                            await emit(section, content)
+                timeline.mark("full_plan")
+            started = timeline.stages["generation"][0]
+            first = timeline.marks.get("first_section", timeline.marks["full_plan"]) - started
+            logger.info(f"Plan for {company}: first section after {first:.2f}s, full plan after {timeline.marks['full_plan'] - started:.2f}s")
+            
+            plan_db_data = {"id": plan_id, "company": company, "sections": plan_data}
+            if user_id:
+                plan_db_data["user_id"] = user_id
+            
+            with timeline.stage("persist"):
+                saved = await self.plan_service.create_plan(plan_db_data)
+                persisted = bool(saved and isinstance(saved, dict) and "id" in saved)
+                if persisted:
+                    # Save research data linked to plan
+                    await self.research_service.save_research(company, research_data, saved["id"], user_id=user_id)
+            logger.info(timeline.render())
+            
+            if not persisted:
+                logger.error("Failed to save plan, skipping research save.")
+                await send_callback(AssistantChunk(payload={"message_id": "err_save", "chunk": "Failed to save the generated plan."}))
+            
+            return {"id": plan_id, "sections": plan_data, "saved": persisted}
+        
+        except RateLimitedError as e:
+            logger.warning(f"Plan generation throttled: {e}")
+            await send_callback(AssistantChunk(payload={"message_id": "err_1", "chunk": RATE_LIMITED_MESSAGE}))
+            return None
+        except CircuitOpenError as e:
+            logger.warning(f"Plan generation skipped: {e}")
+            await send_callback(AssistantChunk(payload={"message_id": "err_1", "chunk": UNAVAILABLE_MESSAGE}))
+            return None
+        except Exception as e:
+            logger.error(f"Plan generation failed: {e}")
+            await send_callback(AssistantChunk(payload={"message_id": "err_1", "chunk": "Failed to generate plan."}))
+            return None
 
     async def handle_message(
         self, 
@@ -54,26 +550,34 @@ class Orchestrator:
         save_messages: bool = True
     ) -> None:
         """
-        Runs the LangGraph flow.
+        Runs the LangGraph flow within the request's latency budget.
         """
-        supabase = services.get_supabase()
+        repository = services.get_repository()
+        deadline = Deadline(
+            settings.RequestDeadlineSeconds,
+            stage_minimums=settings.DeadlineStageMinimums,
+            stage_timeouts=settings.DeadlineStageTimeouts
+        )
         
         # Handle In-Place Edit
         if source_message_id:
             try:
                 # Fetch original message
-                orig_msg_res = await supabase.table("messages")\
-                                .select("*")\
-                                .eq("id", source_message_id)\
-                                .single()\
-                                .execute()
+                orig_msg = await repository.get_message(source_message_id)
                 
-                if not orig_msg_res.data:
+                if not orig_msg:
                     logger.error("Original message not found")
                     return
 
-                original_content = orig_msg_res.data["content"]
+                original_content = orig_msg["content"]
                 
+                span = self._locate_span(original_content, selected_text) if selected_text else None
+                if span:
+                    await self._edit_span(source_message_id, original_content, span, message_text, send_callback)
+                    return
+                
+                # Selection not found in the stored text, regenerate the whole message
+                metrics.incr("inplace_edit.full_rewrites")
                 prompt = PromptConfig.InPlaceEdit.value.SYSTEM_PROMPT.format(
                     original_content=original_content,
                     selected_text=selected_text,
@@ -81,11 +585,11 @@ class Orchestrator:
                 )
                 
                 # generate fully then update for in place messages
-                response = await self.llm.ainvoke(prompt)
+                response = await self.llm_client.ainvoke(prompt, call_type="inplace_edit", tier="standard")
                 new_content = response.content
                 
                 # Update DB
-                await supabase.table("messages").update({"content": new_content}).eq("id", source_message_id).execute()
+                await repository.update_message_content(source_message_id, new_content)
                 
                 # Notify frontend
                 await send_callback(MessageUpdate(payload={"message_id": source_message_id, "content": new_content}))
@@ -103,19 +607,21 @@ class Orchestrator:
         # Save user message
         if save_messages:
             try:
-                await supabase.table("messages").insert({
+                await repository.insert_message({
                     "conversation_id": session_id,
                     "role": "user",
                     "content": original_message 
-                }).execute()
+                })
             except Exception as e:
                 logger.error(f"Failed to save user message: {e}")
         
+        async def degrade(stage: str, name: str, message: str):
+            deadline.degrade(name)
+            await send_callback(StatusUpdate(payload={"stage": stage, "message": message}))
+
         # Node Definitions
         
         async def analyze_intent(state: AgentState):
-            structured_llm = self.llm.with_structured_output(IntentAnalysis)
-            
             prompt = ChatPromptTemplate.from_template(
                 PromptConfig.IntentAnalysis.value.SYSTEM_PROMPT
             )
@@ -124,18 +630,27 @@ class Orchestrator:
             if len(state["messages"]) > 1 and isinstance(state["messages"][-2], AIMessage):
                 prev_ai_msg = state["messages"][-2].content
                 
-            chain = prompt | structured_llm
-            
             try:
-                result = await chain.ainvoke({
-                    "message": state["messages"][-1].content,
-                    "prev_ai_message": prev_ai_msg
-                })
+                result = await asyncio.wait_for(
+                    self.llm_client.ainvoke(
+                        prompt.format_messages(
+                            message=state["messages"][-1].content,
+                            prev_ai_message=prev_ai_msg
+                        ),
+                        call_type="intent",
+                        tier="fast",
+                        schema=IntentAnalysis
+                    ),
+                    deadline.timeout("intent")
+                )
                 if result is None:
                     logger.warning("LLM returned None for structured output. Defaulting to Chat.")
                     return {"intent": "chat", "entities": {}}
                 
                 entities_dict = result.entities.dict()
+                if entities_dict.get("company"):
+                    # Learn (and persist) the alias, lookups further down match on the canonical key
+                    await companies.resolve(entities_dict["company"])
                 
                 # Broadcast detected intent
                 mode_msg = "Chatting..."
@@ -153,9 +668,12 @@ class Orchestrator:
                     return {"intent": "research_company", "entities": entities_dict}
                     
                 return {"intent": result.intent, "entities": entities_dict}
+            except asyncio.TimeoutError:
+                await degrade("intent", "intent", "Chatting...")
+                return {"intent": "chat", "entities": {}}
             except Exception as e:
                 logger.error(f"Intent analysis failed: {e}")
-                await send_callback(StatusUpdate(payload={"stage": "intent", "status": "Chatting..."}))
+                await send_callback(StatusUpdate(payload={"stage": "intent", "message": "Chatting..."}))
                 return {"intent": "chat", "entities": {}}
 
         async def research_node(state: AgentState):
@@ -177,42 +695,120 @@ class Orchestrator:
                     # If a follow-up, we append the user's answer to the previous context for the query
                     user_query = f"Context: {last_ai} User Answer: {user_query}. Perform research based on this decision."
 
-            query_gen_llm = self.llm.with_structured_output(SearchQueries)
-            
+            # Resume only a direct answer to the question we asked, while its research is still fresh
+            pending = state.get("pending_research") or {}
+            answers_question = (
+                is_followup
+                and bool(pending.get("question"))
+                and state["messages"][-2].content.strip() == pending["question"].strip()
+            )
+            fresh = time.time() - pending.get("asked_at", 0) < settings.PendingResearchTTL
+            same_company = company is None or (pending.get("company") and companies.key(company) == companies.key(pending["company"]))
+            resume = answers_question and fresh and bool(pending.get("data")) and same_company
+            if resume:
+                company = pending["company"]
+                region = pending.get("region") or region
+
             prev_history = ""
             if len(state["messages"]) > 1:
                 prev_history = "\n".join([f"{m.type}: {m.content}" for m in state["messages"][-3:-1]])
 
-            query_prompt = PromptConfig.QueryGeneration.value.SYSTEM_PROMPT.format(
-                company=company,
-                user_message=user_query,
-                prev_history=prev_history
-            )
+            # Fresh research fans out over aspect sub-queries, a resumed one only needs a single delta query
+            fan_out = settings.ResearchFanOut and not resume
+            if fan_out:
+                query_prompt = PromptConfig.AspectQueryGeneration.value.SYSTEM_PROMPT.format(
+                    company=company,
+                    user_message=user_query,
+                    prev_history=prev_history,
+                    aspects=", ".join(settings.ResearchAspects),
+                    max_queries=settings.FanOutMaxQueries
+                )
+            else:
+                query_prompt = PromptConfig.QueryGeneration.value.SYSTEM_PROMPT.format(
+                    company=company,
+                    user_message=user_query,
+                    prev_history=prev_history
+                )
             
-            try:
-                queries = await query_gen_llm.ainvoke(query_prompt)
-                tavily_q = queries.tavily_query
-                perplexity_q = queries.perplexity_query
-                
-                await send_callback(StatusUpdate(payload={"stage": "research", "message": f"Generated queries:\n1. {tavily_q}\n2. {perplexity_q}"}))
-            except Exception as e:
-                logger.error(f"Query generation failed: {e}")
-                tavily_q = user_query
-                perplexity_q = user_query
+            tavily_q = user_query
+            perplexity_q = user_query
+            sub_queries: List[SubQuery] = []
+            if not deadline.allows("query_generation"):
+                await degrade("research", "query_generation", "Short on time, searching with your message as-is...")
+            else:
+                try:
+                    queries = await asyncio.wait_for(
+                        self.llm_client.ainvoke(
+                            query_prompt, 
+                            call_type="query_generation", 
+                            tier="fast", 
+                            schema=ResearchQueries if fan_out else SearchQueries
+                        ),
+                        deadline.timeout("query_generation")
+                    )
+                    if fan_out:
+                        sub_queries = queries.queries
+                        listing = "\n".join(f"{i}. [{sq.aspect}] {sq.query}" for i, sq in enumerate(sub_queries, 1))
+                    else:
+                        tavily_q = queries.tavily_query
+                        perplexity_q = queries.perplexity_query
+                        listing = f"1. {tavily_q}\n2. {perplexity_q}"
+                    
+                    await send_callback(StatusUpdate(payload={"stage": "research", "message": f"Generated queries:\n{listing}"}))
+                except asyncio.TimeoutError:
+                    deadline.degrade("query_generation")
+                except Exception as e:
+                    logger.error(f"Query generation failed: {e}")
 
-            await send_callback(
-                StatusUpdate(
-                    payload={"stage": "research", "message": f"Starting research on {company}..."}
+            if resume:
+                # Reuse the research saved with the question, only search for what the answer adds
+                await send_callback(
+                    StatusUpdate(
+                        payload={"stage": "research", "message": f"Continuing research on {company} with your answer..."}
                     )
                 )
-            
-            data = await self.research_service.research_company(
-                company, 
-                region, 
-                send_callback, 
-                tavily_query=tavily_q, 
-                perplexity_query=perplexity_q
-            )
+                delta = await self.research_service.research_company(
+                    company, 
+                    region, 
+                    send_callback, 
+                    tavily_query=tavily_q, 
+                    timeout=deadline.timeout("research"),
+                    single_provider=True
+                )
+                data = self.research_service.merge_research(pending["data"], delta)
+                metrics.incr("research.resumed")
+            else:
+                await send_callback(
+                    StatusUpdate(
+                        payload={"stage": "research", "message": f"Starting research on {company}..."}
+                        )
+                    )
+                
+                single_provider = not deadline.allows("second_provider")
+                if single_provider:
+                    await degrade("research", "single_provider", "Short on time, using a single research source...")
+                if sub_queries:
+                    if single_provider:
+                        sub_queries = [sq.model_copy(update={"provider": "tavily"}) for sq in sub_queries]
+                    data = await self.research_service.research_aspects(
+                        company, 
+                        sub_queries, 
+                        region, 
+                        send_callback, 
+                        timeout=deadline.timeout("research")
+                    )
+                else:
+                    data = await self.research_service.research_company(
+                        company, 
+                        region, 
+                        send_callback, 
+                        tavily_query=tavily_q, 
+                        perplexity_query=perplexity_q,
+                        timeout=deadline.timeout("research"),
+                        single_provider=single_provider
+                    )
+            self._record_research_timeouts(data, deadline)
+            pending_research = {"company": company, "region": region, "data": data}
             
             # EVALUATION STEP: Check for ambiguity
             # Only do this if a question isn't just asked (to avoid infinite loops)
@@ -220,47 +816,111 @@ class Orchestrator:
             
             should_ask_user = False
             question_to_user = ""
+            # Single-pass mode folds the review into the report call, see below
+            single_pass = settings.SinglePassResearch and not is_followup
+            needs_review = not is_followup and not single_pass
+            
+            conflicts = []
+            if needs_review and settings.LocalConflictCheck:
+                conflicts = self.conflict_detector.find_conflicts(self.compactor.normalize(data))
+                metrics.incr("evaluation.conflict_checks")
+                if not conflicts:
+                    # The review exists to catch conflicting figures, skip the LLM round trip without any
+                    metrics.incr("evaluation.skipped")
+                    logger.info("No conflicting figures in research, skipping evaluation")
+                    needs_review = False
             
-            if not is_followup:
+            if needs_review and not deadline.allows("evaluation"):
+                await degrade("research", "evaluation", "Short on time, skipping the research review...")
+            elif needs_review:
+                research_data = self._compact_research(data, settings.EvaluationTokenBudget, "evaluation")
+                if conflicts:
+                    flagged = "\n".join(f"- {c.describe()}" for c in conflicts)
+                    research_data = f"Conflicting figures flagged by automated checks:\n{flagged}\n\n{research_data}"
                 eval_prompt = PromptConfig.ResearchEvaluation.value.SYSTEM_PROMPT.format(
                     company=company,
-                    research_data=json.dumps(data)[:5000]
+                    research_data=research_data
                 )
                 
-                eval_response = await self.llm.ainvoke(eval_prompt)
-                eval_content = eval_response.content.strip()
+                eval_content = ""
+                try:
+                    eval_response = await asyncio.wait_for(
+                        self.llm_client.ainvoke(eval_prompt, call_type="evaluation", tier="fast"),
+                        deadline.timeout("evaluation")
+                    )
+                    eval_content = eval_response.content.strip()
+                except asyncio.TimeoutError:
+                    await degrade("research", "evaluation", "Research review took too long, moving on...")
                 
-                if "QUESTION:" in eval_content: 
+                if QUESTION_MARKER in eval_content: 
                     should_ask_user = True
                     # Extract question even if it's not at the start
-                    question_to_user = eval_content.split("QUESTION:")[-1].strip()
+                    question_to_user = eval_content.split(QUESTION_MARKER)[-1].strip()
             
             if should_ask_user:
-                # Send question to user and STOP
+                # Send question to user and STOP, keeping the research for the answer
                 await send_callback(AssistantChunk(payload={"message_id": "q_1", "chunk": question_to_user}))
-                return {"messages": state["messages"] + [AIMessage(content=question_to_user)]}
+                return {
+                    "messages": state["messages"] + [AIMessage(content=question_to_user)],
+                    "pending_research": {**pending_research, "question": question_to_user, "asked_at": time.time()}
+                }
             
             # Synthesize Report
             await send_callback(StatusUpdate(payload={"stage": "research", "message": "Synthesizing comprehensive report..."}))
             
-            summary_prompt = PromptConfig.ResearchSynthesis.value.SYSTEM_PROMPT.format(
+            research_data = self._compact_research(data, settings.SynthesisTokenBudget, "synthesis")
+            if resume:
+                research_data = f"User clarification: {user_query}\n\n{research_data}"
+            synthesis_prompt = PromptConfig.ResearchReviewAndSynthesis if single_pass else PromptConfig.ResearchSynthesis
+            summary_prompt = synthesis_prompt.value.SYSTEM_PROMPT.format(
                 company=company,
-                research_data=json.dumps(data)
+                research_data=research_data
             )
             
+            tier = "deep"
+            if not deadline.allows("deep_tier"):
+                await degrade("research", "deep_tier", "Short on time, writing a quicker report...")
+                tier = "standard"
+            
             # Generate ID for the message
             message_id = str(uuid.uuid4())
             
             full_summary = ""
-            async for chunk in self.llm.astream(summary_prompt):
+            # In single-pass mode the opening tokens are held back until they show whether
+            # the reply is a clarification question or the report itself
+            is_question = None if single_pass else False
+            async for chunk in self.llm_client.astream(summary_prompt, call_type="synthesis", tier=tier):
                 content = chunk.content
-                if content:
-                    full_summary += content
+                if not content:
+                    continue
+                full_summary += content
+                if is_question is None:
+                    head = full_summary.lstrip().lstrip('"').upper()
+                    if QUESTION_MARKER.startswith(head):
+                        continue
+                    is_question = head.startswith(QUESTION_MARKER)
+                    content = full_summary
+                if not is_question:
                     await send_callback(AssistantChunk(payload={"message_id": message_id, "chunk": content}))
             
+            if single_pass:
+                metrics.incr("research.single_pass.questions" if is_question else "research.single_pass.reports")
+            if is_question:
+                question_to_user = full_summary.split(QUESTION_MARKER, 1)[-1].strip().strip('"')
+                await send_callback(AssistantChunk(payload={"message_id": "q_1", "chunk": question_to_user}))
+                return {
+                    "messages": state["messages"] + [AIMessage(content=question_to_user)],
+                    "pending_research": {**pending_research, "question": question_to_user, "asked_at": time.time()}
+                }
+            if is_question is None and full_summary:
+                # Reply shorter than the marker, flush what was held back
+                await send_callback(AssistantChunk(payload={"message_id": message_id, "chunk": full_summary}))
+            
             summary_resp = AIMessage(content=full_summary, id=message_id)
+            # Fresh research is on its way into the KB, drop stale chat context
+            self.context_cache.invalidate(session_id)
             
-            return {"research_data": data, "messages": state["messages"] + [summary_resp]}
+            return {"research_data": data, "pending_research": {}, "messages": state["messages"] + [summary_resp]}
 
         async def plan_node(state: AgentState):
             company = state["entities"].get("company")
@@ -276,91 +936,10 @@ class Orchestrator:
                 )
                 return {"messages": state["messages"] + [AIMessage(content="I need to know the company name to generate a plan.")]}
             
-            # Perform Research
-            await send_callback(
-                StatusUpdate(
-                    payload={"stage": "research", "message": f"Gathering information on {company}..."}
-                )
-            )
-            research_data = await self.research_service.research_company(company, region, send_callback)
-
-            # Generate Plan
-            await send_callback(
-                StatusUpdate(
-                    payload={"stage": "planning", "message": f"Generating plan for {company}..."}
-                )
-            )
-            
-            structured_llm = self.llm.with_structured_output(AccountPlan)
-
-            # RAG retrieval
-            existing_knowledge = ""
-            try:
-                docs = await self.knowledge_base.search(f"Overview and strategy for {company}", company=company)
-                if docs:
-                    existing_knowledge = "\n\n".join(docs)
-
-            except Exception as e:
-                logger.warning(f"Failed to search KB in plan_node: {e}")
-            
-            prompt = PromptConfig.PlanGeneration.value.SYSTEM_PROMPT.format(
-                company=company,
-                research_data=json.dumps(research_data),
-                existing_knowledge=existing_knowledge
-            )
-            
-            try:
-                plan_obj = await structured_llm.ainvoke(prompt)
-      
-                plan_data = plan_obj.dict()
-                
-                plan_db_data = {"company": company, "sections": plan_data}
-                if state.get("user_id"):
-                    plan_db_data["user_id"] = state["user_id"]
-                
-                saved = await self.plan_service.create_plan(plan_db_data)
-                
-                if saved and isinstance(saved, dict) and "id" in saved:
-                    plan_id = saved["id"]
-                    # Save research data linked to plan
-                    await self.research_service.save_research(company, research_data, plan_id, user_id=state.get("user_id"))
-                    
-                    # Stream the plan as markdown
-                    markdown_plan = f"# Account Plan for {company}\n\n"
-                    for section, content in plan_data.items():
-                        await send_callback(
-                            PlanUpdate(
-                                payload={"plan_id": plan_id, "section": section, "content": content}
-                            )
-                        )
-                        
-                        # Format as markdown
-                        markdown_plan += f"## {section.replace('_', ' ').title()}\n"
-                        if isinstance(content, list):
-                            for item in content:
-                                markdown_plan += f"- {item}\n"
-                        else:
-                            markdown_plan += f"{content}\n"
-                        markdown_plan += "\n"
-                    
-                    # Stream the markdown content
-                    message_id = str(uuid.uuid4())
-                    await send_callback(
-                        AssistantChunk(
-                            payload={"message_id": message_id, "chunk": markdown_plan}
-                        )
-                    )
-                    
-                else:
-                    logger.error("Failed to save plan, skipping research save.")
-                    await send_callback(AssistantChunk(payload={"message_id": "err_save", "chunk": "Failed to save the generated plan."}))
-                
-                return {"plan_data": plan_data, "messages": state["messages"] + [AIMessage(content=f"I have generated the account plan for {company}.")]}
-            
-            except Exception as e:
-                logger.error(f"Plan generation failed: {e}")
-                await send_callback(AssistantChunk(payload={"message_id": "err_1", "chunk": "Failed to generate plan."}))
+            plan = await self.generate_plan(company, region, send_callback, deadline, user_id=state.get("user_id"))
+            if not plan:
                 return {}
+            return {"plan_data": plan["sections"], "messages": state["messages"] + [AIMessage(content=f"I have generated the account plan for {company}.")]}
 
         async def edit_node(state: AgentState):
             company = state["entities"].get("company")
@@ -394,22 +973,15 @@ class Orchestrator:
             plan_id = plan["id"]
             
             # RAG retrieval
-            existing_knowledge = ""
-            try:
-                # Use the user's instruction as the query
-                query = state['messages'][-1].content
-                docs = await self.knowledge_base.search(query, company=company)
-                if docs:
-                    existing_knowledge = "\n\n".join(docs)
-            except Exception as e:
-                logger.warning(f"Failed to search KB in edit_node: {e}")
+            # Use the user's instruction as the query
+            docs = await self._search_knowledge(state['messages'][-1].content, company, deadline)
+            existing_knowledge = "\n\n".join(docs or [])
 
             # Generate new content
             list_fields = ["strategic_priorities", "opportunities", "risks"]
+            is_list = section in list_fields
             
-            if section in list_fields:                
-                structured_llm = self.llm.with_structured_output(ListSectionUpdate)
-                
+            if is_list:                
                 prompt = PromptConfig.EditListSection.value.SYSTEM_PROMPT.format(
                     section=section,
                     company=company,
@@ -417,18 +989,6 @@ class Orchestrator:
                     existing_knowledge=existing_knowledge,
                     user_instruction=state['messages'][-1].content
                 )
-                
-                try:
-                    response = await structured_llm.ainvoke(prompt)
-                    new_content = response.items
-                except Exception as e:
-                    logger.error(f"Failed to generate list update: {e}")
-                    await send_callback(
-                        AssistantChunk(
-                            payload={"message_id": "err_edit", "chunk": "Failed to update list section."}
-                        )
-                    )
-                    return {}
             else:
                 # Text fields
                 prompt = PromptConfig.EditTextSection.value.SYSTEM_PROMPT.format(
@@ -438,14 +998,30 @@ class Orchestrator:
                     existing_knowledge=existing_knowledge,
                     user_instruction=state['messages'][-1].content
                 )
-                
-                response = await self.llm.ainvoke(prompt)
-                new_content = response.content
             
-            # Update DB
+            try:
+                new_content = await self._stream_section_edit(prompt, section, is_list, plan_id, send_callback)
+            except Exception as e:
+                logger.error(f"Failed to generate {section} update: {e}")
+                # Put back what the client had before the partial edit
+                await send_callback(PlanUpdate(payload={"plan_id": plan_id, "section": section, "content": current_content}))
+                await send_callback(
+                    AssistantChunk(
+                        payload={
+                            "message_id": "err_edit", 
+                            "chunk": RATE_LIMITED_MESSAGE if isinstance(e, RateLimitedError)
+                                else UNAVAILABLE_MESSAGE if isinstance(e, CircuitOpenError)
+                                else f"Failed to update {'list ' if is_list else ''}section."
+                        }
+                    )
+                )
+                return {}
+            
+            # Update DB once the stream is complete
             updated_plan = await self.plan_service.update_section(plan_id, section, new_content)
             
             if updated_plan:
+                # Final full content, the client's copy of the section is authoritative from here
                 await send_callback(
                     PlanUpdate(
                         payload={"plan_id": plan_id, "section": section, "content": new_content}
@@ -457,6 +1033,7 @@ class Orchestrator:
                     )
                 )
             else:
+                await send_callback(PlanUpdate(payload={"plan_id": plan_id, "section": section, "content": current_content}))
                 await send_callback(
                     AssistantChunk(
                         payload={"message_id": "err_save", "chunk": "Failed to save updates."}
@@ -473,7 +1050,17 @@ class Orchestrator:
             if company:
                 # We assume the last message is the query
                 last_msg = state["messages"][-1].content
-                docs = await self.knowledge_base.search(last_msg, company=company)
+                docs = self.context_cache.lookup(session_id, company, last_msg)
+                if docs is None:
+                    start = time.perf_counter()
+                    docs = await self._search_knowledge(last_msg, company, deadline)
+                    if docs:
+                        self.context_cache.store(session_id, company, last_msg, docs, time.perf_counter() - start)
+                else:
+                    logger.info(
+                        f"Reused cached context for {company} "
+                        f"(skip rate {self.context_cache.skip_rate:.0%}, ~{self.context_cache.estimated_saving:.2f}s saved)"
+                    )
                 if docs:
                     context_text = "\n\n".join(docs)
             
@@ -489,7 +1076,7 @@ class Orchestrator:
             message_id = str(uuid.uuid4())
             
             full_response = ""
-            async for chunk in self.llm.astream(messages):
+            async for chunk in self.llm_client.astream(messages, call_type="chat", tier="standard"):
                 content = chunk.content
                 if content:
                     full_response += content
@@ -506,11 +1093,17 @@ class Orchestrator:
         
         workflow = StateGraph(AgentState)
         
+        def clears_pending(node):
+            # Any other turn closes an open clarification question
+            async def run(state: AgentState):
+                return {**(await node(state) or {}), "pending_research": {}}
+            return run
+
         workflow.add_node("analyze_intent", analyze_intent)
         workflow.add_node("research_agent", research_node)
-        workflow.add_node("plan_agent", plan_node)
-        workflow.add_node("edit_agent", edit_node)
-        workflow.add_node("chat_agent", chat_node)
+        workflow.add_node("plan_agent", clears_pending(plan_node))
+        workflow.add_node("edit_agent", clears_pending(edit_node))
+        workflow.add_node("chat_agent", clears_pending(chat_node))
         
         workflow.set_entry_point("analyze_intent")
         
@@ -541,22 +1134,22 @@ class Orchestrator:
         workflow.add_edge("edit_agent", END)
         workflow.add_edge("chat_agent", END)
         
-        app = workflow.compile()
+        # Checkpoints keep state such as pending research between turns of the same session
+        try:
+            checkpointer = services.get_checkpointer()
+        except RuntimeError:
+            checkpointer = None
+        app = workflow.compile(checkpointer=checkpointer)
         
         # Fetch chat history
         history_messages = []
         try:
             # Fetch last 10 messages for context
-            hist_res = await supabase.table("messages")\
-                .select("*")\
-                .eq("conversation_id", session_id)\
-                .order("created_at", desc=True)\
-                .limit(10)\
-                .execute()
-            
-            if hist_res.data:
+            recent = await repository.recent_messages(session_id, 10)
+            
+            if recent:
                 # Reverse to chronological order
-                for msg in reversed(hist_res.data):
+                for msg in reversed(recent):
                     if msg["role"] == "user":
                         history_messages.append(HumanMessage(content=msg["content"]))
                     elif msg["role"] == "assistant":
@@ -584,7 +1177,19 @@ class Orchestrator:
             "user_id": user_id
         }
         
-        final_state = await app.ainvoke(initial_state)
+        # Fallback session ids ("default_session", "temp") are shared, keep users apart
+        thread_id = f"{user_id}:{session_id}" if user_id else session_id
+        try:
+            final_state = await app.ainvoke(initial_state, config={"configurable": {"thread_id": thread_id}})
+        finally:
+            logger.info(deadline.report())
+
+        if checkpointer and not final_state.get("pending_research"):
+            # Checkpoints only carry open clarification questions, nothing to keep otherwise
+            try:
+                await checkpointer.adelete_thread(thread_id)
+            except Exception as e:
+                logger.warning(f"Failed to drop checkpoints of {thread_id}: {e}")
         
         # Assume the last message in 'messages' is the ai's response if it's an AIMessage.
         
@@ -599,12 +1204,30 @@ class Orchestrator:
                 if last_msg.id:
                     msg_data["id"] = last_msg.id
                     
-                await supabase.table("messages")\
-                    .insert(msg_data)\
-                    .execute()
+                await repository.insert_message(msg_data)
             except Exception as e:
                 logger.error(f"Failed to save assistant message: {e}")
 
+    @staticmethod
+    async def prune_checkpoints(
+        checkpointer,
+        max_age_seconds: float
+    ) -> int:
+        """
+        Drop checkpoint threads whose clarification question is older than `max_age_seconds`
+        (sessions that never answered). Returns the number of threads removed.
+        """
+        latest = {}
+        async for item in checkpointer.alist(None):
+            thread_id = item.config["configurable"]["thread_id"]
+            ts = datetime.fromisoformat(item.checkpoint["ts"]).timestamp()
+            latest[thread_id] = max(ts, latest.get(thread_id, 0.0))
+        stale = [thread_id for thread_id, ts in latest.items() if time.time() - ts > max_age_seconds]
+        for thread_id in stale:
+            await checkpointer.adelete_thread(thread_id)
+        return len(stale)
+
     async def aclose(self):
         if self.research_service:
             await self.research_service.aclose()
+        self.llm_client.close()
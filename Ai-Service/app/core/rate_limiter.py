@@ -0,0 +1,171 @@
+from contextlib import asynccontextmanager
+from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
+from typing import List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import time
+
+settings = Config.Config.from_env()
+
+THROTTLE_MARKERS = ("429", "resource_exhausted", "resource exhausted", "quota", "rate limit", "too many requests")
+
+class RateLimitedError(Exception):
+    """
+    The provider rejected the call because the quota or rate limit was reached.
+    """
+
+
+def is_throttle_error(
+    error: BaseException
+) -> bool:
+    if isinstance(error, RateLimitedError):
+        return True
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class AdaptiveLimiter:
+    """
+    Shared limiter for one provider: a token bucket caps the request rate and an
+    AIMD concurrency limit adapts to throttling (additive increase on success,
+    multiplicative decrease on 429). Waiters are served by priority, lowest first,
+    so interactive calls overtake bulk work.
+    """
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        initial_concurrency: int = 8,
+        decrease_factor: float = 0.5
+    ) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.limit = float(initial_concurrency)
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._inflight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: int = 1
+    ):
+        """
+        Hold one request slot. Throttling errors raised inside shrink the concurrency limit.
+        """
+        await self._acquire(priority)
+        try:
+            yield
+        except BaseException as e:
+            if is_throttle_error(e):
+                self._on_throttle()
+            raise
+        else:
+            self._on_success()
+        finally:
+            self._inflight -= 1
+            self._dispatch()
+
+    async def _acquire(
+        self,
+        priority: int
+    ) -> None:
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled, hand it back
+                self._inflight -= 1
+                self._dispatch()
+            raise
+        metrics.observe(f"ratelimit.{self.name}.wait", time.monotonic() - start)
+        metrics.observe(f"ratelimit.{self.name}.wait.p{priority}", time.monotonic() - start)
+
+    def _dispatch(self) -> None:
+        self._refill()
+        while self._waiters and self._inflight < int(self.limit):
+            if self._tokens < 1:
+                self._schedule_wakeup((1 - self._tokens) / self.rate)
+                break
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            self._inflight += 1
+            future.set_result(None)
+        self._update_gauges()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _schedule_wakeup(
+        self,
+        delay: float
+    ) -> None:
+        if self._wakeup is not None:
+            return
+        def wake():
+            self._wakeup = None
+            self._dispatch()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, wake)
+
+    def _on_success(self) -> None:
+        # Additive increase: roughly +1 per limit's worth of successful calls
+        self.limit = min(self.max_concurrency, self.limit + 1 / max(1.0, self.limit))
+
+    def _on_throttle(self) -> None:
+        self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+        metrics.incr(f"ratelimit.{self.name}.throttled")
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge(f"ratelimit.{self.name}.queue_depth", len(self._waiters))
+        metrics.set_gauge(f"ratelimit.{self.name}.inflight", self._inflight)
+        metrics.set_gauge(f"ratelimit.{self.name}.concurrency_limit", round(self.limit, 2))
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+
+def priority_for(
+    call_type: str
+) -> int:
+    return settings.CallPriorities.get(call_type, settings.CallPriorities.get("default", 1))
+
+
+gemini_limiter = AdaptiveLimiter(
+    "gemini",
+    rate=settings.GeminiRequestsPerSecond,
+    burst=settings.GeminiBurst,
+    max_concurrency=settings.GeminiMaxConcurrency,
+    initial_concurrency=settings.GeminiInitialConcurrency
+)
+
+embedding_limiter = AdaptiveLimiter(
+    "embeddings",
+    rate=settings.EmbeddingRequestsPerSecond,
+    burst=settings.EmbeddingBurst,
+    max_concurrency=settings.EmbeddingMaxConcurrency,
+    initial_concurrency=settings.EmbeddingInitialConcurrency
+)
@@ -0,0 +1,243 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+from app.core.rate_limiter import is_throttle_error
+from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
+from app.utils.logger import logger
+import asyncio
+import random
+import time
+
+settings = Config.Config.from_env()
+
+T = TypeVar("T")
+
+TRANSIENT_MARKERS = ("timeout", "timed out", "unavailable", "connection", "reset by peer", "500", "502", "503", "504")
+
+class CircuitOpenError(Exception):
+    """
+    The provider's circuit breaker is open; the call was rejected without being sent.
+    """
+
+
+def is_transient_error(
+    error: BaseException
+) -> bool:
+    """
+    Errors that count against a provider's health: timeouts, connection failures and 5xx.
+    Throttling is retried but handled by the rate limiters, not the breaker.
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive transient failures.
+    Open -> half-open after `reset_timeout`, letting one probe call through;
+    the probe's outcome closes or re-opens the circuit.
+    """
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_inflight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._transition("half_open")
+        if self.state == "half_open" and not self._probe_inflight:
+            self._probe_inflight = True
+            return True
+        return False
+
+    def is_open(self) -> bool:
+        return self.state == "open" and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probe_inflight = False
+        if self.state != "closed":
+            self._transition("closed")
+
+    def release_probe(self) -> None:
+        self._probe_inflight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_inflight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            if self.state != "open":
+                self._transition("open")
+
+    def _transition(
+        self,
+        state: str
+    ) -> None:
+        logger.warning(f"Circuit '{self.name}' {self.state} -> {state}")
+        self.state = state
+        metrics.incr(f"resilience.{self.name}.{state}")
+        metrics.set_gauge(f"resilience.{self.name}.open", 1 if state == "open" else 0)
+
+
+class ProviderRegistry:
+    """
+    Per-provider timeouts, bounded jittered retries and circuit breakers.
+    """
+    def __init__(
+        self,
+        policies: Dict[str, "Config.ProviderPolicyConfig"]
+    ) -> None:
+        self.policies = policies
+        self.breakers = {
+            name: CircuitBreaker(name, p.FAILURE_THRESHOLD, p.RESET_TIMEOUT)
+            for name, p in policies.items()
+        }
+
+    def breaker(
+        self,
+        provider: str
+    ) -> CircuitBreaker:
+        return self.breakers[provider]
+
+    def is_open(
+        self,
+        provider: str
+    ) -> bool:
+        return self.breakers[provider].is_open()
+
+    def backoff(
+        self,
+        provider: str,
+        attempt: int
+    ) -> float:
+        """
+        Full-jitter exponential backoff before retry number `attempt` (0-based).
+        """
+        policy = self.policies[provider]
+        return random.uniform(0, min(policy.MAX_DELAY, policy.BASE_DELAY * (2 ** attempt)))
+
+    async def call(
+        self,
+        provider: str,
+        fn: Callable[[], Awaitable[T]],
+        retries: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run `fn` under the provider's policy. Raises CircuitOpenError when the provider is
+        failing fast, otherwise the last error once retries are exhausted.
+        """
+        policy = self.policies[provider]
+        breaker = self.breakers[provider]
+        retries = policy.RETRIES if retries is None else retries
+        timeout = policy.TIMEOUT if timeout is None else timeout
+
+        attempt = 0
+        while True:
+            self._admit(provider)
+            start = time.monotonic()
+            try:
+                result = await (asyncio.wait_for(fn(), timeout) if timeout else fn())
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                metrics.observe(f"resilience.{provider}.latency", time.monotonic() - start)
+                await self._before_retry(provider, e, attempt, retries)
+                attempt += 1
+            else:
+                metrics.observe(f"resilience.{provider}.latency", time.monotonic() - start)
+                breaker.record_success()
+                return result
+
+    async def stream(
+        self,
+        provider: str,
+        factory: Callable[[], AsyncIterator[T]],
+        retries: Optional[int] = None
+    ) -> AsyncIterator[T]:
+        """
+        `call` for streaming responses. A failed stream is retried only while nothing
+        has been yielded yet; no overall timeout is applied.
+        """
+        breaker = self.breakers[provider]
+        retries = self.policies[provider].RETRIES if retries is None else retries
+
+        attempt = 0
+        while True:
+            self._admit(provider)
+            started = False
+            try:
+                async for item in factory():
+                    started = True
+                    yield item
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                if started:
+                    if is_transient_error(e):
+                        breaker.record_failure()
+                    else:
+                        breaker.release_probe()
+                    raise
+                await self._before_retry(provider, e, attempt, retries)
+                attempt += 1
+            else:
+                breaker.record_success()
+                return
+
+    def _admit(
+        self,
+        provider: str
+    ) -> None:
+        if not self.breakers[provider].allow():
+            metrics.incr(f"resilience.{provider}.rejected")
+            raise CircuitOpenError(f"{provider} circuit is open")
+
+    async def _before_retry(
+        self,
+        provider: str,
+        error: Exception,
+        attempt: int,
+        retries: int
+    ) -> None:
+        """
+        Record a failed attempt, then either re-raise it or sleep before the next one.
+        """
+        breaker = self.breakers[provider]
+        if is_throttle_error(error):
+            breaker.release_probe()
+        elif is_transient_error(error):
+            breaker.record_failure()
+            metrics.incr(f"resilience.{provider}.failures")
+        else:
+            # Caller/data errors say nothing about provider health
+            breaker.record_success()
+            raise error
+        if attempt >= retries:
+            raise error
+
+        delay = self.backoff(provider, attempt)
+        metrics.incr(f"resilience.{provider}.retries")
+        logger.warning(f"{provider} call failed ({type(error).__name__}: {error}), retry {attempt + 1}/{retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+providers = ProviderRegistry(settings.ProviderPolicies)
@@ -0,0 +1,26 @@
+from app.Config.dataConfig import Config
+import json
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+settings = Config.Config.from_env()
+
+async def _init_connection(conn) -> None:
+    # JSONB in and out as Python objects, like the Supabase client returns them
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+async def get_postgres_pool():
+    if asyncpg is None:
+        raise RuntimeError("DataBackend 'asyncpg' needs the postgres extra installed (uv sync --extra postgres)")
+    if not settings.DATABASE_URL:
+        raise ValueError("DATABASE_URL must be set")
+    return await asyncpg.create_pool(
+        settings.DATABASE_URL,
+        min_size=settings.PostgresPoolMinSize,
+        max_size=settings.PostgresPoolMaxSize,
+        statement_cache_size=settings.PostgresStatementCacheSize,
+        init=_init_connection
+    )
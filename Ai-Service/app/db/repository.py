@@ -0,0 +1,286 @@
+from app.services.research_store import to_bytea
+from app.Config.queryConfig import QueryConfig
+from app.states.global_state import services
+from typing import Any, Dict, List, Optional
+from abc import ABC, abstractmethod
+from datetime import datetime
+import uuid
+
+queries = QueryConfig.PostgresQueries()
+
+
+class Repository(ABC):
+    """
+    Hot-path data access shared by the orchestrator and services, over either the Supabase
+    REST client or a direct asyncpg pool (`DataBackend`). Rows come back as dicts shaped like
+    PostgREST returns them: ids and timestamps as strings, JSONB as Python objects.
+    Errors are raised, callers keep their own handling.
+    """
+    # Messages
+    @abstractmethod
+    async def get_message(self, message_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def recent_messages(self, conversation_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Newest first."""
+
+    @abstractmethod
+    async def insert_message(self, data: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    async def update_message_content(self, message_id: str, content: str) -> None: ...
+
+    # Account plans
+    @abstractmethod
+    async def insert_plan(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def get_plan(self, plan_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def latest_plan(self, company_key: str, company: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Latest plan by canonical company key, else by exact name (rows saved before company keys)."""
+
+    @abstractmethod
+    async def get_plan_sections(self, plan_id: str) -> Optional[Dict[str, Any]]:
+        """`sections` and `updated_at` of a plan."""
+
+    @abstractmethod
+    async def update_plan_sections(
+        self,
+        plan_id: str,
+        sections: Dict[str, Any],
+        updated_at: datetime,
+        expected_updated_at: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The updated row, None when no row matched (including an `updated_at` mismatch)."""
+
+    # Research
+    @abstractmethod
+    async def insert_research(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """`raw` is bytes. Returns the stored row, at least its id."""
+
+
+class SupabaseRepository(Repository):
+    @property
+    def client(self):
+        return services.get_supabase()
+
+    async def get_message(
+        self,
+        message_id: str
+    ) -> Optional[Dict[str, Any]]:
+        response = await self.client.table("messages")\
+                    .select("*")\
+                    .eq("id", message_id)\
+                    .execute()
+        return response.data[0] if response.data else None
+
+    async def recent_messages(
+        self,
+        conversation_id: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        response = await self.client.table("messages")\
+                    .select("*")\
+                    .eq("conversation_id", conversation_id)\
+                    .order("created_at", desc=True)\
+                    .limit(limit)\
+                    .execute()
+        return response.data or []
+
+    async def insert_message(
+        self,
+        data: Dict[str, Any]
+    ) -> None:
+        await self.client.table("messages").insert(data).execute()
+
+    async def update_message_content(
+        self,
+        message_id: str,
+        content: str
+    ) -> None:
+        await self.client.table("messages").update({"content": content}).eq("id", message_id).execute()
+
+    async def insert_plan(
+        self,
+        data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        response = await self.client.table("account_plans").insert(data).execute()
+        return response.data[0] if response.data else None
+
+    async def get_plan(
+        self,
+        plan_id: str
+    ) -> Optional[Dict[str, Any]]:
+        response = await self.client.table("account_plans")\
+                    .select("*")\
+                    .eq("id", plan_id)\
+                    .execute()
+        return response.data[0] if response.data else None
+
+    async def latest_plan(
+        self,
+        company_key: str,
+        company: str,
+        user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        for column, value in (("company_key", company_key), ("company", company)):
+            query = self.client.table("account_plans")\
+                .select("*")\
+                .eq(column, value)
+
+            if user_id:
+                query = query.eq("user_id", user_id)
+
+            response = await query.order("created_at", desc=True)\
+                        .limit(1)\
+                        .execute()
+            if response.data:
+                return response.data[0]
+        return None
+
+    async def get_plan_sections(
+        self,
+        plan_id: str
+    ) -> Optional[Dict[str, Any]]:
+        response = await self.client.table("account_plans")\
+                    .select("sections, updated_at")\
+                    .eq("id", plan_id)\
+                    .single().execute()
+        return response.data or None
+
+    async def update_plan_sections(
+        self,
+        plan_id: str,
+        sections: Dict[str, Any],
+        updated_at: datetime,
+        expected_updated_at: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        query = self.client.table("account_plans")\
+                    .update({"sections": sections, "updated_at": updated_at.isoformat()})\
+                    .eq("id", plan_id)
+        if expected_updated_at:
+            query = query.eq("updated_at", expected_updated_at)
+        response = await query.execute()
+        return response.data[0] if response.data else None
+
+    async def insert_research(
+        self,
+        data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        if data.get("raw") is not None:
+            data = {**data, "raw": to_bytea(data["raw"])}
+        response = await self.client.table("research_data").insert(data).execute()
+        return response.data[0] if response.data else None
+
+
+class PostgresRepository(Repository):
+    """
+    asyncpg pool over DATABASE_URL. Each statement is prepared once per pooled connection
+    and reused from the connection's statement cache (see PostgresStatementCacheSize).
+    """
+    def __init__(
+        self,
+        pool
+    ) -> None:
+        self.pool = pool
+
+    async def get_message(
+        self,
+        message_id: str
+    ) -> Optional[Dict[str, Any]]:
+        return self._row(await self.pool.fetchrow(queries.getMessage, message_id))
+
+    async def recent_messages(
+        self,
+        conversation_id: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        return [self._row(r) for r in await self.pool.fetch(queries.getRecentMessages, conversation_id, limit)]
+
+    async def insert_message(
+        self,
+        data: Dict[str, Any]
+    ) -> None:
+        await self.pool.execute(queries.insertMessage, data.get("id"), data["conversation_id"], data["role"], data["content"])
+
+    async def update_message_content(
+        self,
+        message_id: str,
+        content: str
+    ) -> None:
+        await self.pool.execute(queries.updateMessageContent, message_id, content)
+
+    async def insert_plan(
+        self,
+        data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        return self._row(await self.pool.fetchrow(
+            queries.insertPlan,
+            data.get("id"),
+            data.get("user_id"),
+            data["company"],
+            data.get("company_key"),
+            data.get("sections") or {}
+        ))
+
+    async def get_plan(
+        self,
+        plan_id: str
+    ) -> Optional[Dict[str, Any]]:
+        return self._row(await self.pool.fetchrow(queries.getPlan, plan_id))
+
+    async def latest_plan(
+        self,
+        company_key: str,
+        company: str,
+        user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return self._row(await self.pool.fetchrow(queries.getLatestPlan, company_key, company, user_id))
+
+    async def get_plan_sections(
+        self,
+        plan_id: str
+    ) -> Optional[Dict[str, Any]]:
+        return self._row(await self.pool.fetchrow(queries.getPlanSections, plan_id))
+
+    async def update_plan_sections(
+        self,
+        plan_id: str,
+        sections: Dict[str, Any],
+        updated_at: datetime,
+        expected_updated_at: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        expected = datetime.fromisoformat(expected_updated_at) if isinstance(expected_updated_at, str) else expected_updated_at
+        return self._row(await self.pool.fetchrow(queries.updatePlanSections, plan_id, sections, updated_at, expected))
+
+    async def insert_research(
+        self,
+        data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        return self._row(await self.pool.fetchrow(
+            queries.insertResearch,
+            data["company"],
+            data.get("company_key"),
+            data.get("content"),
+            data.get("summary"),
+            data.get("raw"),
+            data.get("plan_id"),
+            data.get("user_id")
+        ))
+
+    @staticmethod
+    def _row(
+        record
+    ) -> Optional[Dict[str, Any]]:
+        if record is None:
+            return None
+        row = {}
+        for key, value in dict(record).items():
+            if isinstance(value, uuid.UUID):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            row[key] = value
+        return row
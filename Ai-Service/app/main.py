@@ -1,4 +1,5 @@
 from app.api.websocket import router as websocket_router
+from app.api.metrics import router as metrics_router
 from fastapi.middleware.cors import CORSMiddleware
 from app.utils.lifespanUtil import lifespan
 from app.Config.dataConfig import Config
@@ -26,3 +27,8 @@ app.include_router(
     websocket_router, 
     prefix=mainAppCfg.SOCKETCHATPREFIX
 )
+
+app.include_router(
+    metrics_router, 
+    prefix=mainAppCfg.METRICSPREFIX
+)
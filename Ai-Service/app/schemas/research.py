@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+class SubQuery(BaseModel):
+    aspect: str = Field(description="Aspect of the company this query covers, e.g. financials, news, leadership, competitors")
+    query: str = Field(description="The search query")
+    provider: Literal["tavily", "perplexity"] = Field(
+        description="tavily for facts, figures and recent news; perplexity for analysis and comparisons"
+    )
+    search_depth: Literal["basic", "advanced"] = Field(
+        "basic",
+        description="advanced only when the aspect needs in-depth sources, it is slower and costs more"
+    )
+
+class ResearchQueries(BaseModel):
+    queries: List[SubQuery] = Field(description="Aspect-specific sub-queries, most important first")
@@ -25,6 +25,8 @@ class StatusUpdate(BaseModel):
 class AssistantChunkPayload(BaseModel):
     message_id: str
     chunk: str
+    # Set on the markdown rendering of a plan; clients that build plans from plan deltas skip it
+    plan_id: Optional[str] = None
 
 class AssistantChunk(BaseModel):
     type: Literal["assistant_chunk"] = "assistant_chunk"
@@ -34,11 +36,43 @@ class PlanUpdatePayload(BaseModel):
     plan_id: str
     section: str
     content: Union[str, List[str]]
+    # Streamed edits: append `content` (text chunk or new list items) instead of replacing the section
+    append: bool = False
 
 class PlanUpdate(BaseModel):
     type: Literal["plan_update"] = "plan_update"
     payload: PlanUpdatePayload
 
+class PlanDeltaPayload(BaseModel):
+    plan_id: str
+    section: str
+    base_version: str
+    version: str
+    # set / insert / remove / replace / patch operations, see app.services.plan_sync
+    ops: List[Dict[str, Any]]
+
+class PlanDelta(BaseModel):
+    type: Literal["plan_delta"] = "plan_delta"
+    payload: PlanDeltaPayload
+
+class PlanSnapshotPayload(BaseModel):
+    plan_id: str
+    version: str
+    sections: Dict[str, Any]
+
+class PlanSnapshot(BaseModel):
+    type: Literal["plan_snapshot"] = "plan_snapshot"
+    payload: PlanSnapshotPayload
+
+class PlanAckPayload(BaseModel):
+    plan_id: str
+    # Version the client holds; None asks for a snapshot
+    version: Optional[str] = None
+
+class PlanAck(BaseModel):
+    type: Literal["plan_ack"] = "plan_ack"
+    payload: PlanAckPayload
+
 class ErrorPayload(BaseModel):
     code: str
     message: str
@@ -49,8 +83,50 @@ class ErrorMessage(BaseModel):
 
 class MessageUpdatePayload(BaseModel):
     message_id: str
-    content: str
+    # Full new content, or a diff: content[start:end] is replaced with `replacement`.
+    # Offsets count UTF-16 code units, like JavaScript string indices
+    content: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    replacement: Optional[str] = None
 
 class MessageUpdate(BaseModel):
     type: Literal["message_update"] = "message_update"
     payload: MessageUpdatePayload
+
+class BatchRequestPayload(BaseModel):
+    companies: List[str]
+    region: str = "General"
+    batch_id: Optional[str] = None
+    # Plans generated at once, capped by BatchPlanConcurrency
+    concurrency: Optional[int] = None
+
+class BatchRequest(BaseModel):
+    type: Literal["batch_request"] = "batch_request"
+    payload: BatchRequestPayload
+
+class BatchProgressPayload(BaseModel):
+    batch_id: str
+    company: str
+    status: Literal["queued", "running", "done", "failed"]
+    message: Optional[str] = None
+    plan_id: Optional[str] = None
+    saved: Optional[bool] = None
+    completed: int
+    total: int
+
+class BatchProgress(BaseModel):
+    type: Literal["batch_progress"] = "batch_progress"
+    payload: BatchProgressPayload
+
+class BatchCompletePayload(BaseModel):
+    batch_id: str
+    total: int
+    succeeded: int
+    failed: int
+    elapsed_seconds: float
+    plans_per_minute: float
+
+class BatchComplete(BaseModel):
+    type: Literal["batch_complete"] = "batch_complete"
+    payload: BatchCompletePayload
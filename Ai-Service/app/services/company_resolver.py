@@ -0,0 +1,207 @@
+from app.states.global_state import services
+from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
+from app.utils.logger import logger
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import unicodedata
+import difflib
+import re
+
+settings = Config.Config.from_env()
+
+# Dropped from the end of a name ("Alphabet Inc." -> "alphabet"), never the only word
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "llc", "llp",
+    "plc", "gmbh", "ag", "sa", "sas", "nv", "bv", "ab", "oy", "spa", "pte", "pty", "kk", "holdings", "group", "com",
+}
+# Fuzzy-match candidates remembered per process
+MAX_CANDIDATES = 1000
+
+
+def normalize_company(
+    name: str
+) -> str:
+    """
+    Case, accents, punctuation, a leading "the" and trailing legal suffixes removed.
+    """
+    text = "".join(c for c in unicodedata.normalize("NFKD", name.casefold()) if not unicodedata.combining(c))
+    # Dotted initials are one word: "S.A." -> "sa", "J.P. Morgan" -> "jp morgan"
+    text = re.sub(r"(?<!\w)(\w)\.", r"\1", text)
+    words = re.findall(r"\w+", text.replace("&", " and "))
+    while len(words) > 1 and (words[-1] in LEGAL_SUFFIXES or words[-1] == "and"):
+        words.pop()
+    if len(words) > 1 and words[0] == "the":
+        words.pop(0)
+    return " ".join(words)
+
+
+class CompanyResolver:
+    """
+    Maps company names as extracted by the LLM to a canonical company key, used wherever
+    plans, research and knowledge base documents are matched by company.
+
+    Names are normalized first; the normalized form is looked up in the alias index
+    (seed aliases plus `company_aliases` rows mapping a name to another key), then in the
+    known canonical keys. A name matching nothing becomes a new canonical key, its normalized
+    form. Only exact normalized matches are applied: a close but different name
+    ("Deutsche Bahn" next to "deutsche bank") is a different company as often as a typo,
+    so fuzzy matches are only kept in `candidates` for review and never written to the table.
+    Aliases learnt in memory are written to the table by `save`, so every worker converges
+    on them after its next `load`.
+
+    Known keys are capped at `max_known`, least recently used dropped first: a dropped key
+    is derived again from the name the next time it is seen. `counts` and the metrics record
+    `resolve` calls, one per name coming into the service, not the internal `key` lookups.
+    """
+    def __init__(
+        self,
+        seed_aliases: Dict[str, str] = None,
+        fuzzy_cutoff: float = 0.9,
+        fuzzy_min_length: int = 5,
+        max_known: int = 50000
+    ) -> None:
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.fuzzy_min_length = fuzzy_min_length
+        self.max_known = max_known
+        # Normalized alias -> a different canonical key
+        self._aliases: Dict[str, str] = {}
+        # Canonical keys, least recently used first
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._unsaved: List[Tuple[str, str]] = []
+        # Unconfirmed: normalized name -> the known alias it is close to, at most MAX_CANDIDATES
+        self.candidates: Dict[str, str] = {}
+        self.counts = {"exact": 0, "new": 0, "candidate": 0}
+        for alias, key in (seed_aliases or {}).items():
+            self._add(normalize_company(alias), normalize_company(key))
+
+    def key(
+        self,
+        name: str
+    ) -> str:
+        return self._lookup(name)[0]
+
+    async def resolve(
+        self,
+        name: str
+    ) -> str:
+        """
+        `key`, counted, with any alias it learnt written to the alias table.
+        """
+        key, outcomes = self._lookup(name)
+        for outcome in outcomes:
+            self._count(outcome)
+        await self.save()
+        return key
+
+    async def load(
+        self,
+        client=None,
+        page_size: int = 1000
+    ) -> int:
+        client = client or services.get_supabase()
+        loaded, start = 0, 0
+        while True:
+            response = await client.table("company_aliases")\
+                        .select("alias, company_key")\
+                        .range(start, start + page_size - 1)\
+                        .execute()
+            rows = response.data or []
+            for row in rows:
+                self._add(row["alias"], row["company_key"])
+            loaded += len(rows)
+            if len(rows) < page_size:
+                return loaded
+            start += page_size
+
+    async def save(self) -> None:
+        if not self._unsaved:
+            return
+        rows, self._unsaved = self._unsaved, []
+        try:
+            await services.get_supabase().table("company_aliases")\
+                    .upsert([{"alias": alias, "company_key": key} for alias, key in rows])\
+                    .execute()
+        except Exception as e:
+            # Not queued again: the in-memory index still has them, and a new company's key is its
+            # normalized name, so another worker seeing it derives the same key without the row
+            logger.warning(f"Failed to save {len(rows)} company aliases: {e}")
+            metrics.incr("company_resolver.unsaved", len(rows))
+
+    def report(self) -> str:
+        total = self.counts["exact"] + self.counts["new"]
+        if not total:
+            return "Company resolver: no lookups"
+        return (
+            f"Company resolver: {total} lookups, {self.counts['exact'] / total:.0%} known alias, "
+            f"{self.counts['new'] / total:.0%} new companies ({self.counts['candidate']} close to a known name)"
+        )
+
+    def _lookup(
+        self,
+        name: str
+    ) -> Tuple[str, List[str]]:
+        """
+        The key for `name` and the outcomes to count for it.
+        """
+        normalized = normalize_company(name)
+        if not normalized:
+            return " ".join(name.lower().split()), []
+
+        key = self._aliases.get(normalized)
+        if key is not None:
+            return key, ["exact"]
+        if normalized in self._known:
+            self._known.move_to_end(normalized)
+            return normalized, ["exact"]
+
+        outcomes = ["new"]
+        match = self._fuzzy(normalized)
+        if match is not None:
+            outcomes.append("candidate")
+            if len(self.candidates) < MAX_CANDIDATES:
+                self.candidates[normalized] = match
+            logger.info(f"Company '{name}' is close to '{match}', kept as a new company")
+        self._add(normalized, normalized)
+        self._unsaved.append((normalized, normalized))
+        return normalized, outcomes
+
+    def _add(
+        self,
+        alias: str,
+        key: str
+    ) -> None:
+        if alias != key:
+            self._aliases[alias] = key
+        self._known[key] = None
+        self._known.move_to_end(key)
+        if len(self._known) > self.max_known:
+            self._known.popitem(last=False)
+
+    def _fuzzy(
+        self,
+        normalized: str
+    ) -> Optional[str]:
+        """
+        The closest known alias, if any is within `fuzzy_cutoff`. Only recorded, never applied.
+        """
+        if len(normalized) < self.fuzzy_min_length:
+            return None
+        candidates = [a for a in (*self._aliases, *self._known) if len(a) >= self.fuzzy_min_length]
+        matches = difflib.get_close_matches(normalized, candidates, n=1, cutoff=self.fuzzy_cutoff)
+        return matches[0] if matches else None
+
+    def _count(
+        self,
+        outcome: str
+    ) -> None:
+        self.counts[outcome] += 1
+        metrics.incr(f"company_resolver.{outcome}")
+
+
+companies = CompanyResolver(
+    seed_aliases=settings.CompanySeedAliases,
+    fuzzy_cutoff=settings.CompanyFuzzyCutoff,
+    fuzzy_min_length=settings.CompanyFuzzyMinLength,
+    max_known=settings.CompanyMaxKnown
+)
@@ -0,0 +1,265 @@
+from app.services.research_compactor import Snippet
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import re
+
+# Metric -> (value kind, keyword pattern). Kinds: money, percent, year, count.
+METRICS: Dict[str, Tuple[str, str]] = {
+    "revenue": ("money", r"revenues?|sales|turnover"),
+    "net_income": ("money", r"net income|net profit|net loss"),
+    "ebitda": ("money", r"(?:adjusted )?ebitda"),
+    "valuation": ("money", r"valuation|valued at|valuing|market cap(?:italization)?"),
+    "funding": ("money", r"raised|funding round|series [a-f]"),
+    "gross_margin": ("percent", r"gross margin"),
+    "operating_margin": ("percent", r"operating margin"),
+    "employees": ("count", r"employees|employs|staff|workforce|headcount|people"),
+    "founded": ("year", r"founded|incorporated"),
+    "ipo": ("year", r"public company|went public|ipo|listed on"),
+}
+
+CURRENCIES = {"$": "USD", "usd": "USD", "us$": "USD", "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP"}
+SCALES = {"thousand": 1e3, "k": 1e3, "million": 1e6, "m": 1e6, "mn": 1e6, "billion": 1e9, "b": 1e9, "bn": 1e9, "trillion": 1e12}
+
+MONEY = re.compile(
+    r"(?P<cur>us\$|\$|€|£|\busd\b|\beur\b|\bgbp\b)\s?(?P<num>\d[\d,]*(?:\.\d+)?)\s?(?P<scale>thousand|million|billion|trillion|bn|mn|[kmb])?\b",
+    re.IGNORECASE
+)
+PERCENT = re.compile(r"(?P<num>\d+(?:\.\d+)?)\s?(?:%|percent\b|per cent\b)", re.IGNORECASE)
+YEAR = re.compile(r"\b(?P<num>1[89]\d{2}|20\d{2})\b")
+COUNT = re.compile(r"\b(?P<num>\d{1,3}(?:,\d{3})+|\d+)\b(?!\s?(?:%|percent|million|billion))", re.IGNORECASE)
+FISCAL_YEAR = re.compile(r"\bfy\s?'?(?P<num>\d{2}|\d{4})\b", re.IGNORECASE)
+SUB_PERIOD = re.compile(
+    r"\b(?:q(?P<q>[1-4])|h(?P<h>[12])|(?P<quarter>first|second|third|fourth) quarter|(?P<half>first|second) half)\b",
+    re.IGNORECASE
+)
+ROUND = re.compile(r"\b(?:series (?P<series>[a-h])|(?P<stage>pre-seed|seed))\b", re.IGNORECASE)
+ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4}
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z])|\n+")
+
+
+@dataclass
+class Fact:
+    metric: str
+    value: float
+    unit: str
+    period: Optional[str]
+    url: str
+    text: str
+
+    def render(self) -> str:
+        if self.unit == "percent":
+            value = f"{self.value:g}%"
+        elif self.unit == "year":
+            value = f"{self.value:.0f}"
+        elif self.unit == "count":
+            value = f"{self.value:,.0f}"
+        else:
+            value = f"{self.unit} {self.value / 1e6:,.1f}M"
+        return f"{value} ({self.url or 'unknown source'})"
+
+
+@dataclass
+class Conflict:
+    metric: str
+    period: Optional[str]
+    facts: List[Fact] = field(default_factory=list)
+
+    def describe(self) -> str:
+        label = self.metric.replace("_", " ")
+        if self.period:
+            label += f" {self.period}"
+        return f"{label}: " + " vs ".join(f.render() for f in self.facts)
+
+
+class ConflictDetector:
+    """
+    Extracts figures tied to metric keywords (revenue, margins, headcount, founding year...)
+    from research snippets and flags metrics where independent sources disagree.
+
+    Extraction is deliberately conservative: a value is only attributed to a nearby
+    keyword expecting its kind, and figures for different periods are never compared.
+    """
+    def __init__(
+        self,
+        money_tolerance: float = 0.05,
+        percent_tolerance: float = 0.5,
+        count_tolerance: float = 0.1,
+        max_distance: int = 60
+    ) -> None:
+        self.money_tolerance = money_tolerance
+        self.percent_tolerance = percent_tolerance
+        self.count_tolerance = count_tolerance
+        self.max_distance = max_distance
+        self._keywords = {metric: re.compile(rf"\b(?:{pattern})\b", re.IGNORECASE) for metric, (_, pattern) in METRICS.items()}
+
+    def extract(
+        self,
+        text: str,
+        url: str = ""
+    ) -> List[Fact]:
+        facts: List[Fact] = []
+        for sentence in SENTENCE_END.split(text):
+            facts.extend(self._extract_sentence(sentence, url))
+        return facts
+
+    def find_conflicts(
+        self,
+        snippets: List[Snippet]
+    ) -> List[Conflict]:
+        groups: Dict[Tuple[str, Optional[str]], List[Fact]] = {}
+        for snippet in snippets:
+            for fact in self.extract(snippet.text, snippet.url):
+                groups.setdefault((fact.metric, fact.period), []).append(fact)
+
+        conflicts = []
+        for (metric, period), facts in groups.items():
+            distinct = self._distinct_values(facts)
+            if len(distinct) > 1 and len({f.url for f in distinct}) > 1:
+                conflicts.append(Conflict(metric=metric, period=period, facts=distinct))
+        return conflicts
+
+    def _extract_sentence(
+        self,
+        sentence: str,
+        url: str
+    ) -> List[Fact]:
+        values = self._values(sentence)
+        keywords = sorted(
+            (m.start(), m.end(), metric)
+            for metric, pattern in self._keywords.items()
+            for m in pattern.finditer(sentence)
+        )
+        # Greedy matching on distance: the closest keyword/value pairs are bound first
+        pairs = []
+        for k, (start, end, metric) in enumerate(keywords):
+            kind = METRICS[metric][0]
+            for i, (vkind, vstart, vend, _, _) in enumerate(values):
+                if vkind != kind:
+                    continue
+                # Values usually follow their keyword ("revenue of $2.3B"); penalise ones before it
+                distance = vstart - end if vstart >= end else (start - vend) * 2
+                if 0 <= distance <= self.max_distance:
+                    pairs.append((distance, k, i))
+
+        bound, used = {}, set()
+        for _, k, i in sorted(pairs):
+            if k in bound or i in used:
+                continue
+            bound[k] = i
+            used.add(i)
+
+        facts = []
+        for k, i in sorted(bound.items()):
+            start, _, metric = keywords[k]
+            kind, _, _, value, unit = values[i]
+            period = None if kind == "year" else self._period(sentence, values, used, start, metric)
+            facts.append(Fact(metric=metric, value=value, unit=unit, period=period, url=url, text=sentence.strip()))
+        return facts
+
+    def _values(
+        self,
+        sentence: str
+    ) -> List[Tuple[str, int, int, float, str]]:
+        values = []
+        taken = []
+        for m in MONEY.finditer(sentence):
+            scale = SCALES.get((m.group("scale") or "").lower(), 1.0)
+            currency = CURRENCIES[m.group("cur").lower()]
+            values.append(("money", m.start(), m.end(), self._number(m.group("num")) * scale, currency))
+            taken.append((m.start(), m.end()))
+        for m in PERCENT.finditer(sentence):
+            values.append(("percent", m.start(), m.end(), self._number(m.group("num")), "percent"))
+            taken.append((m.start(), m.end()))
+        for m in YEAR.finditer(sentence):
+            if not self._overlaps(m.start(), m.end(), taken):
+                values.append(("year", m.start(), m.end(), float(m.group("num")), "year"))
+        for m in COUNT.finditer(sentence):
+            if not self._overlaps(m.start(), m.end(), taken) and not YEAR.fullmatch(m.group("num")):
+                values.append(("count", m.start(), m.end(), self._number(m.group("num")), "count"))
+        return values
+
+    def _period(
+        self,
+        sentence: str,
+        values: List[Tuple[str, int, int, float, str]],
+        used: set,
+        anchor: int,
+        metric: str
+    ) -> Optional[str]:
+        """
+        The reporting year closest to the metric keyword, narrowed by a quarter or half
+        ("2024 Q1") and, for funding, by the round ("2021 Series B"), if the sentence names them.
+        """
+        parts = []
+        fiscal = FISCAL_YEAR.search(sentence)
+        if fiscal:
+            year = fiscal.group("num")
+            parts.append(year if len(year) == 4 else f"20{year}")
+        else:
+            years = [(abs(vstart - anchor), int(value)) for i, (kind, vstart, _, value, _) in enumerate(values) if kind == "year" and i not in used]
+            if years:
+                parts.append(str(min(years)[1]))
+
+        sub = self._nearest(SUB_PERIOD, sentence, anchor)
+        if sub:
+            if sub.group("q") or sub.group("quarter"):
+                parts.append(f"Q{sub.group('q') or ORDINALS[sub.group('quarter').lower()]}")
+            else:
+                parts.append(f"H{sub.group('h') or ORDINALS[sub.group('half').lower()]}")
+
+        if metric == "funding":
+            stage = self._nearest(ROUND, sentence, anchor)
+            if stage:
+                parts.append(f"Series {stage.group('series').upper()}" if stage.group("series") else stage.group("stage").lower())
+        return " ".join(parts) or None
+
+    @staticmethod
+    def _nearest(
+        pattern: re.Pattern,
+        sentence: str,
+        anchor: int
+    ) -> Optional[re.Match]:
+        matches = list(pattern.finditer(sentence))
+        return min(matches, key=lambda m: abs(m.start() - anchor)) if matches else None
+
+    def _distinct_values(
+        self,
+        facts: List[Fact]
+    ) -> List[Fact]:
+        """
+        One fact per value cluster; values within tolerance of each other count as the same figure.
+        """
+        distinct: List[Fact] = []
+        for fact in facts:
+            if not any(self._agrees(fact, other) for other in distinct):
+                distinct.append(fact)
+        return distinct
+
+    def _agrees(
+        self,
+        a: Fact,
+        b: Fact
+    ) -> bool:
+        if a.unit != b.unit:
+            # Different currencies cannot be compared without FX rates
+            return True
+        if a.unit == "year":
+            return a.value == b.value
+        if a.unit == "percent":
+            return abs(a.value - b.value) <= self.percent_tolerance
+        tolerance = self.count_tolerance if a.unit == "count" else self.money_tolerance
+        return abs(a.value - b.value) <= tolerance * max(abs(a.value), abs(b.value))
+
+    @staticmethod
+    def _number(
+        raw: str
+    ) -> float:
+        return float(raw.replace(",", ""))
+
+    @staticmethod
+    def _overlaps(
+        start: int,
+        end: int,
+        spans: List[Tuple[int, int]]
+    ) -> bool:
+        return any(start < s_end and s_start < end for s_start, s_end in spans)
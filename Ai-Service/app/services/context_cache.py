@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from app.services.company_resolver import companies
+from collections import OrderedDict
+from app.utils.metrics import metrics
+from typing import List, Optional, Set
+import time
+import re
+
+# Words that carry no retrieval intent: function words and conversational follow-ups
+# ("thanks", "shorten that", "make it more formal").
+IGNORED_WORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "your", "all", "any", "can", "was", "were",
+    "has", "have", "had", "this", "that", "these", "those", "with", "from", "into", "about",
+    "what", "which", "who", "whom", "how", "why", "when", "where", "does", "did", "its", "it's",
+    "they", "them", "their", "there", "then", "than", "also", "just", "some", "more", "less",
+    "most", "very", "much", "please", "thanks", "thank", "okay", "great", "cool", "nice", "yes",
+    "sure", "could", "would", "should", "will", "shall", "make", "made", "give", "show", "tell",
+    "shorten", "shorter", "longer", "expand", "rewrite", "rephrase", "summarize", "summarise",
+    "simplify", "again", "bit", "little", "formal", "casual", "bullet", "bullets", "points",
+    "list", "format", "answer", "explain", "elaborate", "continue", "same", "above", "previous",
+}
+
+def content_terms(
+    text: str
+) -> Set[str]:
+    return {w for w in re.findall(r"[a-z0-9][a-z0-9'\-]+", text.lower()) if len(w) > 2 and w not in IGNORED_WORDS}
+
+
+@dataclass
+class CachedContext:
+    company: str
+    docs: List[str]
+    known_terms: Set[str]
+    stored_at: float = field(default_factory=time.monotonic)
+
+
+class RetrievedContextCache:
+    """
+    Per-session cache of passages retrieved for the active company.
+
+    A lexical gate decides whether a chat turn needs a fresh retrieval: if the
+    message brings no content terms beyond those of the cached queries and
+    passages, the cached passages are reused.
+    """
+    def __init__(
+        self,
+        ttl_seconds: float = 900,
+        novelty_threshold: float = 0.5,
+        max_sessions: int = 1000
+    ) -> None:
+        self.ttl = ttl_seconds
+        self.novelty_threshold = novelty_threshold
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[str, CachedContext]" = OrderedDict()
+        self._lookups = 0
+        self._skips = 0
+        self._avg_retrieval = 0.0
+
+    def lookup(
+        self,
+        session_id: str,
+        company: str,
+        query: str
+    ) -> Optional[List[str]]:
+        """
+        Returns cached passages when the query is covered by them, else None.
+        """
+        self._lookups += 1
+        metrics.incr("chat_context.lookups")
+
+        entry = self._entries.get(session_id)
+        reuse = (
+            entry is not None
+            and entry.company == companies.key(company)
+            and time.monotonic() - entry.stored_at < self.ttl
+            and self._novelty(query, entry) <= self.novelty_threshold
+        )
+        if reuse:
+            self._skips += 1
+            self._entries.move_to_end(session_id)
+            # known_terms only grows in store(): nothing was retrieved for this query's terms
+            metrics.incr("chat_context.skipped")
+            metrics.incr("chat_context.latency_saved_seconds", self._avg_retrieval)
+
+        metrics.set_gauge("chat_context.skip_rate", self.skip_rate)
+        return entry.docs if reuse else None
+
+    def store(
+        self,
+        session_id: str,
+        company: str,
+        query: str,
+        docs: List[str],
+        retrieval_seconds: float
+    ) -> None:
+        # An empty result is also what a failed search returns; caching it would block
+        # retrieval for the session until the TTL runs out
+        if not docs:
+            return
+        known = content_terms(query)
+        for doc in docs:
+            known |= content_terms(doc)
+
+        self._entries[session_id] = CachedContext(company=companies.key(company), docs=docs, known_terms=known)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+
+        # EWMA of real retrieval latency, used to estimate the time a skip saves
+        self._avg_retrieval = retrieval_seconds if not self._avg_retrieval else 0.8 * self._avg_retrieval + 0.2 * retrieval_seconds
+        metrics.observe("chat_context.retrieval", retrieval_seconds)
+
+    def invalidate(
+        self,
+        session_id: str
+    ) -> None:
+        self._entries.pop(session_id, None)
+
+    @property
+    def skip_rate(self) -> float:
+        return self._skips / self._lookups if self._lookups else 0.0
+
+    @property
+    def estimated_saving(self) -> float:
+        return self._avg_retrieval
+
+    @staticmethod
+    def _novelty(
+        query: str,
+        entry: CachedContext
+    ) -> float:
+        terms = content_terms(query)
+        if not terms:
+            return 0.0
+        return len(terms - entry.known_terms) / len(terms)
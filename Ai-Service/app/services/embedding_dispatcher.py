@@ -0,0 +1,110 @@
+from typing import Any, List, Optional, Set, Tuple
+from app.core.resilience import providers
+from app.utils.metrics import metrics
+import asyncio
+
+
+class EmbeddingDispatcher:
+    """
+    Coalesces concurrent `aembed_query` calls into batched `aembed_documents` requests.
+
+    Requests arriving within `max_wait_ms` of the first pending one (or until
+    `max_batch_size` is reached) are sent as one API call and the vectors are
+    fanned back out to the awaiting callers. With a `provider`, each batch runs under
+    that provider's timeout, retries and circuit breaker, so one upstream failure counts
+    once however many callers it fails.
+    """
+    def __init__(
+        self,
+        embeddings: Any,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        task_type: Optional[str] = "RETRIEVAL_QUERY",
+        limiter: Any = None,
+        provider: Optional[str] = None
+    ) -> None:
+        self.embeddings = embeddings
+        self.limiter = limiter
+        self.provider = provider
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.task_type = task_type
+        self._pending: List[Tuple[str, asyncio.Future, int, Optional[int]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def aembed_query(
+        self,
+        text: str,
+        priority: int = 1,
+        retries: Optional[int] = None
+    ) -> List[float]:
+        """
+        `retries` overrides the provider policy; a batch retries as much as its most
+        demanding caller asks for.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, priority, retries))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(
+        self,
+        batch: List[Tuple[str, asyncio.Future, int, Optional[int]]]
+    ) -> None:
+        # Identical texts in the same window are embedded once
+        unique_texts = list(dict.fromkeys(text for text, _, _, _ in batch))
+        metrics.incr("embeddings.requests", len(batch))
+        metrics.incr("embeddings.batches")
+        metrics.observe("embeddings.batch_size", len(batch))
+
+        async def attempt():
+            if self.limiter:
+                # The batch queues at the priority of its most urgent caller
+                async with self.limiter.slot(min(p for _, _, p, _ in batch)):
+                    return await self._embed(unique_texts)
+            return await self._embed(unique_texts)
+
+        try:
+            if self.provider:
+                requested = [r for _, _, _, r in batch]
+                retries = None if None in requested else max(requested)
+                vectors = await providers.call(self.provider, attempt, retries=retries)
+            else:
+                vectors = await attempt()
+        except Exception as e:
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future, _, _ in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    async def _embed(
+        self,
+        texts: List[str]
+    ) -> List[List[float]]:
+        if self.task_type:
+            return await self.embeddings.aembed_documents(texts, task_type=self.task_type)
+        return await self.embeddings.aembed_documents(texts)
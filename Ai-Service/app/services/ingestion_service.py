@@ -0,0 +1,253 @@
+from app.services.knowledge_base import KnowledgeBaseService
+from dataclasses import dataclass, field
+from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
+from app.utils.logger import logger
+from typing import List, Optional
+from pathlib import Path
+import threading
+import sqlite3
+import asyncio
+import random
+import json
+import time
+
+settings = Config.Config.from_env()
+
+@dataclass
+class IngestionJob:
+    company: str
+    content: str
+    metadata: dict = field(default_factory=dict)
+    attempts: int = 0
+    spool_id: Optional[int] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class RetrySpool:
+    """
+    SQLite-backed store for ingestion jobs that could not be processed yet.
+    Survives restarts, so pending jobs are replayed by the next process.
+    """
+    LEASE_SECONDS = 300
+
+    def __init__(
+        self,
+        path: str
+    ) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingestion_spool ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "company TEXT NOT NULL, "
+            "content TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        # Nothing is released on startup: other workers may share the file and hold live leases.
+        # A lease is a next_attempt_at in the future, so one held by a crashed process expires
+        # on its own after LEASE_SECONDS and lease_due picks the job up again.
+
+    def put(
+        self,
+        job: IngestionJob,
+        delay: float = 0.0
+    ) -> None:
+        due = time.time() + delay
+        with self._lock:
+            if job.spool_id is not None:
+                self._conn.execute(
+                    "UPDATE ingestion_spool SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                    (job.attempts, due, job.spool_id)
+                )
+            else:
+                self._conn.execute(
+                    "INSERT INTO ingestion_spool (company, content, metadata, attempts, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                    (job.company, job.content, json.dumps(job.metadata), job.attempts, due)
+                )
+            self._conn.commit()
+
+    def lease_due(
+        self,
+        limit: int
+    ) -> List[IngestionJob]:
+        """
+        Claims up to `limit` due jobs. Claimed rows stay in the spool until `delete`.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, company, content, metadata, attempts FROM ingestion_spool "
+                "WHERE next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE ingestion_spool SET next_attempt_at = ? WHERE id = ?",
+                    [(now + self.LEASE_SECONDS, row[0]) for row in rows]
+                )
+                self._conn.commit()
+        return [
+            IngestionJob(company=r[1], content=r[2], metadata=json.loads(r[3]), attempts=r[4], spool_id=r[0])
+            for r in rows
+        ]
+
+    def delete(
+        self,
+        spool_id: int
+    ) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ingestion_spool WHERE id = ?", (spool_id,))
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ingestion_spool").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class IngestionService:
+    """
+    Bounded background worker pool for knowledge-base ingestion (embedding + Pinecone upsert).
+    Research results return immediately; overflow and failed jobs go to the retry spool.
+    """
+    def __init__(
+        self,
+        kb: KnowledgeBaseService = None,
+        workers: int = settings.IngestionWorkers,
+        queue_size: int = settings.IngestionQueueSize,
+        max_retries: int = settings.IngestionMaxRetries,
+        spool_path: str = settings.IngestionSpoolPath
+    ) -> None:
+        self.kb = kb or KnowledgeBaseService()
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.spool = RetrySpool(spool_path)
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+
+    async def start(self) -> None:
+        self._accepting = True
+        for i in range(self.worker_count):
+            self._tasks.append(asyncio.create_task(self._worker(i)))
+        self._tasks.append(asyncio.create_task(self._replay_spool()))
+        logger.info(f"Ingestion workers started ({self.worker_count} workers, {self.spool.size()} spooled jobs).")
+
+    async def submit(
+        self,
+        company: str,
+        content: str,
+        metadata: dict = None
+    ) -> None:
+        """
+        Queue a document for ingestion without waiting for it to be embedded or stored.
+        """
+        job = IngestionJob(company=company, content=content, metadata=metadata or {})
+        metrics.incr("ingestion.submitted")
+
+        if self._accepting:
+            try:
+                self.queue.put_nowait(job)
+                self._update_gauges()
+                return
+            except asyncio.QueueFull:
+                pass
+
+        # Backpressure: spill to disk rather than block the research response
+        metrics.incr("ingestion.spilled")
+        await asyncio.to_thread(self.spool.put, job)
+
+    async def _worker(
+        self,
+        worker_id: int
+    ) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                metrics.observe("ingestion.queue_wait", time.monotonic() - job.enqueued_at)
+                start = time.monotonic()
+                await self.kb.upsert_research(job.company, job.content, job.metadata)
+                metrics.observe("ingestion.latency", time.monotonic() - start)
+                metrics.incr("ingestion.processed")
+                if job.spool_id is not None:
+                    await asyncio.to_thread(self.spool.delete, job.spool_id)
+            except asyncio.CancelledError:
+                # Interrupted mid-flight during shutdown; keep the job for the next process
+                self.spool.put(job)
+                raise
+            except Exception as e:
+                await self._handle_failure(job, e)
+            finally:
+                self.queue.task_done()
+                self._update_gauges()
+
+    async def _handle_failure(
+        self,
+        job: IngestionJob,
+        error: Exception
+    ) -> None:
+        job.attempts += 1
+        if job.attempts >= self.max_retries:
+            logger.error(f"Dropping KB ingestion for {job.company} after {job.attempts} attempts: {error}")
+            metrics.incr("ingestion.dead_lettered")
+            if job.spool_id is not None:
+                await asyncio.to_thread(self.spool.delete, job.spool_id)
+            return
+
+        # Full jitter exponential backoff
+        delay = random.uniform(0, settings.IngestionRetryBaseDelay * (2 ** job.attempts))
+        logger.warning(f"KB ingestion for {job.company} failed (attempt {job.attempts}), retrying in {delay:.1f}s: {error}")
+        metrics.incr("ingestion.retried")
+        await asyncio.to_thread(self.spool.put, job, delay)
+
+    async def _replay_spool(self) -> None:
+        while True:
+            try:
+                free = self.queue.maxsize - self.queue.qsize()
+                if free > 0:
+                    for job in await asyncio.to_thread(self.spool.lease_due, free):
+                        job.enqueued_at = time.monotonic()
+                        self.queue.put_nowait(job)
+                self._update_gauges()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion spool replay failed: {e}")
+            await asyncio.sleep(settings.IngestionRetryInterval)
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("ingestion.queue_depth", self.queue.qsize())
+
+    async def aclose(
+        self,
+        timeout: float = settings.IngestionFlushTimeout
+    ) -> None:
+        """
+        Flush hook for shutdown: drain the queue within `timeout`, spool whatever is left.
+        """
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Ingestion flush timed out with {self.queue.qsize()} jobs queued; spooling remainder.")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            self.spool.put(job)
+
+        pending = self.spool.size()
+        self.spool.close()
+        logger.info(f"Ingestion service stopped ({pending} jobs left in spool). Metrics: {metrics.snapshot('ingestion.')}")
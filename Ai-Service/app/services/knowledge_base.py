@@ -1,22 +1,41 @@
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from app.core.rate_limiter import embedding_limiter, priority_for
+from app.services.embedding_dispatcher import EmbeddingDispatcher
+from app.services.company_resolver import companies
+from app.core.resilience import providers, CircuitOpenError
 from app.states.global_state import services
 from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
 from app.utils.logger import logger
-from typing import List
+from typing import Any, Dict, List
 import uuid
 
 settings = Config.Config.from_env()
 
 class KnowledgeBaseService:
+    # Shared by every instance so concurrent sessions coalesce into the same batches
+    _dispatcher: EmbeddingDispatcher = None
+
     def __init__(self):
         self.index_name = settings.PINECONE_INDEX
+        # The embeddings client has no retry setting and doesn't retry a 429 itself, so retries and
+        # backoff happen only in the dispatcher under the "embeddings" provider policy.
         self.embeddings = GoogleGenerativeAIEmbeddings(model=settings.EmbeddingModel)
+        if KnowledgeBaseService._dispatcher is None:
+            KnowledgeBaseService._dispatcher = EmbeddingDispatcher(
+                self.embeddings,
+                max_batch_size=settings.EmbeddingBatchSize,
+                max_wait_ms=settings.EmbeddingBatchWaitMs,
+                limiter=embedding_limiter,
+                provider="embeddings"
+            )
+        self.embedder = KnowledgeBaseService._dispatcher
 
     async def _get_index(self):
         try:
             pc = services.get_pinecone()
             # Index host
-            desc = await pc.describe_index(self.index_name)
+            desc = await providers.call("pinecone", lambda: pc.describe_index(self.index_name), retries=0)
             host = desc.host
             return pc.IndexAsyncio(host=host)
         except Exception as e:
@@ -29,34 +48,49 @@ class KnowledgeBaseService:
         content: str, 
         metadata: dict = None
     ) -> None:
+        try:
+            await self.upsert_research(company, content, metadata)
+        except Exception as e:
+            logger.error(f"Error storing research in Pinecone: {e}")
+
+    async def upsert_research(
+        self, 
+        company: str, 
+        content: str, 
+        metadata: dict = None
+    ) -> None:
+        """
+        Embed and upsert one research document. Raises on failure so callers can retry;
+        provider retries are left to the ingestion service's backoff.
+        """
         idx = await self._get_index()
         if not idx:
-            return
+            raise RuntimeError("Pinecone index unavailable")
         
-        try:
+        async with idx:
             # Truncate content to avoid embedding API limit and pinecone metadata limits 
             truncated_content = content[:10000]
             
-            vector = await self.embeddings.aembed_query(truncated_content)
+            # The dispatcher applies the embeddings policy once per upstream batch
+            vector = await self.embedder.aembed_query(truncated_content, priority=priority_for("ingestion"), retries=0)
             
-            full_metadata = {"company": company, "type": "research_summary", "text": truncated_content}
+            full_metadata = {"company": company, "company_key": companies.key(company), "type": "research_summary", "text": truncated_content}
             if metadata:
                 full_metadata.update(metadata)
             
             doc_id = str(uuid.uuid4())
             
-            await idx.upsert(vectors=[
-                {
-                    "id": doc_id,
-                    "values": vector,
-                    "metadata": full_metadata
-                }
-            ])
-            
-        except Exception as e:
-            logger.error(f"Error storing research in Pinecone: {e}")
-        finally:
-            pass
+            await providers.call(
+                "pinecone",
+                lambda: idx.upsert(vectors=[
+                    {
+                        "id": doc_id,
+                        "values": vector,
+                        "metadata": full_metadata
+                    }
+                ]),
+                retries=0
+            )
 
     async def search(
         self, 
@@ -64,38 +98,56 @@ class KnowledgeBaseService:
         company: str = None, 
         k: int = settings.PineconeSearchK
     ) -> List[str]:
+        # RAG is optional context, fail fast instead of waiting on a provider known to be down
+        if providers.is_open("pinecone") or providers.is_open("embeddings"):
+            logger.warning("Knowledge base circuit open, skipping RAG")
+            metrics.incr("kb.rag_skipped")
+            return []
+
         try:
-            pc = services.get_pinecone()
-            desc = await pc.describe_index(self.index_name)
-            host = desc.host
+            vector = await self.embedder.aembed_query(query, priority=priority_for("kb_search"))
             
-            async with pc.IndexAsyncio(host=host) as idx:
-                vector = await self.embeddings.aembed_query(query)
-                
-                filter_dict = {}
-                if company:
-                    filter_dict["company"] = company
-                    
-                results = await idx.query(
-                    vector=vector,
-                    top_k=k,
-                    filter=filter_dict,
-                    include_metadata=True
-                )
+            filter_dict = {}
+            if company:
+                # Documents stored before company keys existed only carry the name
+                filter_dict["$or"] = [{"company_key": companies.key(company)}, {"company": company}]
                 
-                threshold = settings.PineconeThreshold
-                filtered_results = []
-                
-                for match in results.matches:
-                    score = match.score
-                    text = match.metadata.get("text", "")
-                    
-                    if score >= threshold:
-                        filtered_results.append(text)
-                
-                return filtered_results
+            matches = await providers.call("pinecone", lambda: self._query(vector, k, filter_dict))
+            
+            threshold = settings.PineconeThreshold
+            filtered_results = []
+            
+            for match in matches:
+                score = match.score
+                text = match.metadata.get("text", "")
                 
+                if score >= threshold:
+                    filtered_results.append(text)
+            
+            return filtered_results
+        
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping RAG: {e}")
+            metrics.incr("kb.rag_skipped")
+            return []
         except Exception as e:
             logger.error(f"Error searching Pinecone: {e}")
             return []
-        
\ No newline at end of file
+
+    async def _query(
+        self, 
+        vector: List[float], 
+        k: int, 
+        filter_dict: Dict[str, Any]
+    ) -> List[Any]:
+        pc = services.get_pinecone()
+        desc = await pc.describe_index(self.index_name)
+        
+        async with pc.IndexAsyncio(host=desc.host) as idx:
+            results = await idx.query(
+                vector=vector,
+                top_k=k,
+                filter=filter_dict,
+                include_metadata=True
+            )
+            return results.matches
@@ -0,0 +1,95 @@
+from collections import defaultdict
+from typing import List, Set
+import numpy as np
+import zlib
+import re
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+class NearDuplicateDetector:
+    """
+    MinHash signatures over word shingles with LSH banding to find near-duplicate
+    texts (syndicated press releases, mirrored articles) without pairwise comparison.
+    """
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        threshold: float = 0.7,
+        seed: int = 7
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(
+        self,
+        text: str
+    ) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        n = self.shingle_size
+        grams = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+        return np.fromiter((zlib.crc32(g.encode()) % int(_PRIME) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signatures(
+        self,
+        texts: List[str]
+    ) -> np.ndarray:
+        """
+        (len(texts), num_perm) matrix of MinHash values. Texts without words keep a row of
+        `_PRIME`, above any real hash value.
+        """
+        sigs = np.full((len(texts), self.num_perm), _PRIME, dtype=np.uint64)
+        for i, text in enumerate(texts):
+            hashed = self.shingles(text)
+            if hashed.size:
+                # (shingles, num_perm) permutations, min over shingles
+                sigs[i] = ((np.outer(hashed, self._a) + self._b) % _PRIME).min(axis=0)
+        return sigs
+
+    def duplicates(
+        self,
+        texts: List[str]
+    ) -> Set[int]:
+        """
+        Indexes of texts that near-duplicate an earlier text. Earlier texts win,
+        so callers should order by preference.
+        """
+        if len(texts) < 2:
+            return set()
+
+        sigs = self.signatures(texts)
+        buckets = defaultdict(list)
+        for i in range(len(texts)):
+            if (sigs[i] == _PRIME).all():
+                # Nothing to compare: empty texts are not duplicates of each other
+                continue
+            for band in range(self.bands):
+                key = (band, sigs[i, band * self.rows:(band + 1) * self.rows].tobytes())
+                buckets[key].append(i)
+
+        dropped: Set[int] = set()
+        for members in buckets.values():
+            for pos, j in enumerate(members):
+                if j in dropped:
+                    continue
+                for i in members[:pos]:
+                    if i in dropped:
+                        continue
+                    if float(np.mean(sigs[i] == sigs[j])) >= self.threshold:
+                        dropped.add(j)
+                        break
+        return dropped
@@ -0,0 +1,128 @@
+from app.services.company_resolver import companies
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from app.utils.metrics import metrics
+from typing import Any, Dict, Optional, Tuple
+import copy
+import time
+
+
+@dataclass
+class CachedPlan:
+    plan: Dict[str, Any]
+    stored_at: float = field(default_factory=time.monotonic)
+
+
+class PlanCache:
+    """
+    Read-through cache of the latest plan per (company key, user), also reachable by plan id.
+
+    Consistency, per process:
+      - Plans created or edited through PlanService in this process are written to the
+        cache as the database returns them, so reads after writes here see them.
+      - Writes from other processes (other workers, direct database edits) are seen once
+        the entry expires, after at most `ttl_seconds`. Until then a latest-plan lookup
+        can return the older plan.
+      - Section updates are guarded by the cached `updated_at`: if the row changed
+        elsewhere the write matches nothing, the entry is dropped and the update is
+        applied to a fresh read, so a stale entry never overwrites other sections.
+      - Missing plans are not cached.
+    Entries are copied in and out, callers can modify what they get.
+    """
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        max_entries: int = 1024
+    ) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedPlan]" = OrderedDict()
+        self._by_id: Dict[str, Tuple[str, str]] = {}
+        self._lookups = 0
+        self._hits = 0
+
+    def latest(
+        self,
+        company: str,
+        user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return self._lookup((companies.key(company), user_id or ""))
+
+    def get(
+        self,
+        plan_id: str
+    ) -> Optional[Dict[str, Any]]:
+        key = self._by_id.get(plan_id)
+        if key is None:
+            self._count(False)
+            return None
+        return self._lookup(key)
+
+    def store(
+        self,
+        plan: Dict[str, Any]
+    ) -> None:
+        """
+        Cache a plan as the latest for its company and user. Plans without an id or company are ignored.
+        """
+        if not plan.get("id") or not plan.get("company"):
+            return
+        key = (plan.get("company_key") or companies.key(plan["company"]), plan.get("user_id") or "")
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._by_id.pop(previous.plan["id"], None)
+        self._entries[key] = CachedPlan(plan=copy.deepcopy(plan))
+        self._entries.move_to_end(key)
+        self._by_id[plan["id"]] = key
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._by_id.pop(evicted.plan["id"], None)
+
+    def update(
+        self,
+        plan: Dict[str, Any]
+    ) -> None:
+        """
+        Refresh a cached plan after a write. Only replaces an entry that is still the latest
+        for its key, an update to an older plan must not shadow a newer one.
+        """
+        if plan.get("id") not in self._by_id:
+            return
+        entry = self._entries[self._by_id[plan["id"]]]
+        entry.plan = {**entry.plan, **copy.deepcopy(plan)}
+        entry.stored_at = time.monotonic()
+
+    def invalidate(
+        self,
+        plan_id: str
+    ) -> None:
+        key = self._by_id.pop(plan_id, None)
+        if key is not None:
+            self._entries.pop(key, None)
+
+    @property
+    def hit_rate(self) -> float:
+        return self._hits / self._lookups if self._lookups else 0.0
+
+    def _lookup(
+        self,
+        key: Tuple[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at >= self.ttl:
+            self._entries.pop(key)
+            self._by_id.pop(entry.plan["id"], None)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        self._count(entry is not None)
+        return copy.deepcopy(entry.plan) if entry is not None else None
+
+    def _count(
+        self,
+        hit: bool
+    ) -> None:
+        self._lookups += 1
+        self._hits += hit
+        metrics.incr("plan_cache.hits" if hit else "plan_cache.misses")
+        metrics.set_gauge("plan_cache.hit_rate", self.hit_rate)
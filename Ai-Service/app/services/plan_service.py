@@ -1,45 +1,59 @@
+from app.services.company_resolver import companies
+from app.services.plan_cache import PlanCache
 from app.states.global_state import services
+from datetime import datetime, timezone
+from app.Config.dataConfig import Config
+from app.utils.metrics import metrics
 from app.utils.logger import logger
 from typing import Dict, Any
 
+settings = Config.Config.from_env()
+
 class PlanService:
+    # Shared by every instance, consistency guarantees are described on PlanCache
+    _cache: PlanCache = None
+
     def __init__(self) -> None:
-        pass
+        if PlanService._cache is None:
+            PlanService._cache = PlanCache(
+                ttl_seconds=settings.PlanCacheTTL,
+                max_entries=settings.PlanCacheMaxEntries
+            )
+        self.cache = PlanService._cache if settings.PlanCacheEnabled else None
 
     @property
-    def client(self):
-        return services.get_supabase()
+    def repository(self):
+        return services.get_repository()
 
     async def create_plan(
         self, 
         plan_data: Dict[str, Any]
     ) -> Dict[str, Any]:
+        if plan_data.get("company"):
+            plan_data = {**plan_data, "company_key": companies.key(plan_data["company"])}
         try:
-            response = await self.client.table("account_plans")\
-                                .insert(plan_data)\
-                                .execute()
+            saved = await self.repository.insert_plan(plan_data)
             
-            if response.data:
-                return response.data[0]
+            if saved:
+                if self.cache:
+                    self.cache.store(saved)
+                return saved
             return plan_data        # Fallback
         
         except Exception as e:
-            logger.error(f"Error creating plan in Supabase: {e}")
+            logger.error(f"Error creating plan: {e}")
             return None
 
     async def get_plan(
         self, 
         plan_id: str
     ) -> Dict[str, Any]:
+        if self.cache:
+            cached = self.cache.get(plan_id)
+            if cached:
+                return cached
         try:
-            response = await self.client.table("account_plans")\
-                        .select("*")\
-                        .eq("id", plan_id)\
-                        .execute()
-            
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
+            return await self.repository.get_plan(plan_id)
         
         except Exception as e:
             logger.error(f"Error fetching plan: {e}")
@@ -50,21 +64,16 @@ class PlanService:
         company: str, 
         user_id: str = None
     ) -> Dict[str, Any]:
+        if self.cache:
+            cached = self.cache.latest(company, user_id)
+            if cached:
+                return cached
         try:
-            query = self.client.table("account_plans")\
-                .select("*")\
-                .eq("company", company)
-            
-            if user_id:
-                query = query.eq("user_id", user_id)
-                
-            response = await query.order("created_at", desc=True)\
-                        .limit(1)\
-                        .execute()
+            plan = await self.repository.latest_plan(companies.key(company), company, user_id)
             
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
+            if plan and self.cache:
+                self.cache.store(plan)
+            return plan
         
         except Exception as e:
             logger.error(f"Error fetching plan: {e}")
@@ -77,24 +86,32 @@ class PlanService:
         content: str
     ) -> Dict[str, Any]:
         try:
-            # fetch, update dict, save back.
-            current_plan = await self.client.table("account_plans")\
-                            .select("sections")\
-                            .eq("id", plan_id)\
-                            .single().execute()
-            if not current_plan.data:
+            # fetch (from the cache when possible), update dict, save back.
+            cached = self.cache.get(plan_id) if self.cache else None
+            current = cached or await self.repository.get_plan_sections(plan_id)
+            if not current:
                 return None
             
-            sections = current_plan.data.get("sections", {})
+            sections = current.get("sections", {})
             sections[section] = content
             
-            response = await self.client.table("account_plans")\
-                        .update({"sections": sections})\
-                        .eq("id", plan_id)\
-                        .execute()
+            # Only if nobody else wrote the row since it was cached
+            updated = await self.repository.update_plan_sections(
+                plan_id, 
+                sections, 
+                datetime.now(timezone.utc), 
+                expected_updated_at=cached.get("updated_at") if cached else None
+            )
             
-            if response.data:
-                return response.data[0]
+            if updated:
+                if self.cache:
+                    self.cache.update(updated)
+                return updated
+            if cached:
+                logger.info(f"Plan {plan_id} changed since it was cached, retrying the update on a fresh read")
+                metrics.incr("plan_cache.conflicts")
+                self.cache.invalidate(plan_id)
+                return await self.update_section(plan_id, section, content)
             return None
         
         except Exception as e:
@@ -0,0 +1,233 @@
+from app.schemas.websocket_messages import AssistantChunk, PlanAckPayload, PlanDelta, PlanSnapshot, PlanUpdate
+from app.services.plan_service import PlanService
+from typing import Any, Awaitable, Callable, Dict, List
+from app.utils.metrics import metrics
+from app.utils.text import utf16_len
+from pydantic import BaseModel
+import difflib
+import hashlib
+import json
+
+# Versions not yet acknowledged by the client that are remembered per plan
+MAX_PENDING_VERSIONS = 256
+
+
+def plan_version(
+    sections: Dict[str, Any]
+) -> str:
+    """
+    Content hash of a plan's sections, the same on both ends for the same content
+    (frontend src/utils/planSync.js planVersion).
+    """
+    canonical = json.dumps(sections, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:10]
+
+
+def diff_section(
+    old: Any,
+    new: Any
+) -> List[Dict[str, Any]]:
+    """
+    Operations turning `old` into `new`, applied in order:
+      {"op": "set", "value"}                      whole section (new section or type change)
+      {"op": "patch", "start", "end", "text"}     text[start:end] = text, offsets in UTF-16 code units
+      {"op": "insert" | "replace", "index", "value"}, {"op": "remove", "index"}   list items
+    """
+    if old == new:
+        return []
+    if isinstance(old, str) and isinstance(new, str):
+        prefix = 0
+        limit = min(len(old), len(new))
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        # Compared by character so a patch never splits a surrogate pair, sent in the units JavaScript slices by
+        start = utf16_len(old[:prefix])
+        end = start + utf16_len(old[prefix:len(old) - suffix])
+        return [{"op": "patch", "start": start, "end": end, "text": new[prefix:len(new) - suffix]}]
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        # From the end, so the indices of earlier opcodes stay valid
+        for tag, i1, i2, j1, j2 in reversed(difflib.SequenceMatcher(a=old, b=new, autojunk=False).get_opcodes()):
+            if tag == "equal":
+                continue
+            common = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            ops.extend({"op": "replace", "index": i1 + k, "value": new[j1 + k]} for k in range(common))
+            ops.extend({"op": "remove", "index": i} for i in range(i2 - 1, i1 + common - 1, -1))
+            ops.extend({"op": "insert", "index": i1 + k, "value": new[j1 + k]} for k in range(common, j2 - j1))
+        return ops
+    return [{"op": "set", "value": new}]
+
+
+def apply_ops(
+    value: Any,
+    ops: List[Dict[str, Any]]
+) -> Any:
+    """
+    Reference implementation of the client side of `diff_section`, slicing text by UTF-16 code units.
+    """
+    for op in ops:
+        if op["op"] == "set":
+            value = op["value"]
+        elif op["op"] == "patch":
+            units = value.encode("utf-16-le")
+            value = (units[:2 * op["start"]] + op["text"].encode("utf-16-le") + units[2 * op["end"]:]).decode("utf-16-le")
+        elif op["op"] == "insert":
+            value = value[:op["index"]] + [op["value"]] + value[op["index"]:]
+        elif op["op"] == "remove":
+            value = value[:op["index"]] + value[op["index"] + 1:]
+        elif op["op"] == "replace":
+            value = value[:op["index"]] + [op["value"]] + value[op["index"] + 1:]
+    return value
+
+
+class PlanSyncSession:
+    """
+    Per-connection plan state for delta-encoded plan updates. Every PlanUpdate coming out of
+    the orchestrator is turned into a PlanDelta against the last version sent for that plan;
+    the client applies it when it holds `base_version` and acknowledges what it has.
+    A full PlanSnapshot is only sent for a plan the connection has not seen yet (reconnect)
+    or when the client reports a version the session does not know.
+
+    With `delta` off, messages pass through unchanged. Plan bytes are counted either way,
+    next to what full-content updates would have cost.
+    """
+    def __init__(
+        self,
+        send_json: Callable[[Dict[str, Any]], Awaitable[None]],
+        plan_service: PlanService,
+        delta: bool = True
+    ) -> None:
+        self.send_json = send_json
+        self.plan_service = plan_service
+        self.delta = delta
+        self.plans: Dict[str, Dict[str, Any]] = {}
+        # Versions sent and not acknowledged yet, oldest first
+        self.pending: Dict[str, List[str]] = {}
+        self.bytes_sent = 0
+        self.full_bytes = 0
+        self.snapshots = 0
+        self.deltas = 0
+
+    async def send(
+        self,
+        message: BaseModel
+    ) -> None:
+        data = message.dict()
+        if isinstance(message, PlanUpdate):
+            await self._plan_update(message, data)
+        elif isinstance(message, AssistantChunk) and message.payload.plan_id:
+            self.full_bytes += self._size(data)
+            if not self.delta:
+                await self._send_plan_message(data)
+        else:
+            await self.send_json(data)
+
+    async def ack(
+        self,
+        payload: PlanAckPayload
+    ) -> None:
+        sections = await self._sections(payload.plan_id)
+        pending = self.pending.get(payload.plan_id, [])
+        if payload.version is not None and payload.version in pending:
+            del pending[:pending.index(payload.version)]
+            return
+        if payload.version is not None and payload.version == plan_version(sections):
+            self.pending[payload.plan_id] = [payload.version]
+            return
+        metrics.incr("plan_sync.resyncs")
+        await self._snapshot(payload.plan_id)
+
+    def report(self) -> str:
+        metrics.incr("plan_sync.bytes", self.bytes_sent)
+        metrics.incr("plan_sync.full_bytes", self.full_bytes)
+        saved = 1 - self.bytes_sent / self.full_bytes if self.full_bytes else 0.0
+        return (
+            f"Plan sync: {self.bytes_sent} bytes sent vs {self.full_bytes} with full-content updates "
+            f"({saved:.0%} saved, {self.deltas} deltas, {self.snapshots} snapshots)"
+        )
+
+    async def _plan_update(
+        self,
+        message: PlanUpdate,
+        data: Dict[str, Any]
+    ) -> None:
+        payload = message.payload
+        if not self.delta:
+            self.full_bytes += self._size(data)
+            await self._send_plan_message(data)
+            return
+
+        sections = await self._sections(payload.plan_id, announce=True)
+        old = sections.get(payload.section)
+        new = payload.content
+        if payload.append and isinstance(old, type(new)):
+            new = old + new
+        self.full_bytes += self._size(PlanUpdate(payload={"plan_id": payload.plan_id, "section": payload.section, "content": new}).dict())
+
+        ops = diff_section(old, new)
+        if not ops:
+            return
+        base_version = plan_version(sections)
+        sections[payload.section] = new
+        version = plan_version(sections)
+        self._remember(payload.plan_id, version)
+        self.deltas += 1
+        await self._send_plan_message(PlanDelta(payload={
+            "plan_id": payload.plan_id,
+            "section": payload.section,
+            "base_version": base_version,
+            "version": version,
+            "ops": ops
+        }).dict())
+
+    async def _sections(
+        self,
+        plan_id: str,
+        announce: bool = False
+    ) -> Dict[str, Any]:
+        """
+        The plan as last sent on this connection. A plan seen for the first time is loaded from
+        the database (empty while it is still being generated); with `announce` it is sent as a snapshot.
+        """
+        if plan_id not in self.plans:
+            plan = await self.plan_service.get_plan(plan_id)
+            self.plans[plan_id] = dict((plan or {}).get("sections") or {})
+            if announce:
+                await self._snapshot(plan_id)
+        return self.plans[plan_id]
+
+    async def _snapshot(
+        self,
+        plan_id: str
+    ) -> None:
+        sections = self.plans[plan_id]
+        version = plan_version(sections)
+        self.pending[plan_id] = [version]
+        self.snapshots += 1
+        await self._send_plan_message(PlanSnapshot(payload={"plan_id": plan_id, "version": version, "sections": sections}).dict())
+
+    def _remember(
+        self,
+        plan_id: str,
+        version: str
+    ) -> None:
+        pending = self.pending.setdefault(plan_id, [])
+        pending.append(version)
+        if len(pending) > MAX_PENDING_VERSIONS:
+            del pending[0]
+
+    async def _send_plan_message(
+        self,
+        data: Dict[str, Any]
+    ) -> None:
+        self.bytes_sent += self._size(data)
+        await self.send_json(data)
+
+    @staticmethod
+    def _size(
+        data: Dict[str, Any]
+    ) -> int:
+        return len(json.dumps(data, separators=(",", ":")).encode())
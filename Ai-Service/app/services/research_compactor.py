@@ -0,0 +1,246 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from datetime import date
+import json
+import math
+import re
+
+# Rough chars-per-token ratio for English prose with Gemini tokenizers
+CHARS_PER_TOKEN = 4
+
+# Navigation, consent and promo text in scraped pages. Whole words only, so "subscribers",
+# "catalog includes" or "Cookie Brands" in a fact never match. Consent and promo sentences
+# match to their end so a line made of them counts as boilerplate throughout.
+BOILERPLATE_PATTERNS = re.compile(
+    r"(?:\b(?:we use cookies|(?:accept|reject|manage)(?: all)? cookies|by (?:continuing|using) (?:this|our) (?:site|website)|"
+    r"(?:subscribe|sign up) (?:to|for) our|copyright \d{4})|© ?\d{4})[^.!?|]*|"
+    r"\b(?:cookie (?:policy|settings|preferences|consent)|subscribe(?: now)?|sign up|sign in|log in|newsletter|"
+    r"all rights reserved|privacy policy|terms of (?:use|service)|advertisement|share this(?: article| story)?|"
+    r"follow us(?: on)?|click here|read more|skip to(?: main)? content)\b",
+    re.IGNORECASE
+)
+# Share of a short line's characters that must be boilerplate for the line to be dropped
+BOILERPLATE_SHARE = 0.5
+
+def estimate_tokens(
+    text: str
+) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class Snippet:
+    title: str
+    url: str
+    source: str
+    text: str
+    score: float
+    date: Optional[str] = None
+    rank: float = 0.0
+
+    def render(
+        self,
+        index: int
+    ) -> str:
+        meta = ", ".join(x for x in (self.source, self.date) if x)
+        header = f"[{index}] {self.title} ({meta})"
+        if self.url:
+            header += f" {self.url}"
+        return f"{header}\n{self.text}"
+
+
+@dataclass
+class CompactResult:
+    text: str
+    snippets: List[Snippet] = field(default_factory=list)
+    tokens_before: int = 0
+    tokens_after: int = 0
+    dropped: int = 0
+
+
+class ResearchCompactor:
+    """
+    Turns raw Tavily/Perplexity responses into a compact, deduplicated and ranked
+    snippet list that fits a per-prompt token budget.
+    """
+    def __init__(
+        self,
+        max_snippet_chars: int = 1200,
+        similarity_threshold: float = 0.6,
+        recency_weight: float = 0.3
+    ) -> None:
+        self.max_snippet_chars = max_snippet_chars
+        self.similarity_threshold = similarity_threshold
+        self.recency_weight = recency_weight
+
+    def normalize(
+        self,
+        data: Dict[str, Any]
+    ) -> List[Snippet]:
+        snippets: List[Snippet] = []
+
+        tavily = data.get("tavily") or {}
+        if tavily.get("answer"):
+            snippets.append(Snippet(title="Tavily answer", url="", source="tavily", text=self._clean(tavily["answer"]), score=1.0))
+        for r in tavily.get("results", []) or []:
+            snippets.append(Snippet(
+                title=r.get("title", ""),
+                url=r.get("url", ""),
+                source="tavily",
+                text=self._clean(r.get("content", "")),
+                score=float(r.get("score") or 0.5),
+                date=self._date(r.get("published_date"))
+            ))
+
+        perplexity = data.get("perplexity") or {}
+        results = perplexity.get("results", []) or []
+        for i, r in enumerate(results):
+            snippets.append(Snippet(
+                title=r.get("title", ""),
+                url=r.get("url", ""),
+                source="perplexity",
+                text=self._clean(r.get("snippet", "")),
+                # Perplexity returns no score, results are ordered by relevance
+                score=1.0 - 0.5 * i / max(1, len(results)),
+                date=self._date(r.get("date"))
+            ))
+
+        return [s for s in snippets if s.text]
+
+    def deduplicate(
+        self,
+        snippets: List[Snippet]
+    ) -> List[Snippet]:
+        """
+        Drops snippets from the same page or with overlapping text, keeping the best scored one.
+        """
+        kept: List[Snippet] = []
+        kept_shingles: List[set] = []
+        seen_urls = set()
+
+        for snippet in sorted(snippets, key=lambda s: s.score, reverse=True):
+            url_key = self._url_key(snippet.url)
+            if url_key and url_key in seen_urls:
+                continue
+            shingles = self._shingles(snippet.text)
+            if any(self._jaccard(shingles, other) >= self.similarity_threshold for other in kept_shingles):
+                continue
+            if url_key:
+                seen_urls.add(url_key)
+            kept.append(snippet)
+            kept_shingles.append(shingles)
+        return kept
+
+    def rank(
+        self,
+        snippets: List[Snippet],
+        today: Optional[date] = None
+    ) -> List[Snippet]:
+        today = today or date.today()
+        for snippet in snippets:
+            snippet.rank = (1 - self.recency_weight) * snippet.score + self.recency_weight * self._recency(snippet.date, today)
+        return sorted(snippets, key=lambda s: s.rank, reverse=True)
+
+    def pack(
+        self,
+        snippets: List[Snippet],
+        token_budget: int
+    ) -> List[Snippet]:
+        packed: List[Snippet] = []
+        used = 0
+        for snippet in snippets:
+            if len(snippet.text) > self.max_snippet_chars:
+                snippet.text = snippet.text[:self.max_snippet_chars].rsplit(" ", 1)[0] + "..."
+            cost = estimate_tokens(snippet.render(len(packed) + 1)) + 1
+            if used + cost > token_budget:
+                continue
+            packed.append(snippet)
+            used += cost
+        return packed
+
+    def compact(
+        self,
+        data: Dict[str, Any],
+        token_budget: int
+    ) -> CompactResult:
+        normalized = self.normalize(data)
+        packed = self.pack(self.rank(self.deduplicate(normalized)), token_budget)
+        text = "\n\n".join(s.render(i + 1) for i, s in enumerate(packed))
+
+        errors = [f"{name}: {res['error']}" for name, res in data.items() if isinstance(res, dict) and res.get("error")]
+        if errors:
+            text += "\n\nProvider errors: " + "; ".join(errors)
+
+        return CompactResult(
+            text=text,
+            snippets=packed,
+            tokens_before=estimate_tokens(json.dumps(data, default=str)),
+            tokens_after=estimate_tokens(text),
+            dropped=len(normalized) - len(packed)
+        )
+
+    def _clean(
+        self,
+        text: str
+    ) -> str:
+        lines = [line.strip() for line in (text or "").splitlines()]
+        lines = [line for line in lines if line and not (len(line) < 200 and self._boilerplate_share(line) >= BOILERPLATE_SHARE)]
+        return re.sub(r"\s+", " ", " ".join(lines)).strip()
+
+    @staticmethod
+    def _boilerplate_share(
+        line: str
+    ) -> float:
+        """
+        Fraction of the line's letters and digits inside boilerplate matches.
+        """
+        covered = sum(len(re.findall(r"\w", m.group(0))) for m in BOILERPLATE_PATTERNS.finditer(line))
+        total = len(re.findall(r"\w", line))
+        return covered / total if total else 0.0
+
+    @staticmethod
+    def _date(
+        value: Any
+    ) -> Optional[str]:
+        if not value:
+            return None
+        match = re.search(r"\d{4}-\d{2}-\d{2}|\d{4}", str(value))
+        return match.group(0) if match else None
+
+    @staticmethod
+    def _recency(
+        value: Optional[str],
+        today: date
+    ) -> float:
+        if not value:
+            return 0.5
+        try:
+            published = date.fromisoformat(value) if len(value) == 10 else date(int(value), 7, 1)
+        except ValueError:
+            return 0.5
+        age_days = max(0, (today - published).days)
+        return math.exp(-age_days / 365)
+
+    @staticmethod
+    def _url_key(
+        url: str
+    ) -> str:
+        url = re.sub(r"^https?://(www\.)?", "", (url or "").lower())
+        return url.split("?")[0].split("#")[0].rstrip("/")
+
+    @staticmethod
+    def _shingles(
+        text: str,
+        size: int = 3
+    ) -> set:
+        words = re.findall(r"\w+", text.lower())
+        return {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+
+    @staticmethod
+    def _jaccard(
+        a: set,
+        b: set
+    ) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
@@ -1,11 +1,19 @@
 from perplexity import AsyncPerplexity, DefaultAioHttpClient
 from app.services.knowledge_base import KnowledgeBaseService
+from app.services.research_store import pack_raw, summarize_research
+from app.services.company_resolver import companies
+from app.services.near_duplicates import NearDuplicateDetector
+from app.core.resilience import providers, CircuitOpenError
 from app.schemas.websocket_messages import StatusUpdate
+from app.schemas.research import SubQuery
 from app.states.global_state import services
 from app.Config.dataConfig import Config
 from tavily import AsyncTavilyClient
+from typing import Dict, Any, List, Tuple
+from app.utils.metrics import metrics
 from app.utils.logger import logger
-from typing import Dict, Any
+import asyncio
+import time
 
 settings = Config.Config.from_env()
 
@@ -17,11 +25,17 @@ class ResearchService:
         self.tavily = AsyncTavilyClient(api_key=settings.TAVILY_API_KEY) if settings.TAVILY_API_KEY else None
         self.perplexity_key = settings.PERPLEXITY_API_KEY
         self.kb = KnowledgeBaseService()
+        self.dedup = NearDuplicateDetector(
+            num_perm=settings.DedupNumPerm,
+            bands=settings.DedupBands,
+            threshold=settings.DedupThreshold
+        )
 
     async def search_tavily(
         self, 
         query: str, 
-        send_callback=None
+        send_callback=None, 
+        search_depth: str = settings.TavilySearchDepth
     ) -> Dict[Any, Any]:
         try:
             if send_callback:
@@ -31,11 +45,17 @@ class ResearchService:
                     )
                 )
             
-            response = await self.tavily.search(
-                query=query, 
-                search_depth=settings.TavilySearchDepth
+            response = await providers.call(
+                "tavily",
+                lambda: self.tavily.search(
+                    query=query, 
+                    search_depth=search_depth
+                )
             )
             return response
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping Tavily: {e}")
+            return {"error": "Tavily is temporarily unavailable"}
         except Exception as e:
             logger.error(f"Tavily Exception: {e}")
             return {"error": str(e)}
@@ -53,32 +73,41 @@ class ResearchService:
                         )
                     )
 
-            # AsyncPerplexity with context manager
-            http_client = DefaultAioHttpClient()
-            try:
-                async with AsyncPerplexity(api_key=self.perplexity_key, http_client=http_client) as client:
-                    search = await client.search.create(
-                        query=query,
-                        max_results=settings.PerplexityMaxResults
-                    )
-                    
-                    results = []
-                    for result in search.results:
-                        results.append({
-                            "title": getattr(result, "title", "No Title"),
-                            "url": getattr(result, "url", ""),
-                            "snippet": getattr(result, "snippet", "")
-                        })
-                    
-                    return {"results": results}
-            finally:
-                if not http_client.is_closed:
-                    await http_client.aclose()
-            
+            return await providers.call("perplexity", lambda: self._perplexity_search(query))
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping Perplexity: {e}")
+            return {"error": "Perplexity is temporarily unavailable"}
         except Exception as e:
             logger.error(f"Perplexity Exception: {e}")
             return {"error": str(e)}
 
+    async def _perplexity_search(
+        self, 
+        query: str
+    ) -> Dict[str, Any]:
+        # AsyncPerplexity with context manager
+        http_client = DefaultAioHttpClient()
+        try:
+            async with AsyncPerplexity(api_key=self.perplexity_key, http_client=http_client) as client:
+                search = await client.search.create(
+                    query=query,
+                    max_results=settings.PerplexityMaxResults
+                )
+                
+                results = []
+                for result in search.results:
+                    results.append({
+                        "title": getattr(result, "title", "No Title"),
+                        "url": getattr(result, "url", ""),
+                        "snippet": getattr(result, "snippet", ""),
+                        "date": getattr(result, "date", None)
+                    })
+                
+                return {"results": results}
+        finally:
+            if not http_client.is_closed:
+                await http_client.aclose()
+
     async def research_company(
         self, 
         company_name: str, 
@@ -86,43 +115,232 @@ class ResearchService:
         send_callback=None, 
         custom_query: str = None,
         tavily_query: str = None,
-        perplexity_query: str = None
+        perplexity_query: str = None,
+        timeout: float = None,
+        single_provider: bool = False
     ) -> Dict[str, Any]:
-        
+        """
+        Query Tavily and Perplexity concurrently. `timeout` bounds the wait on each provider;
+        `single_provider` queries Tavily only (requests short on time, follow-up searches).
+        """
         if not tavily_query:
             tavily_query = custom_query if custom_query else f"Research {company_name} {scope}"
         
         if not perplexity_query:
             perplexity_query = custom_query if custom_query else f"Detailed research on {company_name} focusing on {scope}"
         
-        tavily_res = await self.search_tavily(tavily_query, send_callback)
+        async def bounded(name, search):
+            try:
+                return await asyncio.wait_for(search, timeout) if timeout else await search
+            except asyncio.TimeoutError:
+                logger.warning(f"{name} did not answer within {timeout:.1f}s")
+                return {"error": f"{name} timed out"}
+
+        # Both providers are independent, query them concurrently
+        if single_provider:
+            tavily_res = await bounded("Tavily", self.search_tavily(tavily_query, send_callback))
+            perplexity_res = {}
+        else:
+            tavily_res, perplexity_res = await asyncio.gather(
+                bounded("Tavily", self.search_tavily(tavily_query, send_callback)),
+                bounded("Perplexity", self.search_perplexity(perplexity_query, send_callback))
+            )
         if send_callback:
-            await send_callback(StatusUpdate(payload={"stage": "research", "message": "Tavily search complete. Analyzing results..."}))
+            sources = "Tavily" if single_provider else "Tavily and Perplexity"
+            await send_callback(StatusUpdate(payload={"stage": "research", "message": f"{sources} research complete. Processing data..."}))
+
+        return await self._finalize(company_name, scope, tavily_res, perplexity_res, send_callback)
+
+    async def research_aspects(
+        self, 
+        company_name: str, 
+        sub_queries: List[SubQuery], 
+        scope: str = "General", 
+        send_callback=None, 
+        timeout: float = None
+    ) -> Dict[str, Any]:
+        """
+        Run aspect-specific sub-queries concurrently within the fan-out budget (query count,
+        advanced searches, concurrency) and merge the results into the usual research shape.
+        """
+        budgeted, advanced = [], 0
+        for sq in sub_queries[:settings.FanOutMaxQueries]:
+            if sq.provider == "tavily" and sq.search_depth == "advanced":
+                advanced += 1
+                if advanced > settings.FanOutMaxAdvanced:
+                    sq = sq.model_copy(update={"search_depth": "basic"})
+            budgeted.append(sq)
+        sub_queries = budgeted
+
+        # `timeout` bounds the whole fan-out, queued sub-queries only get what is left of it
+        expires_at = time.monotonic() + timeout if timeout else None
+        slots = asyncio.Semaphore(settings.FanOutConcurrency)
+        async def run(sq: SubQuery):
+            async with slots:
+                start = time.perf_counter()
+                remaining = expires_at - time.monotonic() if expires_at else None
+                if remaining is not None and remaining <= 0:
+                    return {"error": f"{sq.aspect} search timed out"}
+                if sq.provider == "perplexity":
+                    search = self.search_perplexity(sq.query, send_callback)
+                else:
+                    search = self.search_tavily(sq.query, send_callback, search_depth=sq.search_depth)
+                try:
+                    result = await asyncio.wait_for(search, remaining) if remaining else await search
+                except asyncio.TimeoutError:
+                    result = {"error": f"{sq.aspect} search timed out"}
+                metrics.observe(f"research.fanout.{sq.provider}.{sq.search_depth}", time.perf_counter() - start)
+                return result
+
+        results = await asyncio.gather(*(run(sq) for sq in sub_queries))
 
-        perplexity_res = await self.search_perplexity(perplexity_query, send_callback)
+        merged = {"tavily": {"results": []}, "perplexity": {"results": []}}
+        seen_urls = set()
+        errors = {"tavily": [], "perplexity": []}
+        for sq, result in zip(sub_queries, results):
+            if result.get("error"):
+                errors[sq.provider].append(result["error"])
+            for r in result.get("results") or []:
+                if r.get("url") and r["url"] in seen_urls:
+                    continue
+                seen_urls.add(r.get("url"))
+                merged[sq.provider]["results"].append({**r, "aspect": sq.aspect})
+        for provider, provider_errors in errors.items():
+            if provider_errors and not merged[provider]["results"]:
+                merged[provider]["error"] = "; ".join(provider_errors)
+
+        covered = {sq.aspect for sq, result in zip(sub_queries, results) if result.get("results")}
+        metrics.incr("research.fanout.queries", len(sub_queries))
+        metrics.set_gauge("research.fanout.coverage", len(covered) / len(sub_queries) if sub_queries else 0.0)
+        logger.info(
+            f"Fan-out for {company_name}: {len(sub_queries)} sub-queries, {len(seen_urls)} unique results, "
+            f"aspects covered: {', '.join(sorted(covered)) or 'none'}"
+        )
         if send_callback:
-            await send_callback(StatusUpdate(payload={"stage": "research", "message": "Perplexity research complete. Processing data..."}))
+            await send_callback(StatusUpdate(payload={"stage": "research", "message": f"Searched {len(sub_queries)} aspects of {company_name}. Processing data..."}))
+
+        return await self._finalize(company_name, scope, merged["tavily"], merged["perplexity"], send_callback)
+
+    def plan_sub_queries(
+        self, 
+        company_name: str, 
+        scope: str = "General", 
+        single_provider: bool = False
+    ) -> List[SubQuery]:
+        """
+        Templated aspect queries for plan research, `single_provider` moves them all to Tavily.
+        """
+        sub_queries = []
+        for template in settings.PlanResearchAspects:
+            sq = SubQuery(**{**template, "query": template["query"].format(company=company_name, scope=scope)})
+            if single_provider:
+                sq.provider = "tavily"
+            sub_queries.append(sq)
+        return sub_queries
+
+    async def _finalize(
+        self, 
+        company_name: str, 
+        scope: str, 
+        tavily_res: Dict[str, Any], 
+        perplexity_res: Dict[str, Any], 
+        send_callback=None
+    ) -> Dict[str, Any]:
+        tavily_res, perplexity_res = self._drop_near_duplicates(tavily_res, perplexity_res)
         
-        # Store in KB
-        if perplexity_res and "results" in perplexity_res:
+        # Queue for KB ingestion in the background
+        if perplexity_res and perplexity_res.get("results"):
             try:
                 if send_callback:
-                    await send_callback(StatusUpdate(payload={"stage": "research", "message": "Storing research in Knowledge Base..."}))
+                    await send_callback(StatusUpdate(payload={"stage": "research", "message": "Queued research for Knowledge Base..."}))
                 
                 text_content = "\n".join([r["snippet"] for r in perplexity_res["results"]])
-                await self.kb.store_research(
+                await self._ingest(
                     company_name, 
                     text_content, 
                     metadata={"source": "perplexity", "scope": scope}
                 )
             except Exception as e:
-                logger.warning(f"Failed to store research in KB: {e}")
+                logger.warning(f"Failed to queue research for KB: {e}")
 
         return {
             "tavily": tavily_res,
             "perplexity": perplexity_res
         }
 
+    @staticmethod
+    def merge_research(
+        base: Dict[str, Any], 
+        delta: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Fold follow-up results into earlier research, newest first, one result per URL.
+        """
+        merged = {}
+        for provider in dict.fromkeys([*base, *delta]):
+            old, new = base.get(provider) or {}, delta.get(provider) or {}
+            results = list(new.get("results") or [])
+            seen = {r.get("url") for r in results}
+            results += [r for r in old.get("results") or [] if r.get("url") not in seen]
+            entry = {**old, **new, "results": results}
+            if results:
+                entry.pop("error", None)
+            merged[provider] = entry
+        return merged
+
+    def _drop_near_duplicates(
+        self, 
+        tavily_res: Dict[str, Any], 
+        perplexity_res: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Remove near-duplicate results (syndicated copies, mirrored articles) across both providers.
+        Tavily results come first and are kept over Perplexity copies.
+        """
+        items = []
+        for name, res, field in (("tavily", tavily_res, "content"), ("perplexity", perplexity_res, "snippet")):
+            if isinstance(res, dict):
+                for i, r in enumerate(res.get("results") or []):
+                    items.append((name, i, r.get(field) or ""))
+        if len(items) < 2:
+            return tavily_res, perplexity_res
+
+        start = time.process_time()
+        dropped = self.dedup.duplicates([text for _, _, text in items])
+        cpu = time.process_time() - start
+
+        chars_before = sum(len(text) for _, _, text in items)
+        chars_after = sum(len(text) for k, (_, _, text) in enumerate(items) if k not in dropped)
+        ratio = chars_before / chars_after if chars_after else 1.0
+        metrics.observe("research.dedup_cpu", cpu)
+        metrics.incr("research.dedup_dropped", len(dropped))
+        metrics.set_gauge("research.dedup_compression_ratio", ratio)
+        logger.info(f"Dropped {len(dropped)}/{len(items)} near-duplicate results (compression {ratio:.2f}x, {cpu * 1000:.1f}ms CPU)")
+
+        if not dropped:
+            return tavily_res, perplexity_res
+
+        removed = {(items[k][0], items[k][1]) for k in dropped}
+        def keep(name, res):
+            if not isinstance(res, dict) or not res.get("results"):
+                return res
+            return {**res, "results": [r for i, r in enumerate(res["results"]) if (name, i) not in removed]}
+        return keep("tavily", tavily_res), keep("perplexity", perplexity_res)
+
+    async def _ingest(
+        self, 
+        company: str, 
+        content: str, 
+        metadata: dict
+    ) -> None:
+        try:
+            ingestion = services.get_ingestion()
+        except RuntimeError:
+            # No background workers (e.g. scripts outside the app lifespan), store inline
+            await self.kb.store_research(company, content, metadata=metadata)
+            return
+        await ingestion.submit(company, content, metadata=metadata)
+
     async def save_research(
         self, 
         company: str, 
@@ -131,21 +349,20 @@ class ResearchService:
         user_id: str = None
     ) -> Dict[str, Any]:
         try:
-            supabase = services.get_supabase()
-            
             data = {
                 "company": company,
-                "content": content
+                "company_key": companies.key(company)
             }
+            if settings.ResearchCompactStorage:
+                data.update({"summary": summarize_research(content), "raw": pack_raw(content)})
+            else:
+                data["content"] = content
             if plan_id:
                 data["plan_id"] = plan_id
             if user_id:
                 data["user_id"] = user_id
                 
-            response = await supabase.table("research_data").insert(data).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
+            return await services.get_repository().insert_research(data)
         except Exception as e:
             logger.error(f"Error saving research: {e}")
             return None
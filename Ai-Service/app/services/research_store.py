@@ -0,0 +1,63 @@
+from typing import Any, Dict
+import zstandard
+import json
+
+ZSTD_LEVEL = 10
+
+# Kept per result in the queryable summary, the long text fields (content, raw_content, snippet) are not
+SUMMARY_FIELDS = ("url", "title", "aspect", "score", "published_date", "date")
+
+
+def summarize_research(
+    content: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Compact, normalized view of raw provider responses: sources per provider, the short
+    Tavily answer and errors. Small enough to keep in JSONB and query.
+    """
+    summary = {}
+    for provider, response in (content or {}).items():
+        if not isinstance(response, dict):
+            continue
+        results = [
+            {k: r[k] for k in SUMMARY_FIELDS if r.get(k) is not None}
+            for r in response.get("results") or []
+        ]
+        entry = {"count": len(results), "results": results}
+        for key in ("query", "answer", "error"):
+            if response.get(key):
+                entry[key] = response[key]
+        summary[provider] = entry
+    return summary
+
+
+def pack_raw(
+    content: Dict[str, Any]
+) -> bytes:
+    """
+    zstd-compressed canonical JSON of the raw payload.
+    """
+    data = json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def unpack_raw(
+    blob: bytes
+) -> Dict[str, Any]:
+    return json.loads(zstandard.ZstdDecompressor().decompress(blob))
+
+
+def to_bytea(
+    blob: bytes
+) -> str:
+    # PostgREST takes and returns bytea as hex text
+    return "\\x" + blob.hex()
+
+
+def from_bytea(
+    value: Any
+) -> bytes:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith("\\x") else value)
+
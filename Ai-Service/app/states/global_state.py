@@ -12,6 +12,9 @@ class GlobalState:
             cls._instance.pinecone_client = None
             cls._instance.supabase_client = None
             cls._instance.pinecone_index = None 
+            cls._instance.ingestion_service = None
+            cls._instance.checkpointer = None
+            cls._instance.repository = None
         return cls._instance
 
     def set_pinecone(self, client: Any):
@@ -20,6 +23,15 @@ class GlobalState:
     def set_supabase(self, client: Any):
         self.supabase_client = client
         
+    def set_ingestion(self, ingestion: Any):
+        self.ingestion_service = ingestion
+
+    def set_checkpointer(self, checkpointer: Any):
+        self.checkpointer = checkpointer
+
+    def set_repository(self, repository: Any):
+        self.repository = repository
+
     def get_pinecone(self):
         if not self.pinecone_client:
             raise RuntimeError("Pinecone client not initialized")
@@ -30,4 +42,21 @@ class GlobalState:
             raise RuntimeError("Supabase client not initialized")
         return self.supabase_client
 
+    def get_ingestion(self):
+        if not self.ingestion_service:
+            raise RuntimeError("Ingestion service not initialized")
+        return self.ingestion_service
+
+    def get_checkpointer(self):
+        if self.checkpointer is None:
+            raise RuntimeError("Checkpointer not initialized")
+        return self.checkpointer
+
+    def get_repository(self):
+        if self.repository is None:
+            # Scripts outside the app lifespan only set up the Supabase client
+            from app.db.repository import SupabaseRepository
+            self.repository = SupabaseRepository()
+        return self.repository
+
 services = GlobalState()
@@ -1,4 +1,9 @@
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from app.services.ingestion_service import IngestionService
+from app.services.company_resolver import companies
+from app.db.repository import PostgresRepository, SupabaseRepository
 from app.db.supabase_client import get_supabase_client
+from app.db.postgres_pool import get_postgres_pool
 from pinecone import PineconeAsyncio, ServerlessSpec
 from app.Config.queryConfig import QueryConfig
 from app.states.global_state import services
@@ -6,8 +11,10 @@ from contextlib import asynccontextmanager
 from app.api.websocket import orchestrator
 from app.Config.dataConfig import Config
 from app.utils.logger import logger
+from pathlib import Path
 from fastapi import FastAPI
 import psycopg2
+import aiosqlite
 import asyncio
 
 settings = Config.Config.from_env()
@@ -43,6 +50,9 @@ async def lifespan(app: FastAPI):
         else:
             logger.info("All required tables exist.")
             
+        cursor.execute(queries.getMigrationsSQL)
+        conn.commit()
+        
         cursor.close()
         conn.close()
         
@@ -51,11 +61,27 @@ async def lifespan(app: FastAPI):
         services.set_supabase(supabase)
         logger.info("Supabase client initialized.")
         
+        aliases = await companies.load(supabase)
+        logger.info(f"Loaded {aliases} company aliases.")
+        
     except Exception as e:
         logger.error(f"Startup DB check failed: {e}")
     
+    # Hot-path data access
+    pg_pool = None
+    if settings.DataBackend == "asyncpg":
+        try:
+            pg_pool = await get_postgres_pool()
+            services.set_repository(PostgresRepository(pg_pool))
+            logger.info("Using the asyncpg pool for hot queries.")
+        except Exception as e:
+            logger.error(f"asyncpg pool unavailable, using the Supabase client: {e}")
+    if pg_pool is None:
+        services.set_repository(SupabaseRepository())
+    
     # Pinecone Setup
     pc = None
+    ingestion = None
     if settings.PINECONE_API_KEY:
         try:
             logger.info("Initializing Pinecone...")
@@ -86,12 +112,40 @@ async def lifespan(app: FastAPI):
                 logger.info("Pinecone index created and ready.")
             else:
                 logger.info(f"Pinecone index '{index_name}' exists.")
+            
+            # Background KB ingestion
+            ingestion = IngestionService()
+            await ingestion.start()
+            services.set_ingestion(ingestion)
                 
         except Exception as e:
             logger.error(f"Pinecone initialization failed: {e}")
     else:
         logger.warning("PINECONE_API_KEY not set. RAG disabled.")
 
+    # Persistent tier of the LLM response cache
+    if settings.LLMCacheEnabled:
+        try:
+            await asyncio.to_thread(orchestrator.llm_client.cache.open)
+            logger.info("LLM response cache opened.")
+        except Exception as e:
+            logger.error(f"LLM response cache file unavailable, caching in memory only: {e}")
+
+    # Graph checkpoints
+    checkpoint_conn = None
+    try:
+        Path(settings.CheckpointPath).parent.mkdir(parents=True, exist_ok=True)
+        checkpoint_conn = await aiosqlite.connect(settings.CheckpointPath)
+        checkpointer = AsyncSqliteSaver(checkpoint_conn)
+        await checkpointer.setup()
+        pruned = await orchestrator.prune_checkpoints(checkpointer, settings.PendingResearchTTL)
+        if pruned:
+            logger.info(f"Dropped checkpoints of {pruned} expired clarification questions.")
+        services.set_checkpointer(checkpointer)
+        logger.info("Graph checkpointer initialized.")
+    except Exception as e:
+        logger.error(f"Checkpointer initialization failed, clarification turns will redo research: {e}")
+
     yield
     
     logger.info("Shutting down...")
@@ -101,6 +155,21 @@ async def lifespan(app: FastAPI):
         await orchestrator.aclose()
         logger.info("Orchestrator shutdown complete.")
 
+    if ingestion:
+        await ingestion.aclose()
+        services.set_ingestion(None)
+        logger.info("Ingestion queue flushed.")
+
     if pc:
         await pc.close()
         logger.info("Pinecone connection closed.")
+
+    if pg_pool:
+        services.set_repository(None)
+        await pg_pool.close()
+        logger.info("Postgres pool closed.")
+
+    if checkpoint_conn:
+        services.set_checkpointer(None)
+        await checkpoint_conn.close()
+        logger.info("Checkpoint store closed.")
@@ -0,0 +1,99 @@
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict
+import threading
+
+
+class TimingSummary:
+    """
+    Rolling summary of observed durations (seconds).
+    """
+    def __init__(
+        self, 
+        window: int = 512
+    ) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(
+        self, 
+        value: float
+    ) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def percentile(
+        self, 
+        q: float
+    ) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": round(self.percentile(0.5), 4),
+            "p95": round(self.percentile(0.95), 4),
+            "max": round(self.max, 4),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-local counters, gauges and timing summaries.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, TimingSummary] = defaultdict(TimingSummary)
+
+    def incr(
+        self, 
+        name: str, 
+        value: float = 1
+    ) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(
+        self, 
+        name: str, 
+        value: float
+    ) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(
+        self, 
+        name: str, 
+        seconds: float
+    ) -> None:
+        with self._lock:
+            self._timings[name].observe(seconds)
+
+    def counter(
+        self, 
+        name: str
+    ) -> float:
+        return self._counters.get(name, 0)
+
+    def snapshot(
+        self, 
+        prefix: str = ""
+    ) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": {k: v for k, v in sorted(self._counters.items()) if k.startswith(prefix)},
+                "gauges": {k: v for k, v in sorted(self._gauges.items()) if k.startswith(prefix)},
+                "timings": {k: t.as_dict() for k, t in sorted(self._timings.items()) if k.startswith(prefix)},
+            }
+
+metrics = MetricsRegistry()
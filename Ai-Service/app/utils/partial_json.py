@@ -0,0 +1,139 @@
+from typing import Any, List, Optional, Tuple
+import json
+
+
+class PartialJSONObject:
+    """
+    Incremental parser for a streamed JSON object. `feed()` takes the next chunk of text
+    and returns the top-level (key, value) pairs whose value became complete with it, so
+    each field can be used before the rest of the object has arrived. Elements of top-level
+    arrays are also collected as they complete, see `drain_items()`.
+
+    Text before the opening brace (e.g. a ```json fence) is ignored. Nested objects and
+    arrays are returned whole once closed.
+    """
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        # What the top-level object expects next: key, colon, value or comma
+        self.expect = "key"
+        self.token_start: Optional[int] = None
+        self.key: Optional[str] = None
+        self.fields: List[Tuple[str, Any]] = []
+        # Element tracking inside a top-level array value
+        self.in_array = False
+        self.item_start: Optional[int] = None
+        self.items: List[Tuple[str, Any]] = []
+
+    def feed(
+        self,
+        text: str
+    ) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        completed = []
+        while self.pos < len(self.buffer) and not self.done:
+            char = self.buffer[self.pos]
+            array_level = self.in_array and self.depth == 2
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._close_token(self.pos + 1, completed)
+                    elif array_level:
+                        self._close_item(self.pos + 1)
+            elif not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+            elif char == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    self.token_start = self.pos
+                elif array_level:
+                    self.item_start = self.pos
+            elif char in "{[":
+                if self.depth == 1:
+                    self.token_start = self.pos
+                    self.in_array = char == "["
+                elif array_level:
+                    self.item_start = self.pos
+                self.depth += 1
+            elif char in "}]":
+                if array_level and self.item_start is not None:
+                    # Closing bracket of the array, flushes a trailing scalar element
+                    self._close_item(self.pos)
+                self.depth -= 1
+                if self.depth == 1:
+                    self.in_array = False
+                    self._close_token(self.pos + 1, completed)
+                elif self.depth == 2 and self.in_array:
+                    self._close_item(self.pos + 1)
+                elif self.depth == 0:
+                    # Closing brace of the object, flushes a trailing scalar value
+                    if self.token_start is not None:
+                        self._close_token(self.pos, completed)
+                    self.done = True
+            elif array_level:
+                if char == ",":
+                    if self.item_start is not None:
+                        self._close_item(self.pos)
+                elif not char.isspace() and self.item_start is None:
+                    # Start of a number, true, false or null
+                    self.item_start = self.pos
+            elif self.depth == 1:
+                if char == ":":
+                    self.expect = "value"
+                elif char == ",":
+                    if self.token_start is not None:
+                        self._close_token(self.pos, completed)
+                    self.expect = "key"
+                elif not char.isspace() and self.token_start is None and self.expect == "value":
+                    # Start of a number, true, false or null
+                    self.token_start = self.pos
+            self.pos += 1
+        self.fields.extend(completed)
+        return completed
+
+    def drain_items(self) -> List[Tuple[str, Any]]:
+        """
+        (key, element) pairs of top-level arrays completed since the last call.
+        """
+        items, self.items = self.items, []
+        return items
+
+    def _close_token(
+        self,
+        end: int,
+        completed: List[Tuple[str, Any]]
+    ) -> None:
+        raw = self.buffer[self.token_start:end].strip()
+        self.token_start = None
+        if self.expect == "key":
+            self.key = json.loads(raw)
+            self.expect = "colon"
+        elif self.expect == "value":
+            completed.append((self.key, json.loads(raw)))
+            self.expect = "comma"
+
+    def _close_item(
+        self,
+        end: int
+    ) -> None:
+        raw = self.buffer[self.item_start:end].strip()
+        self.item_start = None
+        self.items.append((self.key, json.loads(raw)))
+
+    def value(self) -> dict:
+        """
+        The fields completed so far, as a dict.
+        """
+        return dict(self.fields)
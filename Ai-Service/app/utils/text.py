@@ -0,0 +1,8 @@
+def utf16_len(
+    text: str
+) -> int:
+    """
+    Length of `text` in UTF-16 code units, the unit JavaScript string offsets count in.
+    Characters outside the BMP (most emoji) are two units but one Python character.
+    """
+    return len(text.encode("utf-16-le")) // 2
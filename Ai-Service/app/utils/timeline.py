@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from app.utils.metrics import metrics
+from typing import Awaitable, Dict, List, Tuple, TypeVar
+import time
+
+T = TypeVar("T")
+
+class StageTimeline:
+    """
+    Records start/end offsets of the stages of one request, so overlap between
+    concurrent stages is visible in the logs.
+    """
+    def __init__(
+        self,
+        name: str
+    ) -> None:
+        self.name = name
+        self.origin = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+        self.marks: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(
+        self,
+        name: str
+    ):
+        start = time.perf_counter() - self.origin
+        self.stages[name] = [start, start]
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self.origin
+            self.stages[name][1] = end
+            metrics.observe(f"{self.name}.{name}", end - start)
+
+    async def run(
+        self,
+        name: str,
+        awaitable: Awaitable[T]
+    ) -> T:
+        with self.stage(name):
+            return await awaitable
+
+    def mark(
+        self,
+        name: str
+    ) -> float:
+        """
+        Records a point-in-time event (e.g. first token) and returns its offset.
+        """
+        offset = time.perf_counter() - self.origin
+        self.marks[name] = offset
+        metrics.observe(f"{self.name}.{name}", offset)
+        return offset
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def spans(self) -> List[Tuple[str, float, float]]:
+        return sorted(((n, s, e) for n, (s, e) in self.stages.items()), key=lambda x: x[1])
+
+    def render(
+        self,
+        width: int = 40
+    ) -> str:
+        total = max([e for _, _, e in self.spans()] + list(self.marks.values()) + [1e-9])
+        lines = [f"{self.name} timeline ({total:.2f}s):"]
+        for name, start, end in self.spans():
+            left = int(start / total * width)
+            bar = max(1, int((end - start) / total * width))
+            lines.append(f"  {name:<16} {start:7.2f}s -> {end:7.2f}s |{' ' * left}{'#' * bar}{' ' * max(0, width - left - bar)}|")
+        for name, offset in sorted(self.marks.items(), key=lambda x: x[1]):
+            lines.append(f"  {name:<16} {offset:7.2f}s")
+        return "\n".join(lines)
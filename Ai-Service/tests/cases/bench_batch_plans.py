@@ -0,0 +1,200 @@
+import dataclasses
+import asyncio
+import json
+import time
+import uuid
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from langchain_core.messages import AIMessageChunk
+from app.core.orchestrator import Orchestrator
+from app.core.batch_planner import BatchPlanner
+from app.core.rate_limiter import gemini_limiter
+from app.db.repository import Repository
+from app.states.global_state import services
+from app.schemas.plan import AccountPlan
+import app.core.batch_planner as batch_planner
+from app.Config.dataConfig import Config
+
+settings = Config.Config.from_env()
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "research")
+COMPANIES = [
+    "Acme Robotics", "Contoso Health", "Helios Energy", "Northwind Foods", "Fabrikam", "Globex",
+    "Initech", "Umbrella Pharma", "Stark Industries", "Wayne Enterprises", "Tyrell Corp", "Cyberdyne Systems",
+    "Soylent", "Hooli", "Pied Piper", "Vandelay Industries"
+]
+
+# Stub providers, typical latencies in seconds
+SEARCH_LATENCY = {"tavily": 1.5, "perplexity": 4.0}
+KB_LATENCY = 0.2
+DB_ROUND_TRIP = 0.06
+# Deep tier model: time to first token plus decoding at a fixed rate
+TTFT = 0.8
+TOKENS_PER_SECOND = 90
+PLAN_TOKENS = 1570
+
+
+def load_results():
+    results = []
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name)) as f:
+            results.append(json.load(f)["data"])
+    return results
+
+
+class StubModel:
+    """
+    Stands in for a ChatGoogleGenerativeAI tier, so calls still go through the shared
+    Gemini limiter and the tier's concurrency slots.
+    """
+    def __init__(self, scale):
+        self.scale = scale
+        words = " ".join(["word"] * int(PLAN_TOKENS / len(AccountPlan.model_fields) * 0.75))
+        self.text = json.dumps({
+            s: words if f.annotation == str else [words[i:i + 100] for i in range(0, len(words), 100)]
+            for s, f in AccountPlan.model_fields.items()
+        })
+
+    async def astream(self, prompt, *args, **kwargs):
+        await asyncio.sleep(TTFT * self.scale)
+        step = max(1, round(len(self.text) / PLAN_TOKENS * 20))
+        for i in range(0, len(self.text), step):
+            await asyncio.sleep(20 / TOKENS_PER_SECOND * self.scale)
+            yield AIMessageChunk(content=self.text[i:i + step])
+
+
+class StubRepository(Repository):
+    """
+    Only what plan generation touches: the plan and research inserts.
+    """
+    def __init__(self, scale):
+        self.scale = scale
+        self.plans = []
+        self.research = []
+
+    async def _round_trip(self):
+        await asyncio.sleep(DB_ROUND_TRIP * self.scale)
+
+    async def get_message(self, message_id): ...
+    async def recent_messages(self, conversation_id, limit): return []
+    async def insert_message(self, data): ...
+    async def update_message_content(self, message_id, content): ...
+    async def get_plan(self, plan_id): ...
+    async def get_plan_sections(self, plan_id): ...
+    async def update_plan_sections(self, plan_id, sections, updated_at, expected_updated_at=None): ...
+
+    async def latest_plan(self, company_key, company, user_id=None): ...
+
+    async def insert_plan(self, data):
+        await self._round_trip()
+        row = {"id": data.get("id") or str(uuid.uuid4()), "updated_at": "t0", **data}
+        self.plans.append(row)
+        return row
+
+    async def insert_research(self, data):
+        await self._round_trip()
+        self.research.append(data)
+        return {"id": str(uuid.uuid4())}
+
+
+class StubSupabase:
+    # Company alias upserts
+    def table(self, name):
+        return self
+
+    def upsert(self, rows):
+        return self
+
+    async def execute(self):
+        return None
+
+
+class StubIngestion:
+    async def submit(self, company, content, metadata=None):
+        return None
+
+
+def stub_providers(orch, scale):
+    results = load_results()
+    calls = {"n": 0}
+
+    def search(provider):
+        async def run(query, send_callback=None, **kwargs):
+            await asyncio.sleep(SEARCH_LATENCY[provider] * scale)
+            calls["n"] += 1
+            return results[calls["n"] % len(results)][provider]
+        return run
+
+    async def kb_search(query, company=None, **kwargs):
+        await asyncio.sleep(KB_LATENCY * scale)
+        return []
+
+    orch.research_service.search_tavily = search("tavily")
+    orch.research_service.search_perplexity = search("perplexity")
+    orch.knowledge_base.search = kb_search
+    for tier in orch.llm_client.tiers:
+        orch.llm_client.tiers[tier] = StubModel(scale)
+    services.set_supabase(StubSupabase())
+    services.set_ingestion(StubIngestion())
+    # Same request rate in bench time
+    gemini_limiter.rate = settings.GeminiRequestsPerSecond / scale
+
+
+async def bench(scale=0.05):
+    orch = Orchestrator()
+    stub_providers(orch, scale)
+    print(
+        f"{len(COMPANIES)} companies, stub providers: Tavily {SEARCH_LATENCY['tavily']}s, Perplexity {SEARCH_LATENCY['perplexity']}s, "
+        f"KB {KB_LATENCY}s, DB {DB_ROUND_TRIP}s, deep tier {TTFT}s + {PLAN_TOKENS} tokens at {TOKENS_PER_SECOND}/s "
+        f"({settings.LLMTiers['deep'].MAX_CONCURRENCY} concurrent calls)"
+    )
+
+    async def discard(message):
+        return None
+
+    for concurrency in (1, 2, 4, 8):
+        batch_planner.settings = dataclasses.replace(batch_planner.settings, BatchPlanConcurrency=concurrency)
+        # The shared plan slots are sized from the setting on first use
+        BatchPlanner._slots = None
+        repository = StubRepository(scale)
+        services.set_repository(repository)
+
+        start = time.perf_counter()
+        summary = await BatchPlanner(orch, concurrency).run(COMPANIES, "General", discard)
+        elapsed = (time.perf_counter() - start) / scale
+        print(
+            f"  concurrency {concurrency}:  {summary['succeeded']}/{summary['total']} plans in {elapsed:6.1f}s  "
+            f"{summary['succeeded'] / elapsed * 60:5.1f} plans/min  "
+            f"{len(repository.plans)} plans and {len(repository.research)} research rows saved"
+        )
+
+    # Batches sent together share the process-wide plan slots
+    batch_planner.settings = dataclasses.replace(batch_planner.settings, BatchPlanConcurrency=4)
+    BatchPlanner._slots = None
+    services.set_repository(StubRepository(scale))
+    plans = {"running": 0, "peak": 0}
+    generate_plan = orch.generate_plan
+
+    async def counted(*args, **kwargs):
+        plans["running"] += 1
+        plans["peak"] = max(plans["peak"], plans["running"])
+        try:
+            return await generate_plan(*args, **kwargs)
+        finally:
+            plans["running"] -= 1
+
+    orch.generate_plan = counted
+    half = len(COMPANIES) // 2
+    await asyncio.gather(*(
+        BatchPlanner(orch, 4).run(names, "General", discard)
+        for names in (COMPANIES[:half], COMPANIES[half:])
+    ))
+    print(f"  2 batches at concurrency 4:  at most {plans['peak']} plans at once")
+
+
+if __name__ == "__main__":
+    asyncio.run(bench())
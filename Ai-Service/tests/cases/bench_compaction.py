@@ -0,0 +1,67 @@
+import asyncio
+import glob
+import json
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.research_compactor import ResearchCompactor, estimate_tokens
+from app.Config.promptConfig import PromptConfig
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "research")
+
+# Gemini 2.0 Flash input price (USD per 1M tokens)
+INPUT_PRICE_PER_M = 0.10
+
+# Default budgets from Config.Config
+BUDGETS = {"evaluation": 1500, "synthesis": 6000, "plan": 6000}
+
+def build_prompts(company, data, compactor):
+    raw = json.dumps(data)
+    before = {
+        "evaluation": PromptConfig.ResearchEvaluation.value.SYSTEM_PROMPT.format(company=company, research_data=raw[:5000]),
+        "synthesis": PromptConfig.ResearchSynthesis.value.SYSTEM_PROMPT.format(company=company, research_data=raw),
+        "plan": PromptConfig.PlanGeneration.value.SYSTEM_PROMPT.format(company=company, research_data=raw, existing_knowledge="", sections=""),
+    }
+    compact = {purpose: compactor.compact(data, budget).text for purpose, budget in BUDGETS.items()}
+    after = {
+        "evaluation": PromptConfig.ResearchEvaluation.value.SYSTEM_PROMPT.format(company=company, research_data=compact["evaluation"]),
+        "synthesis": PromptConfig.ResearchSynthesis.value.SYSTEM_PROMPT.format(company=company, research_data=compact["synthesis"]),
+        "plan": PromptConfig.PlanGeneration.value.SYSTEM_PROMPT.format(company=company, research_data=compact["plan"], existing_knowledge="", sections=""),
+    }
+    return before, after
+
+async def measure_latency(prompt):
+    from app.core.llm_client import LLMClient
+    llm = LLMClient().get_llm()
+    start = time.perf_counter()
+    await llm.ainvoke(prompt)
+    return time.perf_counter() - start
+
+async def bench(live=False):
+    compactor = ResearchCompactor()
+    print(f"{'fixture':<18} {'prompt':<11} {'tokens before':>13} {'tokens after':>12} {'saved':>6} {'cost before':>12} {'cost after':>11}")
+    totals = [0, 0]
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        fixture = json.load(open(path))
+        before, after = build_prompts(fixture["company"], fixture["data"], compactor)
+        name = os.path.splitext(os.path.basename(path))[0]
+        for purpose in BUDGETS:
+            tb, ta = estimate_tokens(before[purpose]), estimate_tokens(after[purpose])
+            totals[0] += tb
+            totals[1] += ta
+            print(
+                f"{name:<18} {purpose:<11} {tb:>13} {ta:>12} {1 - ta / tb:>6.0%} "
+                f"{tb * INPUT_PRICE_PER_M / 1e6:>12.6f} {ta * INPUT_PRICE_PER_M / 1e6:>11.6f}"
+            )
+            if live:
+                lb, la = await measure_latency(before[purpose]), await measure_latency(after[purpose])
+                print(f"{'':<18} {'latency':<11} {lb:>12.2f}s {la:>11.2f}s")
+    print(f"\nTotal input tokens: {totals[0]} -> {totals[1]} ({1 - totals[1] / totals[0]:.0%} saved)")
+
+if __name__ == "__main__":
+    # Pass --live to also time real Gemini calls (needs the .env credentials)
+    asyncio.run(bench(live="--live" in sys.argv))
@@ -0,0 +1,84 @@
+import itertools
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.company_resolver import CompanyResolver
+from app.Config.dataConfig import Config
+
+settings = Config.Config.from_env()
+
+# Company names as the entity extraction returned them over several turns
+MENTIONS = {
+    "Google": ["Google", "google", "Alphabet Inc.", "Google", "Google LLC", "Alphabet", "GOOGLE"],
+    "Acme Robotics": ["Acme Robotics", "Acme Robotics Inc.", "Acme Robotics", "acme robotics", "ACME Robotic", "Acme Robotics, Inc"],
+    "Nestle": ["Nestlé S.A.", "Nestle", "Nestlé", "nestle sa"],
+    "Meta": ["Meta Platforms", "Meta", "Facebook", "Meta Platforms, Inc."],
+    "JPMorgan": ["JPMorgan Chase", "J.P. Morgan", "JPMorgan Chase & Co.", "jpmorgan"],
+    "Salesforce": ["Salesforce", "Salesforce.com", "salesforce, inc."],
+    "Coca-Cola": ["The Coca-Cola Company", "Coca-Cola", "Coca Cola"],
+    "Siemens": ["Siemens AG", "Siemens", "siemens"],
+}
+# Different companies with similar names, must stay apart
+DISTINCT = [
+    ("Sony", "Sonos"), ("Meta", "Metro AG"), ("Acme Robotics", "Acme Rockets"), ("Intel", "Intuit"), ("Samsung", "Samsonite"),
+    ("Deutsche Bank", "Deutsche Bahn"), ("Salesforce", "Salesforge"), ("Capital One", "Capital Ore"), ("Mastercard", "Mastercare"),
+]
+
+
+def resolver():
+    return CompanyResolver(
+        seed_aliases=settings.CompanySeedAliases,
+        fuzzy_cutoff=settings.CompanyFuzzyCutoff,
+        fuzzy_min_length=settings.CompanyFuzzyMinLength
+    )
+
+
+def replay(key):
+    """
+    Mentions interleaved across companies. The first mention of a company stores a plan
+    (and research, KB documents) under its key; every later mention looks it up.
+    """
+    stored = set()
+    lookups = hits = 0
+    seen = set()
+    rounds = itertools.zip_longest(*[[(c, n) for n in names] for c, names in MENTIONS.items()])
+    for company, name in filter(None, itertools.chain.from_iterable(rounds)):
+        k = key(name)
+        if company in seen:
+            lookups += 1
+            hits += k in stored
+        seen.add(company)
+        stored.add(k)
+    return hits / lookups, len(stored)
+
+
+def main():
+    print(f"{sum(len(v) for v in MENTIONS.values())} mentions of {len(MENTIONS)} companies")
+    for name, key in (
+        ("raw name (before)", lambda n: n),
+        ("lowercased", lambda n: n.strip().lower()),
+        ("resolver (after)", resolver().key),
+    ):
+        hit_rate, keys = replay(key)
+        print(f"  {name:<18} lookup hit rate {hit_rate:4.0%}   {keys:>2} distinct companies stored")
+
+    r = resolver()
+    merged = [(a, b) for a, b in DISTINCT if r.key(a) == r.key(b)]
+    print(f"False merges among {len(DISTINCT)} similar-name pairs: {len(merged)} {merged if merged else ''}")
+
+    # Fuzzy matching scans the alias index, time a miss against a large one
+    r = resolver()
+    for i in range(5000):
+        r.key(f"Company {i:05d} Holdings")
+    start = time.perf_counter()
+    for i in range(200):
+        r.key(f"Unseen Venture {i}")
+    print(f"New-company resolution with {len(r._aliases)} aliases: {(time.perf_counter() - start) / 200 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
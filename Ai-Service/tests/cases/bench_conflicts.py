@@ -0,0 +1,73 @@
+import asyncio
+import glob
+import json
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.research_compactor import ResearchCompactor
+from app.services.conflict_detector import ConflictDetector
+from app.Config.promptConfig import PromptConfig
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "research")
+
+async def llm_verdict(company, data, compactor):
+    from app.core.llm_client import LLMClient
+    prompt = PromptConfig.ResearchEvaluation.value.SYSTEM_PROMPT.format(
+        company=company,
+        research_data=compactor.compact(data, 1500).text
+    )
+    response = await LLMClient().get_llm("fast").ainvoke(prompt)
+    return "QUESTION:" in response.content
+
+async def bench(live=False):
+    compactor = ResearchCompactor()
+    detector = ConflictDetector()
+    tp = fp = fn = 0
+    skipped = total = 0
+    agree = 0
+
+    print(f"{'fixture':<18} {'expected':>8} {'found':>6} {'tp':>3} {'fp':>3} {'fn':>3} {'cpu ms':>7}  evaluation")
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        fixture = json.load(open(path))
+        if "expected_conflicts" not in fixture:
+            continue
+        expected = {(c["metric"], c["period"]) for c in fixture["expected_conflicts"]}
+
+        start = time.process_time()
+        conflicts = detector.find_conflicts(compactor.normalize(fixture["data"]))
+        cpu = (time.process_time() - start) * 1000
+        found = {(c.metric, c.period) for c in conflicts}
+
+        tp += len(found & expected)
+        fp += len(found - expected)
+        fn += len(expected - found)
+        total += 1
+        skipped += not conflicts
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(
+            f"{name:<18} {len(expected):>8} {len(found):>6} {len(found & expected):>3} {len(found - expected):>3} "
+            f"{len(expected - found):>3} {cpu:>7.2f}  {'LLM review' if conflicts else 'skipped'}"
+        )
+        for conflict in conflicts:
+            print(f"{'':<20}{conflict.describe()}")
+
+        if live:
+            asked = await llm_verdict(fixture["company"], fixture["data"], compactor)
+            agree += asked == bool(conflicts)
+            print(f"{'':<20}LLM evaluation {'asked a question' if asked else 'found it sufficient'}")
+
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    print(f"\nPrecision: {precision:.0%}  Recall: {recall:.0%}")
+    print(f"Evaluation calls avoided: {skipped}/{total} ({skipped / total:.0%})")
+    if live:
+        print(f"Agreement with LLM evaluation: {agree}/{total}")
+
+if __name__ == "__main__":
+    # Pass --live to compare with real Gemini evaluations (needs the .env credentials)
+    asyncio.run(bench(live="--live" in sys.argv))
@@ -0,0 +1,59 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.embedding_dispatcher import EmbeddingDispatcher
+
+# Stub provider: fixed round-trip per API call plus a small per-text cost,
+# with a cap on concurrent requests like a per-key API quota.
+CALL_LATENCY = 0.08
+PER_TEXT_LATENCY = 0.001
+MAX_CONCURRENT_CALLS = 8
+REQUESTS_PER_SESSION = 5
+
+class StubEmbeddings:
+    def __init__(self):
+        self.calls = 0
+        self.slots = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+
+    async def aembed_query(self, text, **kwargs):
+        async with self.slots:
+            self.calls += 1
+            await asyncio.sleep(CALL_LATENCY + PER_TEXT_LATENCY)
+            return [float(len(text))]
+
+    async def aembed_documents(self, texts, **kwargs):
+        async with self.slots:
+            self.calls += 1
+            await asyncio.sleep(CALL_LATENCY + PER_TEXT_LATENCY * len(texts))
+            return [[float(len(t))] for t in texts]
+
+async def run(sessions, embed_fn):
+    async def session(i):
+        for j in range(REQUESTS_PER_SESSION):
+            await embed_fn(f"session {i} query {j}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return time.perf_counter() - start
+
+async def bench():
+    print(f"{'sessions':>8} | {'mode':>10} | {'req/s':>8} | {'api calls':>9}")
+    for sessions in (1, 10, 100):
+        total = sessions * REQUESTS_PER_SESSION
+
+        direct = StubEmbeddings()
+        elapsed = await run(sessions, direct.aembed_query)
+        print(f"{sessions:>8} | {'direct':>10} | {total / elapsed:>8.1f} | {direct.calls:>9}")
+
+        batched = StubEmbeddings()
+        dispatcher = EmbeddingDispatcher(batched, max_batch_size=32, max_wait_ms=10)
+        elapsed = await run(sessions, dispatcher.aembed_query)
+        print(f"{sessions:>8} | {'batched':>10} | {total / elapsed:>8.1f} | {batched.calls:>9}")
+
+if __name__ == "__main__":
+    asyncio.run(bench())
@@ -0,0 +1,122 @@
+import asyncio
+import random
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.research_service import ResearchService
+from app.schemas.research import SubQuery
+
+COMPANY = "Acme Robotics"
+
+# Stub corpus: documents per aspect, matched by keywords in the query
+ASPECT_KEYWORDS = {
+    "financials": ("revenue", "funding", "financial", "earnings"),
+    "news": ("news", "announcement", "latest"),
+    "leadership": ("ceo", "leadership", "executive"),
+    "competitors": ("competitor", "market position", "compare"),
+    "products": ("product", "platform", "launch"),
+}
+# What a broad query ("Research Acme Robotics") tends to return: mostly news and product pages
+GENERIC_MIX = ["news", "news", "products", "news", "financials", "products", "news", "products"]
+# Seconds per call: basic < advanced < perplexity
+LATENCY = {("tavily", "basic"): 0.8, ("tavily", "advanced"): 1.6, ("perplexity", "basic"): 2.5}
+MAX_RESULTS = 5
+
+
+def document(aspect, i):
+    return {
+        "title": f"{COMPANY} {aspect} #{i}",
+        "url": f"https://example.com/{aspect}/{i}",
+        "content": f"{aspect} {i} " + " ".join(random.Random(f"{aspect}{i}").choices(ASPECT_KEYWORDS[aspect] + ("acme", "robots", "2024", "growth", "market"), k=60)),
+    }
+
+
+class StubSearch:
+    def __init__(self, scale):
+        self.scale = scale
+        self.calls = {}
+
+    def results(self, query, offset):
+        query = query.lower()
+        aspects = [a for a, words in ASPECT_KEYWORDS.items() if any(w in query for w in words)] or GENERIC_MIX
+        counters = {}
+        docs = []
+        for k in range(MAX_RESULTS):
+            aspect = aspects[k % len(aspects)]
+            counters[aspect] = counters.get(aspect, -1) + 1
+            docs.append(document(aspect, counters[aspect] + offset))
+        return docs
+
+    async def tavily(self, query, send_callback=None, search_depth="advanced"):
+        self.calls[("tavily", search_depth)] = self.calls.get(("tavily", search_depth), 0) + 1
+        await asyncio.sleep(LATENCY[("tavily", search_depth)] * self.scale)
+        # Advanced search digs one result deeper into each aspect
+        return {"results": self.results(query, 1 if search_depth == "advanced" else 0)}
+
+    async def perplexity(self, query, send_callback=None):
+        self.calls[("perplexity", "basic")] = self.calls.get(("perplexity", "basic"), 0) + 1
+        await asyncio.sleep(LATENCY[("perplexity", "basic")] * self.scale)
+        return {"results": [{**d, "snippet": d.pop("content")} for d in self.results(query, 2)]}
+
+
+def coverage(data):
+    urls = [r["url"] for provider in ("tavily", "perplexity") for r in (data.get(provider) or {}).get("results") or []]
+    return {url.split("/")[-2] for url in urls}, len(set(urls))
+
+
+async def run(name, research, stub, make):
+    start = time.perf_counter()
+    data = await make(research)
+    elapsed = time.perf_counter() - start
+    aspects, unique = coverage(data)
+    calls = ", ".join(f"{p}/{d}: {n}" for (p, d), n in sorted(stub.calls.items()))
+    print(f"  {name:<12} {elapsed:>6.2f}s {unique:>4} urls  {len(aspects)}/{len(ASPECT_KEYWORDS)} aspects ({', '.join(sorted(aspects))})  [{calls}]")
+    stub.calls.clear()
+
+
+async def bench(live=False, scale=0.1):
+    research = ResearchService()
+    if not live:
+        stub = StubSearch(scale)
+        research.search_tavily = stub.tavily
+        research.search_perplexity = stub.perplexity
+        async def no_ingest(*args, **kwargs):
+            return None
+        research._ingest = no_ingest
+    else:
+        stub = StubSearch(0)
+
+    scenarios = [
+        (
+            "plan (broad)",
+            lambda r: r.research_company(COMPANY),
+            lambda r: r.research_aspects(COMPANY, r.plan_sub_queries(COMPANY)),
+        ),
+        (
+            "revenue question (narrow)",
+            lambda r: r.research_company(COMPANY, tavily_query=f"{COMPANY} revenue 2024", perplexity_query=f"Analysis of {COMPANY}'s revenue growth"),
+            lambda r: r.research_aspects(COMPANY, [SubQuery(aspect="financials", query=f"{COMPANY} revenue 2024", provider="tavily", search_depth="advanced")]),
+        ),
+        (
+            "competitive landscape",
+            lambda r: r.research_company(COMPANY, tavily_query=f"{COMPANY} competitors", perplexity_query=f"How does {COMPANY} compare to its competitors?"),
+            lambda r: r.research_aspects(COMPANY, [
+                SubQuery(aspect="competitors", query=f"{COMPANY} competitors market position", provider="perplexity"),
+                SubQuery(aspect="financials", query=f"{COMPANY} revenue vs competitors", provider="tavily", search_depth="advanced"),
+                SubQuery(aspect="products", query=f"{COMPANY} product lineup", provider="tavily"),
+            ]),
+        ),
+    ]
+    print(f"Latency model x{scale:g} (tavily basic {LATENCY[('tavily', 'basic')]}s, advanced {LATENCY[('tavily', 'advanced')]}s, perplexity {LATENCY[('perplexity', 'basic')]}s)" if not live else "Live providers")
+    for name, two_query, fan_out in scenarios:
+        print(name)
+        await run("two-query", research, stub, two_query)
+        await run("fan-out", research, stub, fan_out)
+
+if __name__ == "__main__":
+    # Pass --live to query the real providers (needs the .env credentials and spends search credits)
+    asyncio.run(bench(live="--live" in sys.argv))
@@ -0,0 +1,135 @@
+import statistics
+import asyncio
+import copy
+import time
+import uuid
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.supabase_client import get_supabase_client
+from app.services.plan_service import PlanService
+from app.services.plan_cache import PlanCache
+from app.states.global_state import services
+
+# Stub Supabase: one round trip per query, typical for a hosted project from an app server
+ROUND_TRIP = 0.06
+EDITS = 20
+
+
+class StubQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.op = "select"
+        self.payload = None
+        self.is_single = False
+
+    def select(self, *args):
+        return self
+
+    def insert(self, data):
+        self.op, self.payload = "insert", data
+        return self
+
+    def update(self, data):
+        self.op, self.payload = "update", data
+        return self
+
+    def eq(self, key, value):
+        self.filters.append((key, value))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def single(self):
+        self.is_single = True
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(ROUND_TRIP)
+        self.db.queries += 1
+        rows = self.db.rows
+        if self.op == "insert":
+            row = {"id": str(uuid.uuid4()), "updated_at": "t0", **copy.deepcopy(self.payload)}
+            rows.append(row)
+            return StubResponse([copy.deepcopy(row)])
+        matches = [r for r in rows if all(r.get(k) == v for k, v in self.filters)]
+        if self.op == "update":
+            for row in matches:
+                row.update(copy.deepcopy(self.payload))
+            return StubResponse(copy.deepcopy(matches))
+        if self.is_single:
+            return StubResponse(copy.deepcopy(matches[0]) if matches else None)
+        return StubResponse(copy.deepcopy(matches[-1:]))
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class StubSupabase:
+    def __init__(self):
+        self.rows = []
+        self.queries = 0
+
+    def table(self, name):
+        return StubQuery(self, name)
+
+
+async def edit(plan_service, company, i):
+    """
+    The database side of edit_node: latest plan lookup, then the section update.
+    """
+    start = time.perf_counter()
+    plan = await plan_service.get_latest_plan_by_company(company)
+    await plan_service.update_section(plan["id"], "next_steps", f"Step {i}")
+    return time.perf_counter() - start
+
+
+async def run(name, cache, company, db):
+    plan_service = PlanService()
+    plan_service.cache = cache
+    queries = db.queries if db else 0
+    timings = [await edit(plan_service, company, i) for i in range(EDITS)]
+    queries = (db.queries - queries) / EDITS if db else None
+    line = f"  {name:<10} median {statistics.median(timings) * 1000:6.0f} ms   p95 {sorted(timings)[int(EDITS * 0.95) - 1] * 1000:6.0f} ms"
+    if queries is not None:
+        line += f"   {queries:.1f} queries/edit"
+    if cache:
+        line += f"   hit rate {cache.hit_rate:.0%}"
+    print(line)
+
+
+async def bench(live=False):
+    db = None
+    if live:
+        services.set_supabase(await get_supabase_client())
+    else:
+        db = StubSupabase()
+        services.set_supabase(db)
+
+    company = f"Bench Robotics {uuid.uuid4().hex[:6]}"
+    cache = PlanCache()
+    plan_service = PlanService()
+    plan_service.cache = cache
+    await plan_service.create_plan({"company": company, "sections": {"next_steps": "Book a call."}})
+
+    print("Live Supabase" if live else f"Stub Supabase, {ROUND_TRIP * 1000:.0f} ms per query")
+    print(f"Edit latency (plan lookup + section update), {EDITS} edits")
+    await run("no cache", None, company, db)
+    # Fresh cache: the first edit reads through, the rest are served from it
+    await run("cache", PlanCache(), company, db)
+
+
+if __name__ == "__main__":
+    # Pass --live to run against the Supabase project in .env (creates a plan row)
+    asyncio.run(bench(live="--live" in sys.argv))
@@ -0,0 +1,125 @@
+import dataclasses
+import asyncio
+import json
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from app.core.orchestrator import Orchestrator, ListSectionUpdate, PLAN_SECTIONS
+import app.core.orchestrator as orchestrator
+from app.services.research_compactor import estimate_tokens
+from app.Config.promptConfig import PromptConfig
+from app.utils.timeline import StageTimeline
+from app.schemas.plan import AccountPlan
+from app.Config.dataConfig import Config
+
+settings = Config.Config.from_env()
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "research", "acme_robotics.json")
+
+# Stub model: time to first token plus decoding at a fixed rate (deep tier ballpark)
+TTFT = 0.8
+TOKENS_PER_SECOND = 90
+# Typical output tokens per section
+SECTION_TOKENS = {
+    "executive_summary": 250,
+    "company_overview": 300,
+    "strategic_priorities": 200,
+    "opportunities": 200,
+    "risks": 220,
+    "engagement_strategy": 250,
+    "next_steps": 150,
+}
+
+
+def section_content(section):
+    words = ["word"] * int(SECTION_TOKENS[section] * 0.75)
+    if AccountPlan.model_fields[section].annotation == str:
+        return " ".join(words)
+    return [" ".join(words[i:i + 25]) for i in range(0, len(words), 25)]
+
+
+class StubLLM:
+    def __init__(self, scale):
+        self.scale = scale
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.calls = 0
+
+    async def ainvoke(self, prompt, call_type, tier=None, schema=None):
+        self.calls += 1
+        self.input_tokens += estimate_tokens(prompt)
+        section = next(s for s in SECTION_TOKENS if f"'{s.replace('_', ' ').title()}'" in prompt)
+        self.output_tokens += SECTION_TOKENS[section]
+        await asyncio.sleep((TTFT + SECTION_TOKENS[section] / TOKENS_PER_SECOND) * self.scale)
+        content = section_content(section)
+        return ListSectionUpdate(items=content) if schema else AIMessage(content=content)
+
+    async def astream(self, prompt, call_type, tier=None):
+        self.calls += 1
+        self.input_tokens += estimate_tokens(prompt)
+        text = json.dumps({s: section_content(s) for s in SECTION_TOKENS})
+        self.output_tokens += sum(SECTION_TOKENS.values())
+        await asyncio.sleep(TTFT * self.scale)
+        step = max(1, round(len(text) / sum(SECTION_TOKENS.values()) * 20))
+        for i in range(0, len(text), step):
+            await asyncio.sleep(20 / TOKENS_PER_SECOND * self.scale)
+            yield AIMessageChunk(content=text[i:i + step])
+
+
+async def run(name, orch, make, order, scale, llm=None):
+    timeline = StageTimeline("bench")
+    async def discard(message):
+        return None
+    emit, sent = orch._plan_emitter("Acme Robotics", "bench", discard, timeline, order)
+    start = time.perf_counter()
+    await make(emit, sent)
+    elapsed = (time.perf_counter() - start) / scale
+    first = timeline.marks.get("first_section", 0.0) / scale
+    tokens = f"{llm.calls} calls, {llm.input_tokens:>6} in / {llm.output_tokens:>5} out tokens" if llm else ""
+    print(f"  {name:<22} first section {first:>6.2f}s  full plan {elapsed:>6.2f}s  {tokens}")
+
+
+async def bench(live=False, scale=0.05):
+    fixture = json.load(open(FIXTURE))
+    orch = Orchestrator()
+    research = orch._compact_research(fixture["data"], settings.PlanTokenBudget, "plan")
+    prompt = PromptConfig.PlanGeneration.value.SYSTEM_PROMPT.format(
+        company=fixture["company"], research_data=research, existing_knowledge="", sections=PLAN_SECTIONS
+    )
+    plan_order = list(AccountPlan.model_fields)
+    section_order = [s for s in plan_order if s not in settings.PlanDependentSections] + list(settings.PlanDependentSections)
+
+    if live:
+        scale = 1.0
+        print("Live Gemini (deep tier)")
+    else:
+        print(f"Stub model: {TTFT}s to first token, {TOKENS_PER_SECOND} tokens/s, {sum(SECTION_TOKENS.values())} output tokens per plan")
+
+    def stub():
+        if live:
+            return None
+        orch.llm_client = StubLLM(scale)
+        return orch.llm_client
+
+    llm = stub()
+    await run("single streamed call", orch, lambda emit, sent: orch._stream_plan(prompt, "deep", fixture["company"], emit, sent), plan_order, scale, llm)
+    for concurrency in (2, 4, 7):
+        orchestrator.settings = dataclasses.replace(orchestrator.settings, PlanSectionConcurrency=concurrency)
+        llm = stub()
+        await run(
+            f"per section (x{concurrency})",
+            orch,
+            lambda emit, sent: orch._generate_plan_sections(fixture["company"], research, "", "deep", emit),
+            section_order,
+            scale,
+            llm
+        )
+
+if __name__ == "__main__":
+    # Pass --live to time real Gemini calls (needs the .env credentials)
+    asyncio.run(bench(live="--live" in sys.argv))
@@ -0,0 +1,106 @@
+import statistics
+import asyncio
+import time
+import uuid
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.repository import PostgresRepository, SupabaseRepository
+from app.db.postgres_pool import _init_connection, asyncpg
+from app.db.supabase_client import get_supabase_client
+from app.Config.queryConfig import QueryConfig
+from app.states.global_state import services
+from datetime import datetime, timezone
+from app.Config.dataConfig import Config
+
+settings = Config.Config.from_env()
+queries = QueryConfig.SupabaseQueries()
+
+TEST_USER_ID = "00000000-0000-0000-0000-000000000000"
+RUNS = 50
+
+
+async def prepare_schema(pool):
+    """
+    Same startup migration as the app, for a fresh local database.
+    """
+    async with pool.acquire() as conn:
+        if not await conn.fetchval("select exists (select from information_schema.tables where table_name = 'users')"):
+            await conn.execute(queries.getCreateTablesSQL)
+        await conn.execute(queries.getMigrationsSQL)
+        await conn.execute(
+            "insert into users (id, email, password_hash) values ($1::uuid, 'test@example.com', 'hashed_secret') on conflict do nothing",
+            TEST_USER_ID
+        )
+
+
+async def fixtures(repository, conversation_id):
+    plan = await repository.insert_plan({
+        "user_id": TEST_USER_ID,
+        "company": "Bench Robotics",
+        "company_key": "bench robotics",
+        "sections": {"executive_summary": "Bench Robotics builds robots. " * 20, "risks": ["Supply", "Competition"]}
+    })
+    for i in range(20):
+        await repository.insert_message({"conversation_id": conversation_id, "role": "user" if i % 2 else "assistant", "content": f"Message {i} " * 30})
+    return plan
+
+
+async def run(name, repository, conversation_id):
+    plan = await fixtures(repository, conversation_id)
+    sections = plan["sections"]
+    operations = {
+        "recent messages (10)": lambda: repository.recent_messages(conversation_id, 10),
+        "insert message": lambda: repository.insert_message({"conversation_id": conversation_id, "role": "user", "content": "How are sales?"}),
+        "get plan": lambda: repository.get_plan(plan["id"]),
+        "latest plan": lambda: repository.latest_plan("bench robotics", "Bench Robotics", TEST_USER_ID),
+        "update sections": lambda: repository.update_plan_sections(plan["id"], sections, datetime.now(timezone.utc)),
+    }
+    print(name)
+    for op, call in operations.items():
+        await call()        # Warm up (connection, prepared statement)
+        timings = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            await call()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"  {op:<22} median {statistics.median(timings) * 1000:7.2f} ms   p95 {timings[int(RUNS * 0.95) - 1] * 1000:7.2f} ms")
+
+
+async def bench(dsn, with_supabase):
+    if asyncpg is None:
+        print("asyncpg is not installed (uv sync --extra postgres)")
+        return
+    conversation_id = str(uuid.uuid4())
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=4, init=_init_connection)
+    await prepare_schema(pool)
+    await pool.execute("insert into conversations (id, user_id, title) values ($1::uuid, $2::uuid, 'bench')", conversation_id, TEST_USER_ID)
+
+    # Same pool without the statement cache: every query is parsed and planned again
+    unprepared = await asyncpg.create_pool(dsn, min_size=1, max_size=4, statement_cache_size=0, init=_init_connection)
+    try:
+        await run("asyncpg, prepared statements", PostgresRepository(pool), conversation_id)
+        await run("asyncpg, no statement cache", PostgresRepository(unprepared), conversation_id)
+        if with_supabase:
+            services.set_supabase(await get_supabase_client())
+            supabase_conversation = str(uuid.uuid4())
+            await services.get_supabase().table("conversations").insert({"id": supabase_conversation, "user_id": TEST_USER_ID, "title": "bench"}).execute()
+            await run("Supabase REST", SupabaseRepository(), supabase_conversation)
+            await services.get_supabase().table("conversations").delete().eq("id", supabase_conversation).execute()
+            await services.get_supabase().table("account_plans").delete().eq("company_key", "bench robotics").execute()
+    finally:
+        await pool.execute("delete from conversations where id = $1::uuid", conversation_id)
+        await pool.execute("delete from account_plans where company_key = 'bench robotics'")
+        await unprepared.close()
+        await pool.close()
+
+
+if __name__ == "__main__":
+    # --dsn postgresql://localhost/salesbot to bench a local Postgres (default: DATABASE_URL)
+    # --supabase to add the Supabase REST client on the .env project for comparison
+    dsn = sys.argv[sys.argv.index("--dsn") + 1] if "--dsn" in sys.argv else settings.DATABASE_URL
+    asyncio.run(bench(dsn, "--supabase" in sys.argv))
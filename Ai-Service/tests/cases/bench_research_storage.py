@@ -0,0 +1,101 @@
+import statistics
+import asyncio
+import json
+import time
+import zlib
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.research_store import from_bytea, pack_raw, summarize_research, to_bytea, unpack_raw
+from app.db.supabase_client import get_supabase_client
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "research")
+RUNS = 20
+
+
+def load_fixtures():
+    fixtures = {}
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name)) as f:
+            fixtures[name.removesuffix(".json")] = json.load(f)["data"]
+    # A fan-out plan: every fixture's results merged, as several aspect sub-queries return them
+    fixtures["fan-out (all merged)"] = {
+        provider: {"results": [r for data in list(fixtures.values()) for r in data[provider]["results"]]}
+        for provider in ("tavily", "perplexity")
+    }
+    return fixtures
+
+
+def timed(fn, *args):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings) * 1000
+
+
+def size(value):
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def report(fixtures):
+    print("Codec: zstd")
+    print(f"{'payload':<22}{'raw JSONB':>10}{'summary':>9}{'raw packed':>11}{'compact':>9}{'ratio':>7}{'request':>9}{'pack ms':>9}{'read ms':>9}")
+    totals = [0, 0]
+    for name, data in fixtures.items():
+        raw_bytes = size(data)
+        summary, summarize_ms = timed(summarize_research, data)
+        packed, pack_ms = timed(pack_raw, data)
+        _, unpack_ms = timed(unpack_raw, packed)
+        compact = size(summary) + len(packed)
+        request = size({"summary": summary, "raw": to_bytea(packed)})
+        totals[0] += raw_bytes
+        totals[1] += compact
+        print(
+            f"{name:<22}{raw_bytes:>10}{size(summary):>9}{len(packed):>11}{compact:>9}{raw_bytes / compact:>6.1f}x"
+            f"{request:>9}{summarize_ms + pack_ms:>9.2f}{unpack_ms:>9.2f}"
+        )
+    print(f"{'total':<22}{totals[0]:>10}{'':>9}{'':>11}{totals[1]:>9}{totals[0] / totals[1]:>6.1f}x")
+    data = fixtures["fan-out (all merged)"]
+    print(f"zlib for comparison on the fan-out payload: {len(zlib.compress(json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode(), 9))} bytes")
+    print("Sizes in bytes before Postgres TOAST compression; 'request' is the insert body (bytea is sent as hex).")
+
+
+async def live(fixtures):
+    """
+    Insert each payload in both formats and time the round trip (needs the .env Supabase project).
+    """
+    supabase = await get_supabase_client()
+    data = fixtures["fan-out (all merged)"]
+    packed = pack_raw(data)
+    rows = {
+        "legacy JSONB": {"company": "Bench Robotics", "content": data},
+        "compact": {"company": "Bench Robotics", "summary": summarize_research(data), "raw": to_bytea(packed)},
+    }
+    for name, row in rows.items():
+        timings, ids = [], []
+        for _ in range(5):
+            start = time.perf_counter()
+            response = await supabase.table("research_data").insert(row).execute()
+            timings.append(time.perf_counter() - start)
+            ids.append(response.data[0]["id"])
+        start = time.perf_counter()
+        stored = (await supabase.table("research_data").select("*").eq("id", ids[0]).execute()).data[0]
+        raw = unpack_raw(from_bytea(stored["raw"])) if stored.get("raw") else stored["content"]
+        assert raw == json.loads(json.dumps(data))
+        read = time.perf_counter() - start
+        print(f"  {name:<13} insert median {statistics.median(timings) * 1000:6.0f} ms   read + decode {read * 1000:6.0f} ms")
+        for row_id in ids:
+            await supabase.table("research_data").delete().eq("id", row_id).execute()
+
+
+if __name__ == "__main__":
+    fixtures = load_fixtures()
+    report(fixtures)
+    # Pass --live to time inserts against the Supabase project in .env (rows are deleted afterwards)
+    if "--live" in sys.argv:
+        asyncio.run(live(fixtures))
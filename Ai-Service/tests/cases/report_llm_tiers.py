@@ -0,0 +1,17 @@
+import httpx
+
+# Run after exercising the server (e.g. test_client.py) to see latency and cost per tier
+URL = "http://localhost:8000/ai-service/metrics/llm-tiers"
+
+def report():
+    tiers = httpx.get(URL, timeout=10).json()
+    print(f"{'tier':<9} {'model':<24} {'calls':>6} {'p50 s':>7} {'p95 s':>7} {'in tok':>8} {'out tok':>8} {'cost $':>10} {'$/call':>9}")
+    for name, t in tiers.items():
+        latency = t.get("latency") or {}
+        print(
+            f"{name:<9} {t['model']:<24} {t['calls']:>6.0f} {latency.get('p50', 0):>7.2f} {latency.get('p95', 0):>7.2f} "
+            f"{t['input_tokens']:>8.0f} {t['output_tokens']:>8.0f} {t['cost_usd']:>10.5f} {t['cost_per_call_usd']:>9.5f}"
+        )
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.company_resolver import CompanyResolver, normalize_company
+from app.states.global_state import services
+from app.Config.dataConfig import Config
+
+settings = Config.Config.from_env()
+
+# Different companies whose names are one or two letters apart
+NEAR_NAMES = [
+    ("Deutsche Bank", "Deutsche Bahn"),
+    ("Salesforce", "Salesforge"),
+    ("Capital One", "Capital Ore"),
+    ("Nationwide", "Nationwise"),
+    ("Mastercard", "Mastercare"),
+]
+
+
+class StubSupabase:
+    """
+    Records company_aliases upserts and serves them back, no database needed.
+    Fails every upsert while `down` is set.
+    """
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self._pending = None
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows):
+        self._pending = rows
+        return self
+
+    def select(self, columns):
+        return self
+
+    def range(self, start, end):
+        self._pending = slice(start, end + 1)
+        return self
+
+    async def execute(self):
+        pending, self._pending = self._pending, None
+        if isinstance(pending, slice):
+            return SimpleNamespace(data=self.rows[pending])
+        if self.down:
+            raise ConnectionError("connection reset by peer")
+        self.rows.extend(pending)
+        return SimpleNamespace(data=pending)
+
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def resolver():
+    return CompanyResolver(
+        seed_aliases=settings.CompanySeedAliases,
+        fuzzy_cutoff=settings.CompanyFuzzyCutoff,
+        fuzzy_min_length=settings.CompanyFuzzyMinLength
+    )
+
+
+def test_exact():
+    r = resolver()
+    check("legal suffixes and case are normalized", r.key("Acme Robotics, Inc.") == r.key("acme robotics"))
+    check("accents and dotted initials are normalized", normalize_company("Nestlé S.A.") == "nestle" and normalize_company("J.P. Morgan") == "jp morgan")
+    check("seed aliases resolve to their company", r.key("Alphabet Inc.") == r.key("Google"), r.key("Alphabet Inc."))
+
+
+async def test_near_names():
+    r = resolver()
+    supabase = StubSupabase()
+    services.set_supabase(supabase)
+
+    for known, near in NEAR_NAMES:
+        known_key = await r.resolve(known)
+        near_key = await r.resolve(near)
+        check(f"'{near}' stays apart from '{known}'", near_key != known_key, f"{near_key} / {known_key}")
+
+    merged = [row for row in supabase.rows if row["alias"] != row["company_key"]]
+    check("no near-name alias is saved", not merged, str(merged))
+    recorded = {normalize_company(near) for _, near in NEAR_NAMES}
+    check("near names are kept as unconfirmed candidates", recorded <= set(r.candidates), str(r.candidates))
+    check("candidates are counted as new companies", r.counts["new"] == 2 * len(NEAR_NAMES), str(r.counts))
+
+    # A later worker loading the table still sees them as distinct companies
+    other = resolver()
+    await other.load(supabase)
+    check("saved aliases keep them apart", all(other.key(known) != other.key(near) for known, near in NEAR_NAMES))
+
+
+async def test_counts():
+    r = resolver()
+    services.set_supabase(StubSupabase())
+    await r.resolve("Acme Robotics")
+    for _ in range(5):
+        r.key("Acme Robotics")
+        r.key("Globex")
+    await r.resolve("Acme Robotics, Inc.")
+    check("only resolve calls are counted", r.counts == {"exact": 1, "new": 1, "candidate": 0}, str(r.counts))
+
+
+def test_bounded():
+    r = CompanyResolver(max_known=3)
+    names = [f"Company {i}" for i in range(10)]
+    keys = [r.key(name) for name in names]
+    check("known keys are capped", len(r._known) == 3, str(list(r._known)))
+    check("a dropped key is derived again", [r.key(name) for name in names] == keys)
+
+
+async def test_failed_save():
+    r = resolver()
+    supabase = StubSupabase()
+    services.set_supabase(supabase)
+    supabase.down = True
+    await r.resolve("Initech")
+    check("unsaved aliases are cleared after a failed save", not r._unsaved, str(r._unsaved))
+
+    supabase.down = False
+    await r.resolve("Globex")
+    check("a failed batch isn't written again", [row["alias"] for row in supabase.rows] == ["globex"], str(supabase.rows))
+
+
+async def main():
+    print("Testing company resolution...")
+    test_exact()
+    await test_near_names()
+    await test_counts()
+    test_bounded()
+    await test_failed_save()
+
+    if failed:
+        print(f"\n❌ {len(failed)} company resolver check(s) failed")
+        sys.exit(1)
+    print("\n✅ All company resolver checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.conflict_detector import ConflictDetector
+from app.services.research_compactor import Snippet
+
+# Figures for different periods or rounds: sources that don't disagree
+NOT_CONFLICTS = [
+    ("quarter vs full year", "Fabrikam reported Q1 2024 revenue of $200 million.", "Fabrikam's 2024 revenue was $900 million."),
+    ("two quarters", "Fabrikam posted revenue of $200 million in the first quarter of 2024.", "Fabrikam's Q2 2024 revenue was $240 million."),
+    ("half vs full year", "Fabrikam's H1 2024 revenue reached $430 million.", "Fabrikam's revenue for 2024 was $900 million."),
+    ("two funding rounds", "Fabrikam raised $40 million in a Series B round in 2021.", "Fabrikam raised $150 million in a Series C round in 2021."),
+    ("seed vs series", "Fabrikam raised a $3 million seed round.", "Fabrikam raised $40 million in its Series B."),
+]
+
+# The same period or round reported differently
+CONFLICTS = [
+    ("same quarter", "Fabrikam reported Q1 2024 revenue of $200 million.", "Fabrikam's first quarter 2024 revenue was $260 million.", ("revenue", "2024 Q1")),
+    ("same full year", "Fabrikam's 2024 revenue was $900 million.", "Fabrikam reported revenue of $1.1 billion for 2024.", ("revenue", "2024")),
+    ("same round", "Fabrikam raised $40 million in a Series B round.", "Fabrikam closed a $55 million Series B.", ("funding", "Series B")),
+]
+
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def conflicts(first, second):
+    snippets = [
+        Snippet(title="", url=url, source="tavily", text=text, score=1.0)
+        for url, text in (("https://a.example.com", first), ("https://b.example.com", second))
+    ]
+    return ConflictDetector().find_conflicts(snippets)
+
+
+def test_not_conflicts():
+    for name, first, second in NOT_CONFLICTS:
+        found = conflicts(first, second)
+        check(f"{name} is not a conflict", not found, "; ".join(c.describe() for c in found))
+
+
+def test_conflicts():
+    for name, first, second, expected in CONFLICTS:
+        found = [(c.metric, c.period) for c in conflicts(first, second)]
+        check(f"{name} is a conflict", found == [expected], str(found))
+
+
+def main():
+    print("Testing conflict detection...")
+    test_not_conflicts()
+    test_conflicts()
+
+    if failed:
+        print(f"\n❌ {len(failed)} conflict detector check(s) failed")
+        sys.exit(1)
+    print("\n✅ All conflict detector checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.context_cache import RetrievedContextCache
+
+SESSION = "session-1"
+COMPANY = "Acme Robotics"
+DOCS = [
+    "Acme Robotics launched the Atlas-7 warehouse picking robot in Munich.",
+    "The Atlas-7 launch follows a pilot with three European logistics providers.",
+]
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def main():
+    print("Testing the retrieved context cache...")
+    cache = RetrievedContextCache()
+    check("nothing cached before the first retrieval", cache.lookup(SESSION, COMPANY, "Atlas-7 launch") is None)
+
+    cache.store(SESSION, COMPANY, "Atlas-7 launch", DOCS, retrieval_seconds=0.4)
+    check("a covered follow-up reuses the passages", cache.lookup(SESSION, COMPANY, "When was the Atlas-7 launch?") == DOCS)
+
+    # Each brings one term nothing was retrieved for, below the novelty threshold
+    check("similar query reuses the passages", cache.lookup(SESSION, COMPANY, "Atlas-7 launch revenue") == DOCS)
+    check("second similar query reuses the passages", cache.lookup(SESSION, COMPANY, "Atlas-7 launch layoffs") == DOCS)
+    # Only those terms: they must not have become known by being asked about
+    check("a new-topic query misses", cache.lookup(SESSION, COMPANY, "What about revenue and layoffs?") is None)
+
+    check("another company misses", cache.lookup(SESSION, "Contoso Health", "Atlas-7 launch") is None)
+    cache.store("session-2", COMPANY, "Atlas-7 launch", [], retrieval_seconds=0.4)
+    check("an empty retrieval is not cached", cache.lookup("session-2", COMPANY, "Atlas-7 launch") is None)
+
+    if failed:
+        print(f"\n❌ {len(failed)} context cache check(s) failed")
+        sys.exit(1)
+    print("\n✅ All context cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
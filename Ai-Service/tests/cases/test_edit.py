@@ -38,7 +38,8 @@ async def test_edit():
         print(f"> Sent: {msg}")
         await websocket.send(json.dumps(msg))
 
-        # 2. Listen for responses
+        # 2. Listen for responses, the edit streams in as several plan updates
+        updates = 0
         while True:
             try:
                 response = await asyncio.wait_for(websocket.recv(), timeout=60)
@@ -46,7 +47,9 @@ async def test_edit():
                 
                 data = json.loads(response)
                 if data.get("type") == "plan_update":
-                    print("\n✅ SUCCESS: Received plan update!")
+                    updates += 1
+                elif data.get("type") == "assistant_chunk" and data["payload"].get("message_id") == "edit_done":
+                    print(f"\n✅ SUCCESS: Received {updates} plan updates!")
                     break
                     
             except asyncio.TimeoutError:
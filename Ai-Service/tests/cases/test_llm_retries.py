@@ -0,0 +1,133 @@
+import asyncio
+import dataclasses
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.llm_client import LLMClient
+from app.core.rate_limiter import gemini_limiter, RateLimitedError
+from app.core.resilience import providers
+from langchain_core.messages import AIMessage
+
+# Counts upstream attempts for a failing Gemini call, no network access needed.
+RETRIES = providers.policies["gemini"].RETRIES
+
+
+class UpstreamError(Exception):
+    """
+    What the SDK raises for a failed generate call, with its HTTP status.
+    """
+    def __init__(self, status_code):
+        super().__init__(f"{status_code} upstream error")
+        self.status_code = status_code
+        self.code = status_code
+
+
+class Upstream:
+    """
+    Fails every request with `status_code` and counts the requests sent.
+    """
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.requests = 0
+
+    def send(self):
+        self.requests += 1
+        raise UpstreamError(self.status_code)
+
+
+class SdkModel:
+    """
+    Stands in for a ChatGoogleGenerativeAI tier: like the SDK, it makes up to
+    `max_retries` attempts per ainvoke before raising.
+    """
+    def __init__(self, upstream, max_retries):
+        self.upstream = upstream
+        self.max_retries = max_retries
+
+    async def ainvoke(self, prompt):
+        for attempt in range(self.max_retries):
+            try:
+                self.upstream.send()
+            except UpstreamError:
+                if attempt == self.max_retries - 1:
+                    raise
+        return AIMessage(content="ok")
+
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def client(upstream):
+    llm = LLMClient()
+    for name, tier in llm.tiers.items():
+        llm.tiers[name] = SdkModel(upstream, tier.max_retries)
+    return llm
+
+
+def test_single_attempt_tiers():
+    llm = LLMClient()
+    retries = {name: tier.max_retries for name, tier in llm.tiers.items()}
+    check("every tier makes a single SDK attempt", set(retries.values()) == {1}, str(retries))
+
+
+async def test_throttle_attempts():
+    upstream = Upstream(429)
+    throttles = []
+    on_throttle = gemini_limiter._on_throttle
+    gemini_limiter._on_throttle = lambda: (throttles.append(1), on_throttle())
+    try:
+        await client(upstream).ainvoke("hello", "chat_response")
+        check("a 429 is raised once retries run out", False)
+    except RateLimitedError:
+        pass
+    finally:
+        gemini_limiter._on_throttle = on_throttle
+
+    attempts = RETRIES + 1
+    check("a 429 is sent once per provider attempt", upstream.requests == attempts, f"{upstream.requests} upstream requests")
+    check("the limiter sees every 429", len(throttles) == attempts, f"{len(throttles)} throttles")
+    check("a 429 doesn't count against the breaker", providers.breaker("gemini").failures == 0)
+
+
+async def test_server_error_attempts():
+    upstream = Upstream(503)
+    breaker = providers.breaker("gemini")
+    try:
+        await client(upstream).ainvoke("hello", "chat_response")
+        check("a 503 is raised once retries run out", False)
+    except UpstreamError:
+        pass
+
+    attempts = RETRIES + 1
+    check("a 503 is sent once per provider attempt", upstream.requests == attempts, f"{upstream.requests} upstream requests")
+    check("one breaker failure per upstream request", breaker.failures == upstream.requests, f"{breaker.failures} failures")
+    breaker.record_success()
+
+
+async def main():
+    print("Testing LLM retry accounting...")
+    policy = providers.policies["gemini"]
+    providers.policies["gemini"] = dataclasses.replace(policy, BASE_DELAY=0.01, MAX_DELAY=0.02)
+    try:
+        test_single_attempt_tiers()
+        await test_throttle_attempts()
+        await test_server_error_attempts()
+    finally:
+        providers.policies["gemini"] = policy
+
+    if failed:
+        print(f"\n❌ {len(failed)} LLM retry check(s) failed")
+        sys.exit(1)
+    print("\n✅ All LLM retry checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.near_duplicates import NearDuplicateDetector
+
+ARTICLE = (
+    "Acme Robotics today announced the general availability of its Atlas-7 warehouse picking robot, "
+    "which the company says cuts order fulfilment time by 35 percent. The launch follows a pilot with "
+    "three European logistics providers and a new service hub in Munich."
+)
+# Syndicated copy: same article with a different dateline and a trailing boilerplate sentence
+SYNDICATED = "MUNICH (BUSINESS WIRE) " + ARTICLE + " For more information visit the company website."
+DISTINCT = (
+    "Contoso Health reported third-quarter revenue of 1.2 billion dollars, up 8 percent year over year, "
+    "driven by growth in its outpatient clinics and telehealth subscriptions."
+)
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def main():
+    print("Testing near-duplicate detection...")
+    detector = NearDuplicateDetector()
+
+    dropped = detector.duplicates([ARTICLE, ARTICLE])
+    check("identical text is dropped, the first copy kept", dropped == {1}, str(dropped))
+
+    dropped = detector.duplicates([ARTICLE, SYNDICATED])
+    check("syndicated copy is dropped", dropped == {1}, str(dropped))
+
+    dropped = detector.duplicates([ARTICLE, DISTINCT])
+    check("distinct texts are kept", not dropped, str(dropped))
+
+    dropped = detector.duplicates([DISTINCT, ARTICLE, SYNDICATED, DISTINCT])
+    check("earlier texts win", dropped == {2, 3}, str(dropped))
+
+    dropped = detector.duplicates(["", "   ", "\n", "--", ARTICLE])
+    check("empty and whitespace-only texts are not duplicates of each other", not dropped, str(dropped))
+
+    dropped = detector.duplicates([ARTICLE])
+    check("a single text is never a duplicate", not dropped)
+
+    if failed:
+        print(f"\n❌ {len(failed)} near-duplicate check(s) failed")
+        sys.exit(1)
+    print("\n✅ All near-duplicate checks passed")
+
+
+if __name__ == "__main__":
+    main()
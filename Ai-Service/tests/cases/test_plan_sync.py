@@ -0,0 +1,227 @@
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.plan_sync import PlanSyncSession, apply_ops, diff_section, plan_version
+from app.schemas.websocket_messages import AssistantChunk, PlanAckPayload, PlanUpdate
+
+# Simulated client and in-memory plan store, no server or database needed.
+PLAN_ID = "plan-1"
+PLAN = {
+    "executive_summary": "Acme Robotics builds warehouse robots and grew revenue 40% in 2024. " * 6,
+    "company_overview": "Founded in 2015, Acme sells autonomous picking robots to logistics companies. " * 5,
+    "strategic_priorities": ["Launch Atlas-7", "Open a Munich hub", "Grow recurring software revenue"],
+    "opportunities": ["Third-party logistics providers", "Grocery fulfilment", "Retrofit of legacy warehouses"],
+    "risks": ["Customer concentration", "Component supply", "Safety certification delays"],
+    "engagement_strategy": "Lead with the CFO on total cost of ownership, then operations on throughput. " * 4,
+    "next_steps": "Book a discovery call with the VP Operations and prepare a TCO model. " * 2,
+}
+
+
+class StubPlanService:
+    def __init__(self, plans=None):
+        self.plans = plans or {}
+
+    async def get_plan(self, plan_id):
+        sections = self.plans.get(plan_id)
+        return {"id": plan_id, "sections": dict(sections)} if sections is not None else None
+
+
+class Client:
+    """
+    Applies snapshots and deltas like the frontend does and acknowledges each version.
+    """
+    def __init__(self):
+        self.plans = {}
+        self.versions = {}
+        self.acks = []
+        self.messages = []
+        self.mismatches = 0
+
+    async def receive(self, data):
+        self.messages.append(data)
+        payload = data.get("payload", {})
+        if data["type"] == "plan_snapshot":
+            self.plans[payload["plan_id"]] = dict(payload["sections"])
+            self.versions[payload["plan_id"]] = payload["version"]
+        elif data["type"] == "plan_delta":
+            if self.versions.get(payload["plan_id"]) != payload["base_version"]:
+                self.mismatches += 1
+                self.acks.append(PlanAckPayload(plan_id=payload["plan_id"], version=None))
+                return
+            sections = self.plans[payload["plan_id"]]
+            sections[payload["section"]] = apply_ops(sections.get(payload["section"]), payload["ops"])
+            if plan_version(sections) != payload["version"]:
+                # Applied content differs from the server's: ask for a snapshot instead of acking
+                self.mismatches += 1
+                self.versions[payload["plan_id"]] = None
+                self.acks.append(PlanAckPayload(plan_id=payload["plan_id"], version=None))
+                return
+            self.versions[payload["plan_id"]] = payload["version"]
+        elif data["type"] == "plan_update":
+            self.plans.setdefault(payload["plan_id"], {})[payload["section"]] = payload["content"]
+            return
+        else:
+            return
+        self.acks.append(PlanAckPayload(plan_id=payload["plan_id"], version=self.versions[payload["plan_id"]]))
+
+    async def flush_acks(self, session):
+        acks, self.acks = self.acks, []
+        for ack in acks:
+            await session.ack(ack)
+
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def update(section, content, append=False):
+    return PlanUpdate(payload={"plan_id": PLAN_ID, "section": section, "content": content, "append": append})
+
+
+def markdown(section, content):
+    body = "\n".join(f"- {item}" for item in content) if isinstance(content, list) else content
+    return AssistantChunk(payload={"message_id": "m1", "chunk": f"## {section}\n{body}\n\n", "plan_id": PLAN_ID})
+
+
+async def edit_session(session, client):
+    """
+    Generate a plan section by section, then stream a list edit and a text edit (as edit_node does).
+    """
+    for section, content in PLAN.items():
+        await session.send(update(section, content))
+        await session.send(markdown(section, content))
+    await client.flush_acks(session)
+
+    # List edit: first item replaces the section, the following ones are appended, then the final content
+    risks = ["Customer concentration", "AI regulation", "Component supply", "Safety certification delays"]
+    await session.send(update("risks", risks[:1]))
+    for item in risks[1:]:
+        await session.send(update("risks", [item], append=True))
+    await session.send(update("risks", risks))
+    await client.flush_acks(session)
+
+    # Text edit streamed in small chunks
+    summary = PLAN["executive_summary"].replace("grew revenue 40%", "doubled its European revenue")
+    chunks = [summary[i:i + 48] for i in range(0, len(summary), 48)]
+    await session.send(update("executive_summary", chunks[0]))
+    for chunk in chunks[1:]:
+        await session.send(update("executive_summary", chunk, append=True))
+    await session.send(update("executive_summary", summary))
+    await client.flush_acks(session)
+    return {**PLAN, "risks": risks, "executive_summary": summary}
+
+
+def test_diff():
+    cases = [
+        ("Acme grew revenue 40%.", "Acme doubled revenue in 2024."),
+        ("", "new text"),
+        (["a", "b", "c", "d"], ["a", "x", "c", "e", "f"]),
+        (["a", "b", "c"], []),
+        ([], ["a", "b"]),
+        (["a", "b", "c"], ["c", "b", "a"]),
+        (None, ["a"]),
+        ("text", ["a"]),
+        ("Growth 🚀 in Europe: revenue up 20%.", "Growth 🚀 in Europe: revenue up 35%."),
+        ("🚀🚀", "🚀x🚀"),
+        ("Café ☕ 🇪🇺", "Café 🍵 ☕ 🇪🇺!"),
+    ]
+    ok = all(apply_ops(old, diff_section(old, new)) == new for old, new in cases)
+    check("diff ops rebuild the new content", ok)
+    # The client slices by UTF-16 code units: the emoji before the change counts twice
+    op = diff_section("Growth 🚀 up 20%.", "Growth 🚀 up 35%.")[0]
+    check("patch offsets are UTF-16 code units", (op["start"], op["end"], op["text"]) == (13, 15, "35"), str(op))
+    check("unchanged sections produce no ops", diff_section(["a"], ["a"]) == [] and diff_section("x", "x") == [])
+
+
+async def test_delta_session():
+    client = Client()
+    session = PlanSyncSession(client.receive, StubPlanService(), delta=True)
+    final = await edit_session(session, client)
+    check("client plan matches after deltas", client.plans[PLAN_ID] == final)
+    check("new plan starts from one (empty) snapshot", session.snapshots == 1, f"{session.snapshots} snapshots")
+    check("no version mismatches", client.mismatches == 0)
+    check("plan markdown is not sent to delta clients", not any(m["type"] == "assistant_chunk" for m in client.messages))
+    check("acks leave only the current version pending", session.pending[PLAN_ID] == [plan_version(final)])
+    return session
+
+
+async def test_non_ascii_session():
+    client = Client()
+    session = PlanSyncSession(client.receive, StubPlanService(), delta=True)
+    plan = {**PLAN, "executive_summary": "Growth 🚀 in Europe 🇪🇺: revenue up 20%. Café partners ☕ follow. " * 4}
+    for section, content in plan.items():
+        await session.send(update(section, content))
+    summary = plan["executive_summary"].replace("up 20%", "up 35% 🎉")
+    chunks = [summary[i:i + 16] for i in range(0, len(summary), 16)]
+    await session.send(update("executive_summary", chunks[0]))
+    for chunk in chunks[1:]:
+        await session.send(update("executive_summary", chunk, append=True))
+    await session.send(update("risks", ["Supply ⚠️", "Regulation 🇪🇺"]))
+    await client.flush_acks(session)
+    final = {**plan, "executive_summary": summary, "risks": ["Supply ⚠️", "Regulation 🇪🇺"]}
+    check("client plan matches after deltas with emoji", client.plans[PLAN_ID] == final)
+    check("every delta verified against its version", client.mismatches == 0 and session.snapshots == 1, f"{client.mismatches} mismatches")
+
+
+async def test_full_session():
+    client = Client()
+    session = PlanSyncSession(client.receive, StubPlanService(), delta=False)
+    await edit_session(session, client)
+    check("full-content mode passes updates through", all(m["type"] in ("plan_update", "assistant_chunk") for m in client.messages))
+    return session
+
+
+async def test_reconnect():
+    client = Client()
+    store = StubPlanService({PLAN_ID: PLAN})
+    client.plans[PLAN_ID] = dict(PLAN)
+    client.versions[PLAN_ID] = plan_version(PLAN)
+
+    # Client holds the saved version: no snapshot, the next edit is a delta
+    session = PlanSyncSession(client.receive, store, delta=True)
+    await session.ack(PlanAckPayload(plan_id=PLAN_ID, version=client.versions[PLAN_ID]))
+    await session.send(update("next_steps", PLAN["next_steps"] + " Send the proposal."))
+    check("reconnect with current version needs no snapshot", session.snapshots == 0 and client.messages[-1]["type"] == "plan_delta")
+
+    # Client holds a stale version: snapshot (acks in flight are lost with the old connection)
+    client.acks.clear()
+    session = PlanSyncSession(client.receive, store, delta=True)
+    await session.ack(PlanAckPayload(plan_id=PLAN_ID, version="stale"))
+    check("reconnect with unknown version gets a snapshot", session.snapshots == 1 and client.plans[PLAN_ID] == PLAN)
+
+    # Delta against a base the client does not hold: client asks for a resync
+    client.versions[PLAN_ID] = "diverged"
+    await session.send(update("risks", ["Only risk"]))
+    await client.flush_acks(session)
+    check("version mismatch triggers a snapshot", client.mismatches == 1 and session.snapshots == 2 and client.plans[PLAN_ID]["risks"] == ["Only risk"])
+
+
+async def main():
+    print("Testing plan sync...")
+    test_diff()
+    delta = await test_delta_session()
+    await test_non_ascii_session()
+    full = await test_full_session()
+    await test_reconnect()
+
+    print(f"\nBytes per edit session (plan generation, list edit, streamed text edit):")
+    print(f"  full section content per update + markdown: {delta.full_bytes:>7}")
+    print(f"  streamed appends + markdown (plan_sync off): {full.bytes_sent:>7}")
+    print(f"  deltas (plan_sync=delta):                    {delta.bytes_sent:>7}  ({delta.deltas} deltas, {delta.snapshots} snapshot)")
+
+    if failed:
+        print(f"\n❌ {len(failed)} plan sync check(s) failed")
+        sys.exit(1)
+    print("\n✅ All plan sync checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
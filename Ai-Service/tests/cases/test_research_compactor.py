@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.research_compactor import ResearchCompactor
+
+# Facts that happen to contain words used in page boilerplate
+FACTS = [
+    "The platform has 2M paying subscribers.",
+    "Its product catalog includes 40,000 SKUs.",
+    "Acme acquired Cookie Brands Inc in 2023.",
+    "Customers can log in to the new analytics portal launched in March.",
+    "The newsletter business grew 30% after the Series B.",
+]
+BOILERPLATE = [
+    "Subscribe to our newsletter",
+    "We use cookies to improve your experience. Accept all cookies",
+    "© 2024 Acme Corp. All rights reserved.",
+    "Sign in | Subscribe | Newsletter",
+    "Share this article",
+    "Skip to main content",
+    "Privacy Policy | Terms of Use",
+]
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+def main():
+    print("Testing research compaction...")
+    compactor = ResearchCompactor()
+
+    dropped = [line for line in FACTS if not compactor._clean(line)]
+    check("fact lines with boilerplate words are kept", not dropped, str(dropped))
+    kept = [line for line in BOILERPLATE if compactor._clean(line)]
+    check("boilerplate lines are dropped", not kept, str(kept))
+
+    page = "\n".join(["Skip to main content", FACTS[0], "Subscribe to our newsletter", FACTS[2], "© 2024 Acme Corp. All rights reserved."])
+    snippets = compactor.normalize({"tavily": {"results": [{"title": "Acme", "url": "https://example.com/acme", "content": page, "score": 0.9}]}})
+    check(
+        "a scraped page keeps its facts only",
+        len(snippets) == 1 and snippets[0].text == f"{FACTS[0]} {FACTS[2]}",
+        snippets[0].text if snippets else "no snippets"
+    )
+
+    if failed:
+        print(f"\n❌ {len(failed)} research compaction check(s) failed")
+        sys.exit(1)
+    print("\n✅ All research compaction checks passed")
+
+
+if __name__ == "__main__":
+    main()
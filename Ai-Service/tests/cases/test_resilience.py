@@ -0,0 +1,181 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.resilience import ProviderRegistry, CircuitOpenError, providers
+from app.services.knowledge_base import KnowledgeBaseService
+from app.services.research_service import ResearchService
+from app.core.rate_limiter import RateLimitedError
+from app.Config.dataConfig import Config
+
+# Fault injection against local stub providers, no network access needed.
+POLICY = Config.ProviderPolicyConfig(
+    TIMEOUT=0.2, RETRIES=2, BASE_DELAY=0.01, MAX_DELAY=0.05, FAILURE_THRESHOLD=3, RESET_TIMEOUT=0.3
+)
+
+class StubProvider:
+    """
+    Fails the first `failures` calls with `error` (or sleeps `delay`), then answers "ok".
+    """
+    def __init__(self, failures=0, error=None, delay=0.0):
+        self.failures = failures
+        self.error = error or ConnectionError("connection reset by peer")
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+    async def stream(self, fail_after=None):
+        self.calls += 1
+        for i in range(3):
+            if fail_after is not None and i == fail_after and self.calls <= self.failures:
+                raise self.error
+            yield f"chunk{i}"
+
+
+def registry():
+    return ProviderRegistry({"stub": POLICY})
+
+
+failed = []
+
+def check(name, condition, detail=""):
+    print(f"{'✅' if condition else '❌'} {name}{f' ({detail})' if detail else ''}")
+    if not condition:
+        failed.append(name)
+
+
+async def test_retry_recovers():
+    reg, stub = registry(), StubProvider(failures=2)
+    result = await reg.call("stub", stub)
+    check("transient failures are retried", result == "ok" and stub.calls == 3, f"{stub.calls} calls")
+    check("breaker stays closed after recovery", reg.breaker("stub").state == "closed")
+
+
+async def test_timeout():
+    reg, stub = registry(), StubProvider(failures=0, delay=1.0)
+    start = time.monotonic()
+    try:
+        await reg.call("stub", stub)
+        check("slow provider times out", False)
+    except asyncio.TimeoutError:
+        elapsed = time.monotonic() - start
+        check("slow provider times out", stub.calls == 3 and elapsed < 1.0, f"{stub.calls} attempts in {elapsed:.2f}s")
+
+
+async def test_non_transient_not_retried():
+    reg, stub = registry(), StubProvider(failures=5, error=ValueError("bad request"))
+    try:
+        await reg.call("stub", stub)
+    except ValueError:
+        pass
+    check("non-transient errors are not retried", stub.calls == 1, f"{stub.calls} calls")
+    check("non-transient errors do not trip the breaker", reg.breaker("stub").state == "closed")
+
+
+async def test_throttle_does_not_open():
+    reg, stub = registry(), StubProvider(failures=2, error=RateLimitedError("429 Too Many Requests"))
+    result = await reg.call("stub", stub)
+    check("throttled calls are retried", result == "ok" and stub.calls == 3)
+    check("throttling does not trip the breaker", reg.breaker("stub").failures == 0)
+
+
+async def test_circuit_opens_and_recovers():
+    reg, stub = registry(), StubProvider(failures=3)
+    try:
+        await reg.call("stub", stub)
+    except ConnectionError:
+        pass
+    check("breaker opens after threshold", reg.breaker("stub").state == "open", f"{stub.calls} calls")
+
+    start = time.monotonic()
+    try:
+        await reg.call("stub", stub)
+        check("open breaker fails fast", False)
+    except CircuitOpenError:
+        elapsed = (time.monotonic() - start) * 1000
+        check("open breaker fails fast", stub.calls == 3 and elapsed < 5, f"{elapsed:.2f}ms, provider not called")
+
+    await asyncio.sleep(POLICY.RESET_TIMEOUT)
+    result = await reg.call("stub", stub)
+    check("half-open probe closes the breaker", result == "ok" and reg.breaker("stub").state == "closed")
+
+
+async def test_half_open_single_probe():
+    reg = registry()
+    breaker = reg.breaker("stub")
+    for _ in range(POLICY.FAILURE_THRESHOLD):
+        breaker.record_failure()
+    await asyncio.sleep(POLICY.RESET_TIMEOUT)
+
+    stub = StubProvider(delay=0.05)
+    results = await asyncio.gather(*(reg.call("stub", stub) for _ in range(5)), return_exceptions=True)
+    rejected = sum(isinstance(r, CircuitOpenError) for r in results)
+    check("half-open lets a single probe through", stub.calls == 1 and rejected == 4, f"{stub.calls} probe, {rejected} rejected")
+
+
+async def test_stream():
+    reg, stub = registry(), StubProvider(failures=1)
+    chunks = [c async for c in reg.stream("stub", lambda: stub.stream(fail_after=0))]
+    check("stream failing before first chunk is retried", chunks == ["chunk0", "chunk1", "chunk2"] and stub.calls == 2)
+
+    reg, stub = registry(), StubProvider(failures=1)
+    chunks = []
+    try:
+        async for c in reg.stream("stub", lambda: stub.stream(fail_after=2)):
+            chunks.append(c)
+    except ConnectionError:
+        pass
+    check("stream failing mid-way is not replayed", chunks == ["chunk0", "chunk1"] and stub.calls == 1)
+
+
+async def test_degradation():
+    # Force the shared breakers open and check the services skip the provider
+    for name in ("pinecone", "tavily"):
+        breaker = providers.breaker(name)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+    kb = KnowledgeBaseService()
+    start = time.monotonic()
+    results = await kb.search("What does TestCorp do?", company="TestCorp")
+    elapsed = (time.monotonic() - start) * 1000
+    check("RAG is skipped while Pinecone is open", results == [] and elapsed < 5, f"{elapsed:.2f}ms")
+
+    research = ResearchService()
+    response = await research.search_tavily("TestCorp")
+    check("Tavily is skipped while its circuit is open", "unavailable" in response.get("error", ""))
+
+    for name in ("pinecone", "tavily"):
+        providers.breaker(name).record_success()
+
+
+async def main():
+    print("Testing resilience layer...")
+    await test_retry_recovers()
+    await test_timeout()
+    await test_non_transient_not_retried()
+    await test_throttle_does_not_open()
+    await test_circuit_opens_and_recovers()
+    await test_half_open_single_probe()
+    await test_stream()
+    await test_degradation()
+
+    if failed:
+        print(f"\n❌ {len(failed)} resilience check(s) failed")
+        sys.exit(1)
+    print("\n✅ All resilience checks passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -27,7 +27,15 @@ def main():
         "verify_db.py",
         "test_client.py",
         "test_edit.py",
-        "test_rag.py"
+        "test_rag.py",
+        "test_resilience.py",
+        "test_plan_sync.py",
+        "test_near_duplicates.py",
+        "test_company_resolver.py",
+        "test_context_cache.py",
+        "test_research_compactor.py",
+        "test_llm_retries.py",
+        "test_conflict_detector.py"
     ]
     
     for test in tests:
@@ -6,6 +6,7 @@ import api from '../utils/api';
 import { useToast } from './ui/use-toast';
 import veritasIcon from '../assets/veritas-nobg.svg';
 import VoiceInterface from './VoiceInterface';
+import { applyOps, planVersion, renderPlanMarkdown } from '../utils/planSync';
 
 const ChatInterface = ({ chatId, setChatId, isSidebarOpen, toggleSidebar }) => {
     const [messages, setMessages] = useState([]);
@@ -23,6 +24,8 @@ const ChatInterface = ({ chatId, setChatId, isSidebarOpen, toggleSidebar }) => {
     const messagesEndRef = useRef(null);
     const textareaRef = useRef(null);
     const isCreatingChatRef = useRef(false);
+    // plan_id -> { version, sections }, kept in sync from plan snapshots and deltas
+    const plansRef = useRef({});
     const { toast } = useToast();
 
     // Auto-resize textarea
@@ -72,9 +75,16 @@ const ChatInterface = ({ chatId, setChatId, isSidebarOpen, toggleSidebar }) => {
         if (!token) return;
 
         const wsBaseUrl = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
-        const wsUrl = `${wsBaseUrl}/ai-service/ws/chat?token=${token}&session_id=${chatId || 'temp'}`;
+        const wsUrl = `${wsBaseUrl}/ai-service/ws/chat?token=${token}&session_id=${chatId || 'temp'}&plan_sync=delta`;
         ws.current = new WebSocket(wsUrl);
 
+        ws.current.onopen = () => {
+            // Tell the server which plan versions we hold, it only sends snapshots for stale ones
+            for (const [planId, plan] of Object.entries(plansRef.current)) {
+                sendPlanAck(planId, plan.version);
+            }
+        };
+
         ws.current.onmessage = (event) => {
             const data = JSON.parse(event.data);
             handleWsMessage(data);
@@ -85,7 +95,50 @@ const ChatInterface = ({ chatId, setChatId, isSidebarOpen, toggleSidebar }) => {
         };
     }, [chatId]);
 
+    const sendPlanAck = (planId, version) => {
+        if (ws.current && ws.current.readyState === WebSocket.OPEN) {
+            ws.current.send(JSON.stringify({ type: 'plan_ack', payload: { plan_id: planId, version } }));
+        }
+    };
+
+    const showPlan = (planId) => {
+        setStatus('');
+        setIsTyping(false);
+        const messageId = `plan-${planId}`;
+        const content = renderPlanMarkdown(plansRef.current[planId].sections);
+        setMessages((prev) => prev.some((msg) => msg.id === messageId)
+            ? prev.map((msg) => (msg.id === messageId ? { ...msg, content } : msg))
+            : [...prev, { id: messageId, role: 'assistant', content }]);
+    };
+
     const handleWsMessage = (data) => {
+        if (data.type === 'plan_snapshot') {
+            const { plan_id, version, sections } = data.payload;
+            plansRef.current[plan_id] = { version, sections };
+            sendPlanAck(plan_id, version);
+            if (Object.keys(sections).length) showPlan(plan_id);
+            return;
+        }
+        if (data.type === 'plan_delta') {
+            const { plan_id, section, base_version, version, ops } = data.payload;
+            const plan = plansRef.current[plan_id];
+            if (!plan || plan.version !== base_version) {
+                // Out of sync, ask for a snapshot
+                sendPlanAck(plan_id, null);
+                return;
+            }
+            plan.sections = { ...plan.sections, [section]: applyOps(plan.sections[section], ops) };
+            if (planVersion(plan.sections) !== version) {
+                // Applied content differs from the server's, ask for a snapshot instead of acking
+                plan.version = null;
+                sendPlanAck(plan_id, null);
+                return;
+            }
+            plan.version = version;
+            sendPlanAck(plan_id, version);
+            showPlan(plan_id);
+            return;
+        }
         if (data.type === 'status_update') {
             setStatus(data.payload.message);
         } else if (data.type === 'assistant_chunk') {
@@ -104,11 +157,15 @@ const ChatInterface = ({ chatId, setChatId, isSidebarOpen, toggleSidebar }) => {
             });
         } else if (data.type === 'message_update') {
             setIsTyping(false); // Stop thinking on update too
-            // Handle in-place update
-            const { message_id, content } = data.payload;
-            setMessages((prev) => prev.map(msg =>
-                msg.id === message_id ? { ...msg, content: content } : msg
-            ));
+            // Handle in-place update: full content, or a diff replacing content[start:end] (UTF-16 offsets, as slice counts)
+            const { message_id, content, start, end, replacement } = data.payload;
+            setMessages((prev) => prev.map(msg => {
+                if (msg.id !== message_id) return msg;
+                if (start != null) {
+                    return { ...msg, content: msg.content.slice(0, start) + replacement + msg.content.slice(end) };
+                }
+                return { ...msg, content: content };
+            }));
         }
     };
 
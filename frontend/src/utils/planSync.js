@@ -0,0 +1,85 @@
+// Client side of the delta-encoded plan protocol (Ai-Service app/services/plan_sync.py)
+
+// Patch offsets are UTF-16 code units, the units String.slice counts in
+export function applyOps(value, ops) {
+    for (const op of ops) {
+        if (op.op === 'set') {
+            value = op.value;
+        } else if (op.op === 'patch') {
+            value = value.slice(0, op.start) + op.text + value.slice(op.end);
+        } else if (op.op === 'insert') {
+            value = [...value.slice(0, op.index), op.value, ...value.slice(op.index)];
+        } else if (op.op === 'remove') {
+            value = [...value.slice(0, op.index), ...value.slice(op.index + 1)];
+        } else if (op.op === 'replace') {
+            value = [...value.slice(0, op.index), op.value, ...value.slice(op.index + 1)];
+        }
+    }
+    return value;
+}
+
+// JSON with sorted keys and no whitespace, as json.dumps(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+const canonicalJson = (value) => {
+    if (Array.isArray(value)) return `[${value.map(canonicalJson).join(',')}]`;
+    if (value && typeof value === 'object') {
+        return `{${Object.keys(value).sort().map((key) => `${JSON.stringify(key)}:${canonicalJson(value[key])}`).join(',')}}`;
+    }
+    return JSON.stringify(value);
+};
+
+// SHA-1 of a byte array as hex. Synchronous, and crypto.subtle is missing outside secure contexts.
+const sha1 = (bytes) => {
+    const words = new Uint32Array((((bytes.length + 8) >> 6) + 1) * 16);
+    for (let i = 0; i < bytes.length; i++) words[i >> 2] |= bytes[i] << (24 - (i % 4) * 8);
+    words[bytes.length >> 2] |= 0x80 << (24 - (bytes.length % 4) * 8);
+    words[words.length - 1] = bytes.length * 8;
+    const h = [0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476, 0xc3d2e1f0];
+    const w = new Uint32Array(80);
+    const rotl = (x, n) => (x << n) | (x >>> (32 - n));
+    for (let block = 0; block < words.length; block += 16) {
+        for (let t = 0; t < 80; t++) w[t] = t < 16 ? words[block + t] : rotl(w[t - 3] ^ w[t - 8] ^ w[t - 14] ^ w[t - 16], 1);
+        let [a, b, c, d, e] = h;
+        for (let t = 0; t < 80; t++) {
+            const f = t < 20 ? ((b & c) | (~b & d)) + 0x5a827999
+                : t < 40 ? (b ^ c ^ d) + 0x6ed9eba1
+                : t < 60 ? ((b & c) | (b & d) | (c & d)) + 0x8f1bbcdc
+                : (b ^ c ^ d) + 0xca62c1d6;
+            const temp = (rotl(a, 5) + f + e + w[t]) >>> 0;
+            e = d; d = c; c = rotl(b, 30) >>> 0; b = a; a = temp;
+        }
+        h[0] = (h[0] + a) >>> 0; h[1] = (h[1] + b) >>> 0; h[2] = (h[2] + c) >>> 0; h[3] = (h[3] + d) >>> 0; h[4] = (h[4] + e) >>> 0;
+    }
+    return h.map((x) => x.toString(16).padStart(8, '0')).join('');
+};
+
+// Content hash of the plan's sections, the server's plan_version
+export function planVersion(sections) {
+    return sha1(new TextEncoder().encode(canonicalJson(sections))).slice(0, 10);
+}
+
+const SECTION_ORDER = [
+    'executive_summary',
+    'company_overview',
+    'strategic_priorities',
+    'opportunities',
+    'risks',
+    'engagement_strategy',
+    'next_steps',
+];
+
+const title = (section) => section.split('_').map((w) => w.charAt(0).toUpperCase() + w.slice(1)).join(' ');
+
+export function renderPlanMarkdown(sections) {
+    const names = [
+        ...SECTION_ORDER.filter((s) => s in sections),
+        ...Object.keys(sections).filter((s) => !SECTION_ORDER.includes(s)),
+    ];
+    let markdown = '# Account Plan\n\n';
+    for (const section of names) {
+        const content = sections[section];
+        markdown += `## ${title(section)}\n`;
+        markdown += Array.isArray(content) ? content.map((item) => `- ${item}\n`).join('') : `${content}\n`;
+        markdown += '\n';
+    }
+    return markdown;
+}